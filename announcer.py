@@ -0,0 +1,243 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+
+# Discord: maksimal 10 embed per pesan; bucket route kirim pesan per channel
+# kira-kira 5 request / 5 detik, dan batas global 50 request / detik
+MAX_EMBEDS_PER_MESSAGE = 10
+ROUTE_RATE = int(os.getenv("ANNOUNCE_ROUTE_RATE", "5"))
+ROUTE_PER = float(os.getenv("ANNOUNCE_ROUTE_PER", "5"))
+GLOBAL_RATE = int(os.getenv("ANNOUNCE_GLOBAL_RATE", "50"))
+MAX_RETRIES = 5
+
+class RateLimited(Exception):
+    """Transport menerima 429; retry_after dalam detik"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Rate limited, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+class RouteBucket:
+    """Token bucket untuk satu route rate-limit, dengan backoff setelah 429"""
+
+    def __init__(self, rate, per):
+        self.rate = rate
+        self.per = per
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    async def acquire(self):
+        """Tunggu sampai ada token (dan backoff selesai), lalu pakai satu token"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = max(0.0, self._blocked_until - now)
+                if wait == 0 and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                if wait == 0:
+                    wait = (1 - self._tokens) * self.per / self.rate
+                await asyncio.sleep(wait)
+
+    def backoff(self, delay):
+        """Blok route selama delay detik dan kosongkan token"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        self._tokens = 0.0
+
+class DiscordTransport:
+    """Transport ke Discord lewat channel.send(embeds=...)"""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def send(self, channel_id, embeds):
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            # Channel milik shard lain tidak ada di cache proses ini; kirim lewat REST saja
+            channel = self.bot.get_partial_messageable(channel_id)
+        if channel is None:
+            return False
+        try:
+            await channel.send(embeds=embeds)
+        except Exception as e:
+            # discord.HTTPException dengan status 429
+            if getattr(e, "status", None) == 429:
+                raise RateLimited(getattr(e, "retry_after", None) or 1.0)
+            raise
+        return True
+
+class LocalTransport:
+    """
+    Pengganti transport Discord untuk uji throughput offline: mensimulasikan
+    latensi request dan bucket rate-limit per channel (melempar RateLimited).
+    """
+
+    def __init__(self, latency=0.05, rate=ROUTE_RATE, per=ROUTE_PER):
+        self.latency = latency
+        self.rate = rate
+        self.per = per
+        self.sent = []
+        self.rejected = 0
+        self._windows = {}
+
+    async def send(self, channel_id, embeds):
+        await asyncio.sleep(self.latency)
+        now = time.monotonic()
+        window = [stamp for stamp in self._windows.get(channel_id, []) if now - stamp < self.per]
+        if len(window) >= self.rate:
+            self.rejected += 1
+            self._windows[channel_id] = window
+            raise RateLimited(self.per - (now - window[0]))
+        window.append(now)
+        self._windows[channel_id] = window
+        self.sent.append((channel_id, list(embeds)))
+        return True
+
+class AnnouncementQueue:
+    """
+    Antrean pengumuman keluar: dedup per channel, maksimal 10 embed per pesan,
+    menghormati bucket rate-limit per route dengan backoff, dan flush secara async.
+    """
+
+    def __init__(self, transport, max_embeds=MAX_EMBEDS_PER_MESSAGE, route_rate=ROUTE_RATE,
+                 route_per=ROUTE_PER, global_rate=GLOBAL_RATE, max_retries=MAX_RETRIES):
+        self.transport = transport
+        self.max_embeds = max_embeds
+        self.route_rate = route_rate
+        self.route_per = route_per
+        self.max_retries = max_retries
+        self._global = RouteBucket(global_rate, 1.0)
+        self._buckets = {}
+        self._pending = OrderedDict()
+        self._keys = set()
+        self._wakeup = None
+        self._task = None
+
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self.deduplicated = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    def enqueue(self, channel_id, embed, key=None):
+        """Tambahkan embed untuk channel; key yang sama untuk channel yang sama hanya dikirim sekali"""
+        if key is not None:
+            if (channel_id, key) in self._keys:
+                self.deduplicated += 1
+                return False
+            self._keys.add((channel_id, key))
+        self._pending.setdefault(channel_id, []).append((key, embed))
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def pending(self):
+        return sum(len(entries) for entries in self._pending.values())
+
+    def start(self):
+        """Mulai worker flush di background (aman dipanggil berulang)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Error flushing announcements: {e}")
+
+    def _bucket(self, channel_id):
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = RouteBucket(self.route_rate, self.route_per)
+        return bucket
+
+    async def flush(self):
+        """Kirim semua yang tertunda; setiap channel (route) dikuras paralel"""
+        while self._pending:
+            channels = list(self._pending)
+            await asyncio.gather(*(self._drain(channel_id) for channel_id in channels))
+
+    async def _drain(self, channel_id):
+        bucket = self._bucket(channel_id)
+        while self._pending.get(channel_id):
+            entries = self._pending[channel_id]
+            batch = entries[:self.max_embeds]
+            del entries[:self.max_embeds]
+            if not entries:
+                self._pending.pop(channel_id, None)
+
+            for attempt in range(self.max_retries + 1):
+                await bucket.acquire()
+                await self._global.acquire()
+                try:
+                    delivered = await self.transport.send(channel_id, [embed for _, embed in batch])
+                except RateLimited as e:
+                    self.rate_limited += 1
+                    bucket.backoff(e.retry_after * (2 ** attempt if attempt else 1))
+                    continue
+                except Exception as e:
+                    print(f"❌ Error sending announcement to {channel_id}: {e}")
+                    delivered = False
+                if delivered:
+                    self.sent_messages += 1
+                    self.sent_embeds += len(batch)
+                else:
+                    self.failed += len(batch)
+                break
+            else:
+                self.failed += len(batch)
+
+            for key, _ in batch:
+                if key is not None:
+                    self._keys.discard((channel_id, key))
+
+    def stats(self):
+        """Statistik antrean pengumuman"""
+        return {
+            'pending': self.pending(),
+            'sent_messages': self.sent_messages,
+            'sent_embeds': self.sent_embeds,
+            'deduplicated': self.deduplicated,
+            'rate_limited': self.rate_limited,
+            'failed': self.failed
+        }
+
+if __name__ == "__main__":
+    # Uji throughput offline dengan transport lokal
+    async def main():
+        transport = LocalTransport(latency=0.02, rate=5, per=1.0)
+        queue = AnnouncementQueue(transport, route_rate=5, route_per=1.0)
+        for item_id in range(500):
+            for channel_id in (1, 2):
+                queue.enqueue(channel_id, {"title": f"Item {item_id}"}, key=item_id)
+                queue.enqueue(channel_id, {"title": f"Item {item_id}"}, key=item_id)
+        started = time.monotonic()
+        await queue.flush()
+        elapsed = time.monotonic() - started
+        print(f"✅ {queue.sent_embeds} embed dalam {queue.sent_messages} pesan, {elapsed:.2f}s "
+              f"({queue.sent_embeds / elapsed:.0f} embed/s), 429: {transport.rejected}")
+        print(queue.stats())
+
+    asyncio.run(main())
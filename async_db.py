@@ -0,0 +1,49 @@
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+import database
+import items_parser
+
+# Thread query DB sama dengan ukuran pool koneksi baca; job sinkronisasi punya thread sendiri
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", str(database.POOL_SIZE)))
+DB_MAX_PENDING = int(os.getenv("DB_MAX_PENDING", "64"))
+
+class DatabaseExecutor:
+    """Executor terbatas untuk menjalankan fungsi database.py yang sinkron di luar event loop"""
+
+    def __init__(self, workers, max_pending, name):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._max_pending = max_pending
+        self._slots = None
+
+    async def run(self, func, *args, **kwargs):
+        """Jalankan func di thread executor; tunggu jika antrean sudah penuh"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._max_pending)
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool, functools.partial(func, *args, **kwargs))
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+query_executor = DatabaseExecutor(DB_EXECUTOR_WORKERS, DB_MAX_PENDING, "db-query")
+sync_executor = DatabaseExecutor(1, 4, "db-sync")
+
+async def run_db(func, *args, **kwargs):
+    """Jalankan query database di executor query"""
+    return await query_executor.run(func, *args, **kwargs)
+
+async def run_sync_job(func, *args, **kwargs):
+    """Jalankan job berat (sinkronisasi, reload katalog) di thread sync tersendiri"""
+    return await sync_executor.run(func, *args, **kwargs)
+
+async def sync_items(force=False):
+    """Sinkronisasi items.json di luar event loop"""
+    return await run_sync_job(items_parser.sync_items, force=force)
+
+def shutdown():
+    """Hentikan semua executor"""
+    query_executor.shutdown(wait=False)
+    sync_executor.shutdown(wait=False)
@@ -0,0 +1,224 @@
+"""
+Benchmark ingest, lookup dan search katalog pada ukuran katalog sintetis yang bertambah.
+
+    python benchmark.py --sizes 1000 10000 100000 --output bench_results.json
+    python benchmark.py --sizes 1000 --compare bench_results.json
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import database
+import items_parser
+from catalog import Catalog
+from shared_catalog import SharedCatalog
+
+BASE_BLOCKS = ["Dirt", "Rock", "Lava", "Cave Background", "Sand", "Water", "Grass Seed", "Mars Rock"]
+WORDS = ["Wooden", "Glass", "Golden", "Crystal", "Dark", "Pastel", "Red", "Blue", "Ancient", "Pixel",
+         "Lava", "Ice", "Rock", "Magic", "Space", "Neon", "Tiny", "Royal", "Cursed", "Holy"]
+NOUNS = ["Block", "Door", "Sign", "Background", "Platform", "Wallpaper", "Pane", "Shirt", "Pants", "Hat",
+         "Wings", "Sword", "Bricks", "Tree", "Lamp", "Chest", "Table", "Window", "Flag", "Statue"]
+
+def generate_catalog(size, seed=1):
+    """Katalog sintetis: nama unik, tier naik, recipe 'A + B' dari item tier lebih rendah atau blok dasar"""
+    rng = random.Random(seed)
+    items = []
+    for item_id in range(1, size + 1):
+        name = f"{rng.choice(WORDS)} {rng.choice(NOUNS)} {item_id}"
+        if item_id <= 20 or rng.random() < 0.05:
+            first, second = rng.sample(BASE_BLOCKS, 2)
+            tier = 2
+        else:
+            # Bahan dipilih dari item sebelumnya, condong ke item yang baru dibuat
+            low = max(0, len(items) - 2000)
+            first_item = items[rng.randrange(low, len(items))]
+            second_item = items[rng.randrange(0, len(items))]
+            first, second = first_item["name"], second_item["name"]
+            tier = max(first_item["tier"], second_item["tier"]) + 1
+        items.append({
+            "id": item_id,
+            "name": name,
+            "tier": tier,
+            "recipe": f"{first} + {second}",
+            "image_url": f"https://example.com/items/{item_id}.png"
+        })
+    return items
+
+def write_catalog(path, items):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(items, f)
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def measure(func, args_list):
+    """Jalankan func untuk setiap argumen, return throughput dan latensi p50/p99 (mikrodetik)"""
+    samples = []
+    started = time.perf_counter()
+    for args in args_list:
+        t0 = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    return {
+        "ops": len(samples),
+        "ops_per_sec": len(samples) / elapsed if elapsed else None,
+        "p50_us": percentile(samples, 50) * 1e6,
+        "p99_us": percentile(samples, 99) * 1e6,
+        "mean_us": statistics.fmean(samples) * 1e6
+    }
+
+def measure_once(func):
+    t0 = time.perf_counter()
+    result = func()
+    return time.perf_counter() - t0, result
+
+def measure_catalog_memory(size):
+    """Jejak memori katalog di memori (tracemalloc), termasuk string row yang dipegang index"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        catalog = Catalog.load()
+        gc.collect()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "items": len(catalog),
+        "bytes": current,
+        "bytes_per_item": current / size,
+        "peak_bytes": peak
+    }
+
+def run_size(size, queries, workdir, seed):
+    """Benchmark satu ukuran katalog di database baru"""
+    rng = random.Random(seed)
+    items = generate_catalog(size, seed)
+    items_file = os.path.join(workdir, f"items_{size}.json")
+    write_catalog(items_file, items)
+
+    database.DB_FILE = os.path.join(workdir, f"bench_{size}.db")
+    items_parser.ITEMS_FILE = items_file
+    database.init_db()
+    database.update_db_schema()
+
+    result = {"size": size, "file_bytes": os.path.getsize(items_file)}
+
+    load_seconds, _ = measure_once(items_parser.load_all_items)
+    result["load_all_items"] = {"seconds": load_seconds, "items_per_sec": size / load_seconds}
+
+    # Sinkronisasi setelah ~1% item diubah (kasus harian yang realistis)
+    for item in rng.sample(items, max(1, size // 100)):
+        item["recipe"] = f"{rng.choice(BASE_BLOCKS)} + {rng.choice(BASE_BLOCKS)}"
+    write_catalog(items_file, items)
+    sync_seconds, new_items = measure_once(items_parser.fetch_and_parse_items)
+    result["fetch_and_parse_items"] = {"seconds": sync_seconds, "items_per_sec": size / sync_seconds}
+
+    unchanged_seconds, _ = measure_once(items_parser.fetch_and_parse_items)
+    result["fetch_and_parse_items_unchanged"] = {"seconds": unchanged_seconds}
+
+    names = [item["name"] for item in items]
+    exact = [(rng.choice(names).lower(),) for _ in range(queries)]
+    partial = [(rng.choice(names).split()[1][:4],) for _ in range(queries)]
+    result["get_recipe"] = measure(database.get_recipe, exact)
+    result["get_recipe_partial"] = measure(database.get_recipe, partial)
+    result["get_item_details"] = measure(database.get_item_details, exact)
+    result["search_items"] = measure(database.search_items, partial)
+
+    # Jalur yang dipakai command bot: katalog di memori
+    catalog_seconds, catalog = measure_once(Catalog.load)
+    result["catalog_load"] = {"seconds": catalog_seconds}
+    snapshot_file = os.path.join(workdir, f"catalog_{size}.snapshot")
+    write_seconds, snapshot_bytes = measure_once(lambda: catalog.save_snapshot(snapshot_file))
+    result["catalog_snapshot_write"] = {"seconds": write_seconds, "bytes": snapshot_bytes}
+    restore_seconds, _ = measure_once(lambda: Catalog().load_snapshot(snapshot_file))
+    result["catalog_snapshot_load"] = {"seconds": restore_seconds}
+    # Jalur proses shard: snapshot yang sama dibaca langsung lewat mmap
+    shared = SharedCatalog(snapshot_file)
+    map_seconds, _ = measure_once(shared.refresh)
+    result["shared_catalog_map"] = {"seconds": map_seconds}
+    result["shared_catalog_get_recipe"] = measure(shared.get_recipe, exact)
+    result["shared_catalog_autocomplete"] = measure(shared.autocomplete, partial)
+    os.remove(snapshot_file)
+    typos = [(name[:-2] + name[-1:],) for (name,) in exact]
+    result["catalog_get_recipe"] = measure(catalog.get_recipe, exact)
+    result["catalog_search_items"] = measure(catalog.search_items, partial)
+    result["catalog_suggest"] = measure(catalog.suggest, typos)
+    prefixes = [(name[:3],) for (name,) in exact]
+    result["catalog_autocomplete"] = measure(catalog.autocomplete, prefixes)
+    del catalog
+    result["catalog_memory"] = measure_catalog_memory(size)
+
+    database.close_pool()
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(database.DB_FILE + suffix)
+        except OSError:
+            pass
+    os.remove(items_file)
+    return result
+
+def compare(previous, current):
+    """Cetak perbandingan dua hasil benchmark (rasio waktu: <1 berarti lebih cepat)"""
+    old_sizes = {entry["size"]: entry for entry in previous["results"]}
+    for entry in current["results"]:
+        old = old_sizes.get(entry["size"])
+        if old is None:
+            continue
+        print(f"\n📊 size={entry['size']}")
+        for key, value in entry.items():
+            if not isinstance(value, dict) or key not in old:
+                continue
+            metric = next((name for name in ("seconds", "bytes_per_item") if name in value), "p50_us")
+            before, after = old[key].get(metric), value.get(metric)
+            if before and after:
+                print(f"  {key:<32} {metric:<8} {before:>12.3f} -> {after:>12.3f}  (x{after / before:.2f})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark katalog Growtopia Recipe Bot")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Simpan hasil (JSON) ke file ini")
+    parser.add_argument("--compare", help="Bandingkan dengan hasil JSON sebelumnya")
+    args = parser.parse_args(argv)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "queries": args.queries,
+        "results": []
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            print(f"🔄 Benchmark {size} items...", file=sys.stderr)
+            # Log dari database.py / items_parser.py diarahkan ke stderr agar stdout tetap JSON
+            with contextlib.redirect_stdout(sys.stderr):
+                report["results"].append(run_size(size, args.queries, workdir, args.seed))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Hasil disimpan ke {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
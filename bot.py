@@ -1,12 +1,22 @@
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 import os
-import threading
-import subprocess
 import time
 from dotenv import load_dotenv
-from database import init_db, get_recipe, get_all_items, get_item_details, search_items, get_item_image_url, update_db_schema
-from items_parser import fetch_and_parse_items, load_all_items, validate_json
+from catalog import Catalog, normalize_name
+from catalog_snapshot import CATALOG_SNAPSHOT_FILE, SnapshotError
+import async_db
+from embed_cache import EmbedCache
+from recipe_graph import known_tier
+from items_parser import initialize_catalog, reload_catalog, validate_recipes, write_catalog_snapshot, ITEMS_FILE
+from sync_scheduler import SyncScheduler
+from announcer import AnnouncementQueue, DiscordTransport, MAX_EMBEDS_PER_MESSAGE
+from metrics import metrics, METRICS_FILE
+from flood_control import SingleFlight, CommandLimiter
+from shared_catalog import SharedCatalog, CATALOG_REFRESH_INTERVAL
+from catalog_protocol import CATALOG_SERVICE_ADDRESS
+from catalog_client import CatalogClient, CatalogServiceError
 
 # Load environment variables dari file .env
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
@@ -14,9 +24,35 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"))
 intents = discord.Intents.default()
 intents.message_content = True
 
+# Sharding: SHARD_COUNT kosong = satu proses tanpa sharding, "auto" = AutoShardedBot
+# dengan jumlah shard dari Discord, angka = jumlah shard total. SHARD_IDS (mis. "0,1")
+# memilih shard yang dijalankan proses ini jika shard dibagi ke beberapa proses.
+SHARD_COUNT = os.getenv("SHARD_COUNT", "").strip()
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("SHARD_IDS", "").split(",") if shard_id.strip()]
+
+# Leader memegang database, sinkronisasi items.json, pengumuman, dan menerbitkan
+# snapshot katalog. Proses shard lain hanya membaca snapshot itu lewat mmap.
+# Default: proses yang menjalankan shard 0 (atau proses tanpa SHARD_IDS).
+CATALOG_LEADER = os.getenv("CATALOG_LEADER", "1" if not SHARD_IDS or 0 in SHARD_IDS else "0") == "1"
+
+# Setiap proses shard menulis metrik ke file sendiri
+SHARD_LABEL = "-".join(map(str, SHARD_IDS))
+metrics_root, metrics_ext = os.path.splitext(METRICS_FILE)
+BOT_METRICS_FILE = f"{metrics_root}.shard{SHARD_LABEL}{metrics_ext}" if SHARD_LABEL else METRICS_FILE
+
+def create_bot(**options):
+    """commands.Bot biasa, atau AutoShardedBot jika SHARD_COUNT diatur"""
+    if not SHARD_COUNT:
+        return commands.Bot(**options)
+    if SHARD_COUNT != "auto":
+        options['shard_count'] = int(SHARD_COUNT)
+        if SHARD_IDS:
+            options['shard_ids'] = SHARD_IDS
+    return commands.AutoShardedBot(**options)
+
 # Nonaktifkan help command bawaan agar bisa menggunakan custom help
-bot = commands.Bot(
-    command_prefix="*", 
+bot = create_bot(
+    command_prefix="*",
     intents=intents,
     help_command=None
 )
@@ -30,288 +66,875 @@ ALLOWED_CHANNELS = [
 # URL channel khusus
 SPECIAL_CHANNEL_URL = "https://discord.com/channels/1414500944200204379/1417382043527942204"
 
+# Katalog item di memori, dimuat sekali saat startup dan melayani semua lookup command.
+# Proses shard non-leader memakai snapshot leader (read-only, dibagi lewat page cache).
+# Dengan CATALOG_SERVICE_ADDRESS, database dan index dipegang catalog_service.py
+# dan setiap proses bot hanya menjadi klien tipis.
+if CATALOG_SERVICE_ADDRESS:
+    catalog = CatalogClient(CATALOG_SERVICE_ADDRESS)
+elif CATALOG_LEADER:
+    catalog = Catalog()
+else:
+    catalog = SharedCatalog(CATALOG_SNAPSHOT_FILE)
+
+# Cache embed *recipe / *iteminfo, dibuang otomatis saat versi katalog berubah
+embed_cache = EmbedCache()
+
+# Lookup identik yang sedang berjalan digabung; banjir command ditolak per user/channel
+query_flight = SingleFlight()
+command_limiter = CommandLimiter()
+
 def get_channel_mention(channel_id):
     """Membuat mention/link untuk channel yang bisa diklik"""
     return f"<#{channel_id}>"
 
-def run_item_parser_periodically():
-    """Jalankan items_parser.py secara periodic setiap 24 jam"""
-    while True:
-        try:
-            print("🔄 Menjalankan items_parser.py...")
-            # Validasi JSON terlebih dahulu
-            if validate_json("items.json"):
-                # Gunakan subprocess untuk menjalankan script terpisah
-                result = subprocess.run(["python", "items_parser.py"], 
-                                      capture_output=True, text=True)
-                
-                if result.returncode == 0:
-                    print("✅ items_parser.py berhasil dijalankan")
-                    if result.stdout:
-                        print(f"Output: {result.stdout}")
-                else:
-                    print(f"❌ Error menjalankan items_parser.py: {result.stderr}")
-            else:
-                print("❌ items.json tidak valid, skip parsing")
-                
-        except Exception as e:
-            print(f"❌ Exception dalam run_item_parser_periodically: {e}")
-        
-        # Tunggu 24 jam sebelum menjalankan lagi
-        time.sleep(86400)
-
 def initialize_database():
-    """Jalankan inisialisasi database"""
+    """Jalankan inisialisasi database dan isi katalog"""
     try:
         print("🔄 Menginisialisasi database...")
-        # Inisialisasi DB
-        init_db()
-        update_db_schema()
-        
-        # Load items ke database jika belum ada
-        if len(get_all_items()) == 0:
-            print("🔄 Loading items to database...")
-            load_all_items()
-            
+        initialize_catalog(catalog)
         print("✅ Database berhasil diinisialisasi")
     except Exception as e:
         print(f"❌ Error dalam initialize_database: {e}")
 
+def refresh_shared_catalog():
+    """Petakan generasi snapshot terbaru yang diterbitkan leader (proses shard non-leader)"""
+    try:
+        changed = catalog.refresh()
+    except SnapshotError as e:
+        print(f"⚠️ Snapshot katalog dari leader tidak valid ({e}), tetap memakai generasi {catalog.revision}")
+        return False
+    if changed:
+        metrics.increment("catalog.generation_changes")
+        print(f"✅ Catalog generasi {catalog.revision} dipetakan: {len(catalog)} items")
+    return changed
+
+# Shard non-leader mengikuti generasi katalog leader
+@tasks.loop(seconds=CATALOG_REFRESH_INTERVAL)
+async def follow_catalog_generation():
+    try:
+        await async_db.run_sync_job(refresh_shared_catalog)
+    except Exception as e:
+        print(f"❌ Error refreshing shared catalog: {e}")
+
+def describe_shards():
+    """Ringkasan shard proses ini, mis. '0,1 dari 4 (leader)'"""
+    role = "leader" if CATALOG_LEADER else "follower"
+    if not SHARD_COUNT:
+        return f"tanpa sharding ({role})"
+    shard_ids = getattr(bot, "shard_ids", None) or SHARD_IDS
+    shards = ",".join(map(str, shard_ids)) if shard_ids else "semua"
+    return f"{shards} dari {bot.shard_count or '?'} ({role})"
+
 def is_channel_allowed(channel_id):
     """Cek apakah channel diizinkan untuk menggunakan bot"""
     return channel_id in ALLOWED_CHANNELS
 
+# Slash command cukup disinkronkan ke Discord sekali per proses
+app_commands_synced = False
+
 @bot.event
 async def on_ready():
     print(f"✅ Logged in as {bot.user}")
     print(f"🆔 Bot ID: {bot.user.id}")
     print(f"👥 Connected to {len(bot.guilds)} guild(s)")
+    print(f"🧩 Shard: {describe_shards()}")
     
     # Tampilkan channel yang diizinkan
     print(f"📋 Channel yang diizinkan: {ALLOWED_CHANNELS}")
     
-    check_items_update.start()
+    if isinstance(catalog, SharedCatalog) and not follow_catalog_generation.is_running():
+        follow_catalog_generation.start()
+
+    # Slash command, sinkronisasi dan pengumuman cukup dijalankan oleh leader
+    if CATALOG_LEADER:
+        global app_commands_synced
+        if not app_commands_synced:
+            try:
+                synced = await bot.tree.sync()
+                app_commands_synced = True
+                print(f"✅ {len(synced)} slash command tersinkronisasi")
+            except Exception as e:
+                print(f"❌ Error syncing slash commands: {e}")
+
+        announcements.start()
+        sync_scheduler.start()
+    if not collect_metrics.is_running():
+        collect_metrics.start()
+
+def build_channel_redirect_embed():
+    """Embed redirect ke channel yang diizinkan"""
+    # Buat embed redirect yang menarik
+    embed = discord.Embed(
+        title="🚫 Channel Tidak Diizinkan",
+        description="Bot ini hanya dapat digunakan di channel khusus untuk menjaga kerapian server.",
+        color=discord.Color.red()
+    )
+
+    # Dapatkan channel tujuan yang bisa diklik
+    target_channel = get_channel_mention(ALLOWED_CHANNELS[0])
+
+    embed.add_field(
+        name="📍 Channel yang Diizinkan",
+        value=f"Silakan kunjungi {target_channel} untuk menggunakan bot ini\n"
+              f"Atau klik link langsung: {SPECIAL_CHANNEL_URL}",
+        inline=False
+    )
+
+    embed.set_footer(text="Growtopia Recipe Bot • Terima kasih atas pengertiannya!")
+    return embed
 
 @bot.check
 async def channel_check(ctx):
     """Global check untuk memverifikasi bahwa command dieksekusi di channel yang diizinkan"""
     if not is_channel_allowed(ctx.channel.id):
-        # Buat embed redirect yang menarik
-        embed = discord.Embed(
-            title="🚫 Channel Tidak Diizinkan",
-            description="Bot ini hanya dapat digunakan di channel khusus untuk menjaga kerapian server.",
-            color=discord.Color.red()
-        )
-        
-        # Dapatkan channel tujuan yang bisa diklik
-        target_channel = get_channel_mention(ALLOWED_CHANNELS[0])
-        
-        embed.add_field(
-            name="📍 Channel yang Diizinkan",
-            value=f"Silakan kunjungi {target_channel} untuk menggunakan bot ini\n"
-                  f"Atau klik link langsung: {SPECIAL_CHANNEL_URL}",
-            inline=False
-        )
-        
-        embed.set_footer(text="Growtopia Recipe Bot • Terima kasih atas pengertiannya!")
-        
-        await ctx.send(embed=embed)
+        await ctx.send(embed=build_channel_redirect_embed())
         return False
     return True
 
-# Background task untuk cek item baru
-@tasks.loop(hours=24)
-async def check_items_update():
+def build_cooldown_embed(scope, retry_after):
+    """Embed penolakan karena cooldown user/channel"""
+    target = "Anda" if scope == "user" else "Channel ini"
+    return discord.Embed(
+        title="⏳ Pelan-pelan!",
+        description=f"{target} mengirim terlalu banyak command. Coba lagi dalam **{retry_after:.1f} detik**.",
+        color=discord.Color.orange()
+    )
+
+@bot.check
+async def cooldown_check(ctx):
+    """Global check: tolak banjir command per user/channel sebelum menyentuh katalog"""
+    limited = command_limiter.check(ctx.author.id, ctx.channel.id)
+    if limited is None:
+        return True
+    scope, retry_after, notify = limited
+    metrics.increment(f"cooldown.{scope}")
+    # Cukup sekali per rentetan agar balasan cooldown tidak ikut membanjiri channel
+    if notify:
+        await ctx.send(embed=build_cooldown_embed(scope, retry_after), delete_after=max(retry_after, 3))
+    return False
+
+# Antrean pengumuman item baru ke channel yang diizinkan
+announcements = AnnouncementQueue(DiscordTransport(bot))
+
+def build_new_item_embed(item):
+    """Render embed pengumuman item baru"""
+    embed = discord.Embed(
+        title="🆕 ITEM BARU DITEMUKAN!",
+        description=f"**{item['name']}** telah ditambahkan ke database",
+        color=discord.Color.gold()
+    )
+
+    # Tambahkan gambar jika ada
+    if item.get('image_url'):
+        embed.set_thumbnail(url=item['image_url'])
+
+    embed.add_field(
+        name="📊 Detail Item",
+        value=f"**Tier:** {item.get('tier', 'N/A')}\n"
+              f"**Recipe:** {item.get('recipe','Tidak ada recipe')}",
+        inline=False
+    )
+
+    embed.set_footer(text="Growtopia Recipe Bot • Update Otomatis")
+    return embed
+
+# Publish hasil sinkronisasi: update katalog di memori lalu umumkan item baru
+async def publish_sync_result(diff):
     try:
-        new_items = fetch_and_parse_items()
+        # Catalog service sudah memperbarui katalog dan snapshot-nya sendiri
+        if not CATALOG_SERVICE_ADDRESS:
+            # Update index berjalan di thread sync, bukan di event loop
+            await async_db.run_sync_job(catalog.apply_diff, diff)
+            # Tier turunan, kedalaman dan laporan validasi recipe disimpan ke database
+            await async_db.run_sync_job(validate_recipes, catalog)
+            # Snapshot ditulis dari katalog yang baru diperbarui (bukan dibangun ulang dari DB)
+            await async_db.run_sync_job(write_catalog_snapshot, catalog)
+        # Diff hanya membawa contoh item terbatas; jumlah sebenarnya ada di counts
+        new_items = diff["added"]
+        counts = diff.get("counts") or {kind: len(diff[kind]) for kind in ("added", "modified", "removed")}
+        if counts["modified"] or counts["removed"]:
+            print(f"🔄 {counts['modified']} item berubah, {counts['removed']} item dihapus")
         if new_items:
-            print(f"🆕 {len(new_items)} item baru ditemukan!")
-            for guild in bot.guilds:
-                # Cari channel yang diizinkan
-                for allowed_channel_id in ALLOWED_CHANNELS:
-                    channel = bot.get_channel(allowed_channel_id)
-                    if channel:
-                        for item in new_items:
-                            # Buat embed untuk item baru
-                            embed = discord.Embed(
-                                title="🆕 ITEM BARU DITEMUKAN!",
-                                description=f"**{item['name']}** telah ditambahkan ke database",
-                                color=discord.Color.gold()
-                            )
-                            
-                            # Tambahkan gambar jika ada
-                            if item.get('image_url'):
-                                embed.set_thumbnail(url=item['image_url'])
-                            
-                            embed.add_field(
-                                name="📊 Detail Item",
-                                value=f"**Tier:** {item.get('tier', 'N/A')}\n"
-                                      f"**Recipe:** {item.get('recipe','Tidak ada recipe')}",
-                                inline=False
-                            )
-                            
-                            embed.set_footer(text="Growtopia Recipe Bot • Update Otomatis")
-                            
-                            await channel.send(embed=embed)
+            print(f"🆕 {counts['added']} item baru ditemukan!")
+            if counts["added"] > len(new_items):
+                print(f"⚠️ Hanya {len(new_items)} item baru pertama yang diumumkan")
+            # Satu kali per channel yang diizinkan (bukan per guild); antrean
+            # menggabungkan hingga 10 embed per pesan dan mengatur rate limit
+            for allowed_channel_id in ALLOWED_CHANNELS:
+                for item in new_items:
+                    announcements.enqueue(allowed_channel_id, build_new_item_embed(item), key=item['id'])
     except Exception as e:
-        print(f"❌ Error in check_items_update: {e}")
+        print(f"❌ Error in publish_sync_result: {e}")
+
+async def sync_catalog(force=False):
+    """Sinkronisasi items.json di proses ini, atau di catalog service jika dipakai"""
+    if CATALOG_SERVICE_ADDRESS:
+        return await async_db.run_sync_job(catalog.sync_items, force=force)
+    return await async_db.sync_items(force=force)
+
+async def reload_full_catalog():
+    """
+    Reload penuh items.json tanpa downtime (tabel staging + penukaran generasi katalog)
+    di proses ini, atau di catalog service jika dipakai. Shard lain mengikuti snapshot baru.
+    """
+    if CATALOG_SERVICE_ADDRESS:
+        return await async_db.run_sync_job(catalog.reload_items)
+    return await async_db.run_sync_job(reload_catalog, catalog)
+
+# Satu penjadwal sinkronisasi: pantau items.json, satu ingest dalam satu waktu,
+# reload penuh setiap SYNC_FULL_INTERVAL
+sync_scheduler = SyncScheduler(ITEMS_FILE, sync_catalog, publish_sync_result, reload=reload_full_catalog)
+
+def build_recipe_embed(item_details):
+    """Render embed *recipe untuk satu item"""
+    # Buat embed dengan desain premium
+    embed = discord.Embed(
+        title=f"📦 RECIPE: {item_details['name'].upper()}",
+        description=f"**Tier:** {item_details.get('tier', 'N/A')} | **ID:** {item_details['id']}",
+        color=discord.Color.green()
+    )
+
+    # Tambahkan gambar jika ada
+    if item_details.get('image_url'):
+        embed.set_thumbnail(url=item_details['image_url'])
+
+    embed.add_field(
+        name="📋 **seeds recipe**",
+        value=f"```yaml\n{item_details['recipe']}```",
+        inline=False
+    )
+
+    embed.set_footer(text="Growtopia Recipe Bot • Info terkini")
+    return embed
+
+def build_iteminfo_embed(item_details):
+    """Render embed *iteminfo untuk satu item"""
+    tier_info = f"Tier {item_details['tier']}" if item_details.get('tier') else "Tier tidak diketahui"
+
+    embed = discord.Embed(
+        title=f"🔍 {item_details['name'].upper()}",
+        description=f"**{tier_info}**\n🆔 ID: {item_details['id']}",
+        color=discord.Color.blue()
+    )
+
+    # Tambahkan gambar jika ada
+    if item_details.get('image_url'):
+        embed.set_thumbnail(url=item_details['image_url'])
+
+    embed.add_field(
+        name="📋 Recipe",
+        value=f"```{item_details['recipe']}```" if item_details['recipe'] else "Tidak ada recipe",
+        inline=False
+    )
+
+    embed.set_footer(text="Growtopia Recipe Bot • Info Lengkap")
+    return embed
+
+def cached_item_embed(command, item_details, render):
+    """Ambil embed item dari cache LRU atau render baru"""
+    return embed_cache.get_or_render(
+        command, item_details['id'], catalog.version, lambda: render(item_details)
+    )
+
+def build_error_embed(description):
+    """Embed untuk error saat memproses command"""
+    return discord.Embed(
+        title="⚠️ Error",
+        description=description,
+        color=discord.Color.red()
+    )
+
+async def coalesced_response(command_name, render, argument):
+    """
+    Render balasan command di thread query. Request identik (nama dinormalisasi)
+    yang datang bersamaan berbagi satu render yang sama.
+    """
+    return await query_flight.run(
+        (command_name, normalize_name(argument)), async_db.run_db, render, argument
+    )
+
+# Jumlah nama maksimal per *recipe / *iteminfo berisi daftar: sebanyak embed per pesan
+# ditambah 25 field embed miss; nama selebihnya tidak di-lookup sama sekali
+MAX_BATCH_NAMES = MAX_EMBEDS_PER_MESSAGE + 25
+
+def split_item_list(text, limit=MAX_BATCH_NAMES):
+    """
+    Pecah daftar nama dipisah koma, mis. 'Door, Sign' -> ['Door', 'Sign'] (duplikat dibuang).
+    Hanya limit nama pertama yang diambil; return (nama, jumlah nama lain yang diabaikan)
+    """
+    names = []
+    seen = set()
+    ignored = 0
+    for name in text.split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if len(names) >= limit:
+            ignored += 1
+        elif normalize_name(name) not in seen:
+            seen.add(normalize_name(name))
+            names.append(name)
+    return names, ignored
+
+def batch_item_response(command_name, item_names, render, ignored=0):
+    """
+    Balasan *recipe / *iteminfo untuk banyak item: semua nama di-resolve dalam satu
+    lookup katalog, hasilnya satu pesan multi-embed; nama yang tidak ditemukan
+    dikumpulkan di satu embed terakhir beserta saran fuzzy.
+    ignored: jumlah nama di luar MAX_BATCH_NAMES, dilaporkan di isi pesan
+    """
+    metrics.increment(f"batch.{command_name}.items", len(item_names))
+    results = catalog.lookup_items(item_names, k=3)
+    embeds = []
+    misses = []
+    for item_name, (item_details, suggestions) in zip(item_names, results):
+        if item_details is not None:
+            embeds.append(cached_item_embed(command_name, item_details, render))
+        else:
+            misses.append((item_name, suggestions))
+
+    # Discord membatasi jumlah embed per pesan; satu slot disisakan untuk embed miss
+    limit = MAX_EMBEDS_PER_MESSAGE - (1 if misses else 0)
+    skipped = len(embeds) - limit
+    embeds = embeds[:limit]
+    if misses:
+        embed = discord.Embed(
+            title="❌ Item Tidak Ditemukan",
+            description=f"{len(misses)} dari {len(item_names)} item tidak ditemukan",
+            color=discord.Color.orange()
+        )
+        # Discord membatasi 25 field per embed
+        for item_name, suggestions in misses[:25]:
+            embed.add_field(
+                name=item_name[:256],
+                value="💡 " + ", ".join(suggestions) if suggestions else "Tidak ada saran",
+                inline=False
+            )
+        embeds.append(embed)
+    # Embed item berasal dari cache dan dipakai bersama, jadi catatan ditulis di isi pesan
+    notes = []
+    if skipped > 0:
+        notes.append(f"⚠️ {skipped} item lainnya tidak ditampilkan (maksimal {MAX_EMBEDS_PER_MESSAGE} embed per pesan)")
+    if ignored > 0:
+        notes.append(f"⚠️ {ignored} nama lainnya diabaikan (maksimal {MAX_BATCH_NAMES} nama per command)")
+    if notes:
+        return {'content': "\n".join(notes), 'embeds': embeds}
+    return {'embeds': embeds}
+
+def recipe_response(item_name):
+    """Isi balasan *recipe / /recipe (kwargs untuk send); beberapa nama dipisah koma dijawab sekaligus"""
+    if "," in item_name and item_name.strip() not in catalog:
+        item_names, ignored = split_item_list(item_name)
+        if len(item_names) > 1:
+            return batch_item_response("recipe", item_names, build_recipe_embed, ignored)
+        if item_names:
+            # Satu nama dengan koma sisa, mis. 'Door,'
+            item_name = item_names[0]
+    # Cari item dengan pencarian case-insensitive
+    recipe_text = catalog.get_recipe(item_name)
+
+    if recipe_text:
+        # Dapatkan detail lengkap item
+        item_details = catalog.get_item_details(item_name)
+        if item_details:
+            return {'embed': cached_item_embed("recipe", item_details, build_recipe_embed)}
+        return {'content': f"📦 Recipe untuk **{item_name}**:\n```{recipe_text}```"}
+
+    # Berikan saran jika item tidak ditemukan
+    # Saran fuzzy (toleran typo) dari index trigram di memori
+    suggestions = catalog.suggest(item_name, k=5)
+    if suggestions:
+        # Buat embed untuk suggestions
+        embed = discord.Embed(
+            title="❌ Item Tidak Ditemukan",
+            description=f"Tidak ditemukan recipe untuk **{item_name}**",
+            color=discord.Color.orange()
+        )
+
+        suggestion_list = "\n".join([f"• {name}" for name in suggestions])
+        embed.add_field(
+            name="💡 **Mungkin maksud Anda:**",
+            value=suggestion_list,
+            inline=False
+        )
+        return {'embed': embed}
+
+    embed = discord.Embed(
+        title="❌ Item Tidak Ditemukan",
+        description=f"Tidak ditemukan recipe untuk **{item_name}**",
+        color=discord.Color.red()
+    )
+    return {'embed': embed}
 
 # Command lihat recipe
 @bot.command(name="recipe")
 async def recipe(ctx, *, item_name: str):
     try:
-        # Cari item dengan pencarian case-insensitive
-        recipe_text = get_recipe(item_name)
-        
-        if recipe_text:
-            # Dapatkan detail lengkap item
-            item_details = get_item_details(item_name)
-            if item_details:
-                # Buat embed dengan desain premium
-                embed = discord.Embed(
-                    title=f"📦 RECIPE: {item_details['name'].upper()}",
-                    description=f"**Tier:** {item_details.get('tier', 'N/A')} | **ID:** {item_details['id']}",
-                    color=discord.Color.green()
-                )
-                
-                # Tambahkan gambar jika ada
-                if item_details.get('image_url'):
-                    embed.set_thumbnail(url=item_details['image_url'])
-                
-                embed.add_field(
-                    name="📋 **seeds recipe**",
-                    value=f"```yaml\n{recipe_text}```",
-                    inline=False
-                )
-                
-                embed.set_footer(text="Growtopia Recipe Bot • Info terkini")
-                
-                await ctx.send(embed=embed)
-            else:
-                await ctx.send(f"📦 Recipe untuk **{item_name}**:\n```{recipe_text}```")
-        else:
-            # Berikan saran jika item tidak ditemukan
-            suggestions = search_items(item_name)
-            if suggestions:
-                # Buat embed untuk suggestions
-                embed = discord.Embed(
-                    title="❌ Item Tidak Ditemukan",
-                    description=f"Tidak ditemukan recipe untuk **{item_name}**",
-                    color=discord.Color.orange()
-                )
-                
-                suggestion_list = "\n".join([f"• {name}" for _, name in suggestions[:5]])
-                embed.add_field(
-                    name="💡 **Mungkin maksud Anda:**",
-                    value=suggestion_list,
-                    inline=False
-                )
-                
-                await ctx.send(embed=embed)
-            else:
-                embed = discord.Embed(
-                    title="❌ Item Tidak Ditemukan",
-                    description=f"Tidak ditemukan recipe untuk **{item_name}**",
-                    color=discord.Color.red()
-                )
-                await ctx.send(embed=embed)
+        await ctx.send(**await coalesced_response("recipe", recipe_response, item_name))
     except Exception as e:
-        # Embed untuk error
+        await ctx.send(embed=build_error_embed(f"Terjadi kesalahan saat memproses permintaan: {str(e)}"))
+
+def tree_response(item_name):
+    """Isi balasan *tree (kwargs untuk send)"""
+    result = catalog.recipe_tree(item_name)
+    if result:
+        item_details = result['item']
+        tree_text = "\n".join(result['lines'])
+        if len(tree_text) > 3900:
+            tree_text = tree_text[:3900] + "\n…"
+
         embed = discord.Embed(
-            title="⚠️ Error",
-            description=f"Terjadi kesalahan saat memproses permintaan: {str(e)}",
-            color=discord.Color.red()
+            title=f"🌳 CRAFTING TREE: {item_details['name'].upper()}",
+            description=f"```\n{tree_text}```",
+            color=discord.Color.green()
         )
-        await ctx.send(embed=embed)
 
-# Command cari item
-@bot.command(name="search")
-async def search(ctx, *, keyword: str):
+        if item_details.get('image_url'):
+            embed.set_thumbnail(url=item_details['image_url'])
+
+        base_text = "\n".join(
+            f"• {qty}x {name}" for name, qty in sorted(result['base'].items(), key=lambda entry: (-entry[1], entry[0]))
+        )
+        embed.add_field(
+            name="🧱 **Bahan dasar**",
+            value=base_text[:1024] or "Tidak ada",
+            inline=False
+        )
+
+        footer = f"Growtopia Recipe Bot • Kedalaman recipe: {result['depth']}"
+        derived_tier = result.get('derived_tier')
+        if derived_tier is not None and known_tier(item_details.get('tier')) not in (None, derived_tier):
+            footer += f" • ⚠️ Tier {item_details['tier']}, menurut recipe tier {derived_tier}"
+        embed.set_footer(text=footer)
+        return {'embed': embed}
+
+    embed = discord.Embed(
+        title="❌ Item Tidak Ditemukan",
+        description=f"Tidak ditemukan recipe untuk **{item_name}**",
+        color=discord.Color.red()
+    )
+
+    suggestions = catalog.suggest(item_name, k=5)
+    if suggestions:
+        embed.color = discord.Color.orange()
+        embed.add_field(
+            name="💡 **Mungkin maksud Anda:**",
+            value="\n".join([f"• {name}" for name in suggestions]),
+            inline=False
+        )
+    return {'embed': embed}
+
+# Command pohon crafting lengkap
+@bot.command(name="tree")
+async def tree(ctx, *, item_name: str):
     try:
-        items = search_items(keyword)
-        if items:
-            limited_results = items[:8]  # Batasi hasil menjadi 8 item
-            
-            # Buat embed untuk hasil pencarian
-            embed = discord.Embed(
-                title=f"🔍 HASIL PENCARIAN: '{keyword.upper()}'",
-                description=f"Ditemukan **{len(items)}** item yang cocok",
-                color=discord.Color.blue()
-            )
-            
-            result_text = "\n".join([f"• {name}" for _, name in limited_results])
+        await ctx.send(**await coalesced_response("tree", tree_response, item_name))
+    except Exception as e:
+        await ctx.send(embed=build_error_embed(f"Terjadi kesalahan saat memproses permintaan: {str(e)}"))
+
+# Jumlah item per halaman untuk *uses
+USES_PAGE_SIZE = 10
+
+def split_page_argument(text):
+    """Pisahkan nomor halaman di akhir argumen, mis. 'Lava 2' -> ('Lava', 2)"""
+    name, _, last = text.strip().rpartition(" ")
+    if name and last.isdigit() and text.strip() not in catalog:
+        return name, int(last)
+    return text.strip(), 1
+
+def uses_response(text):
+    """Isi balasan *uses (kwargs untuk send); text boleh diakhiri nomor halaman"""
+    item_name, page = split_page_argument(text)
+    items = catalog.uses(item_name)
+    if items:
+        total_pages = (len(items) + USES_PAGE_SIZE - 1) // USES_PAGE_SIZE
+        page = min(max(page, 1), total_pages)
+        start = (page - 1) * USES_PAGE_SIZE
+        page_items = items[start:start + USES_PAGE_SIZE]
+
+        embed = discord.Embed(
+            title=f"🧪 DIBUAT DARI: {item_name.upper()}",
+            description=f"**{len(items)}** item memakai **{item_name}** sebagai bahan",
+            color=discord.Color.blue()
+        )
+
+        result_text = "\n".join(
+            f"• **{item['name']}** (Tier {item['tier'] or '?'}) — {item['recipe']}" for item in page_items
+        )
+        embed.add_field(
+            name=f"📋 Halaman {page}/{total_pages}",
+            value=result_text[:1024],
+            inline=False
+        )
+
+        footer = "Growtopia Recipe Bot • Uses"
+        if total_pages > 1:
+            footer += f" • Gunakan *uses {item_name} <halaman> untuk halaman lain"
+        embed.set_footer(text=footer)
+        return {'embed': embed}
+
+    embed = discord.Embed(
+        title="🔍 TIDAK ADA RECIPE",
+        description=f"Tidak ada item yang memakai **{item_name}** sebagai bahan",
+        color=discord.Color.orange()
+    )
+
+    suggestions = catalog.suggest(item_name, k=5)
+    if suggestions:
+        embed.add_field(
+            name="💡 **Mungkin maksud Anda:**",
+            value="\n".join([f"• {name}" for name in suggestions]),
+            inline=False
+        )
+    return {'embed': embed}
+
+# Command item yang bisa dibuat dari suatu bahan
+@bot.command(name="uses")
+async def uses(ctx, *, item_name: str):
+    try:
+        await ctx.send(**await coalesced_response("uses", uses_response, item_name))
+    except Exception as e:
+        await ctx.send(embed=build_error_embed(f"Terjadi kesalahan saat memproses permintaan: {str(e)}"))
+
+# Batas jumlah untuk *cost
+COST_MAX_QUANTITY = int(os.getenv("COST_MAX_QUANTITY", "10000"))
+
+def split_quantity_argument(text):
+    """Pisahkan jumlah di awal argumen, mis. '10 Door' -> (10, 'Door'); default 1"""
+    first, _, name = text.strip().partition(" ")
+    if name and first.isdigit() and text.strip() not in catalog:
+        return int(first), name.strip()
+    return 1, text.strip()
+
+def cost_response(text):
+    """Isi balasan *cost (kwargs untuk send); text boleh diawali jumlah item"""
+    quantity, item_name = split_quantity_argument(text)
+    quantity = min(max(quantity, 1), COST_MAX_QUANTITY)
+    result = catalog.recipe_cost(item_name, quantity)
+    if result:
+        item_details = result['item']
+        embed = discord.Embed(
+            title=f"💰 KEBUTUHAN BAHAN: {quantity}x {item_details['name'].upper()}",
+            description=f"Total bahan dasar untuk membuat **{quantity}x {item_details['name']}**",
+            color=discord.Color.gold()
+        )
+
+        if item_details.get('image_url'):
+            embed.set_thumbnail(url=item_details['image_url'])
+
+        base_text = "\n".join(
+            f"• {qty}x {name}" for name, qty in sorted(result['base'].items(), key=lambda entry: (-entry[1], entry[0]))
+        )
+        embed.add_field(
+            name="🧱 **Bahan dasar**",
+            value=base_text[:1024] or "Tidak ada",
+            inline=False
+        )
+
+        embed.set_footer(text=f"Growtopia Recipe Bot • Maksimal {COST_MAX_QUANTITY} item per perhitungan")
+        return {'embed': embed}
+
+    embed = discord.Embed(
+        title="❌ Item Tidak Ditemukan",
+        description=f"Tidak ditemukan item **{item_name}**",
+        color=discord.Color.red()
+    )
+
+    suggestions = catalog.suggest(item_name, k=5)
+    if suggestions:
+        embed.color = discord.Color.orange()
+        embed.add_field(
+            name="💡 **Mungkin maksud Anda:**",
+            value="\n".join([f"• {name}" for name in suggestions]),
+            inline=False
+        )
+    return {'embed': embed}
+
+# Command total bahan dasar untuk sejumlah item
+@bot.command(name="cost")
+async def cost(ctx, *, text: str):
+    try:
+        await ctx.send(**await coalesced_response("cost", cost_response, text))
+    except Exception as e:
+        await ctx.send(embed=build_error_embed(f"Terjadi kesalahan saat memproses permintaan: {str(e)}"))
+
+def search_response(keyword):
+    """Isi balasan *search / /search (kwargs untuk send)"""
+    items = catalog.search_items(keyword)
+    if items:
+        limited_results = items[:8]  # Batasi hasil menjadi 8 item
+
+        # Buat embed untuk hasil pencarian
+        embed = discord.Embed(
+            title=f"🔍 HASIL PENCARIAN: '{keyword.upper()}'",
+            description=f"Ditemukan **{len(items)}** item yang cocok",
+            color=discord.Color.blue()
+        )
+
+        result_text = "\n".join([f"• {name}" for _, name in limited_results])
+        embed.add_field(
+            name="📋 Item yang Ditemukan",
+            value=result_text,
+            inline=False
+        )
+
+        if len(items) > 8:
             embed.add_field(
-                name="📋 Item yang Ditemukan",
-                value=result_text,
+                name="ℹ️ Info",
+                value=f"Menampilkan 8 dari {len(items)} item. Gunakan pencarian lebih spesifik untuk hasil yang lebih tepat.",
                 inline=False
             )
-            
-            if len(items) > 8:
-                embed.add_field(
-                    name="ℹ️ Info",
-                    value=f"Menampilkan 8 dari {len(items)} item. Gunakan pencarian lebih spesifik untuk hasil yang lebih tepat.",
-                    inline=False
-                )
-                
-            embed.set_footer(text="Growtopia Recipe Bot • Pencarian")
-            
-            await ctx.send(embed=embed)
-        else:
-            embed = discord.Embed(
-                title="🔍 PENCARIAN TIDAK HASIL",
-                description=f"Tidak ada item yang cocok dengan '{keyword}'",
-                color=discord.Color.orange()
-            )
-            await ctx.send(embed=embed)
+
+        embed.set_footer(text="Growtopia Recipe Bot • Pencarian")
+        return {'embed': embed}
+
+    embed = discord.Embed(
+        title="🔍 PENCARIAN TIDAK HASIL",
+        description=f"Tidak ada item yang cocok dengan '{keyword}'",
+        color=discord.Color.orange()
+    )
+    return {'embed': embed}
+
+# Command cari item
+@bot.command(name="search")
+async def search(ctx, *, keyword: str):
+    try:
+        await ctx.send(**await coalesced_response("search", search_response, keyword))
     except Exception as e:
-        embed = discord.Embed(
-            title="⚠️ Error",
-            description=f"Terjadi kesalahan saat memproses pencarian: {str(e)}",
-            color=discord.Color.red()
-        )
-        await ctx.send(embed=embed)
+        await ctx.send(embed=build_error_embed(f"Terjadi kesalahan saat memproses pencarian: {str(e)}"))
+
+def iteminfo_response(item_name):
+    """Isi balasan *iteminfo / /iteminfo (kwargs untuk send); beberapa nama dipisah koma dijawab sekaligus"""
+    if "," in item_name and item_name.strip() not in catalog:
+        item_names, ignored = split_item_list(item_name)
+        if len(item_names) > 1:
+            return batch_item_response("iteminfo", item_names, build_iteminfo_embed, ignored)
+        if item_names:
+            # Satu nama dengan koma sisa, mis. 'Door,'
+            item_name = item_names[0]
+    item_details = catalog.get_item_details(item_name)
+    if item_details:
+        return {'embed': cached_item_embed("iteminfo", item_details, build_iteminfo_embed)}
+
+    embed = discord.Embed(
+        title="❌ Item Tidak Ditemukan",
+        description=f"Tidak ditemukan informasi untuk **{item_name}**",
+        color=discord.Color.red()
+    )
+    return {'embed': embed}
 
 # Command info item lengkap
 @bot.command(name="iteminfo")
 async def iteminfo(ctx, *, item_name: str):
     try:
-        item_details = get_item_details(item_name)
-        if item_details:
-            tier_info = f"Tier {item_details['tier']}" if item_details.get('tier') else "Tier tidak diketahui"
-            
-            embed = discord.Embed(
-                title=f"🔍 {item_details['name'].upper()}",
-                description=f"**{tier_info}**\n🆔 ID: {item_details['id']}",
-                color=discord.Color.blue()
-            )
-            
-            # Tambahkan gambar jika ada
-            if item_details.get('image_url'):
-                embed.set_thumbnail(url=item_details['image_url'])
-            
-            embed.add_field(
-                name="📋 Recipe",
-                value=f"```{item_details['recipe']}```" if item_details['recipe'] else "Tidak ada recipe",
-                inline=False
-            )
-            
-            embed.set_footer(text="Growtopia Recipe Bot • Info Lengkap")
-            
-            await ctx.send(embed=embed)
-        else:
-            embed = discord.Embed(
-                title="❌ Item Tidak Ditemukan",
-                description=f"Tidak ditemukan informasi untuk **{item_name}**",
-                color=discord.Color.red()
-            )
-            await ctx.send(embed=embed)
+        await ctx.send(**await coalesced_response("iteminfo", iteminfo_response, item_name))
+    except Exception as e:
+        await ctx.send(embed=build_error_embed(f"Terjadi kesalahan: {str(e)}"))
+
+async def query_catalog(func, *args, **kwargs):
+    """
+    Panggil katalog langsung dari event loop. Katalog di memori (bisect, dict) cukup
+    dipanggil langsung; CatalogClient melakukan round trip socket blocking, jadi
+    dijalankan di executor query agar event loop tidak tertahan.
+    """
+    if CATALOG_SERVICE_ADDRESS:
+        return await async_db.run_db(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+# Autocomplete nama item untuk slash command: dijawab dari array terurut
+# di katalog memori (bisect), tanpa query SQLite, di setiap ketikan
+async def item_name_autocomplete(interaction, current: str):
+    started = time.perf_counter()
+    names = await query_catalog(catalog.autocomplete, current, limit=25)
+    metrics.observe("autocomplete", time.perf_counter() - started)
+    # Discord membatasi nama/value choice maksimal 100 karakter
+    return [app_commands.Choice(name=name[:100], value=name[:100]) for name in names]
+
+async def respond_slash(interaction, command_name, render, argument):
+    """Jalankan slash command dengan whitelist channel dan metrik yang sama seperti command prefix"""
+    if not is_channel_allowed(interaction.channel_id):
+        await interaction.response.send_message(embed=build_channel_redirect_embed(), ephemeral=True)
+        return
+    limited = command_limiter.check(interaction.user.id, interaction.channel_id)
+    if limited:
+        scope, retry_after, _ = limited
+        metrics.increment(f"cooldown.{scope}")
+        # Interaksi wajib dijawab; pesan ephemeral hanya terlihat oleh pengirim
+        await interaction.response.send_message(embed=build_cooldown_embed(scope, retry_after), ephemeral=True)
+        return
+    started = time.perf_counter()
+    try:
+        response = await coalesced_response(command_name, render, argument)
+    except Exception as e:
+        response = {
+            'embed': build_error_embed(f"Terjadi kesalahan saat memproses permintaan: {str(e)}"),
+            'ephemeral': True
+        }
+    try:
+        await interaction.response.send_message(**response)
+    finally:
+        metrics.observe(f"command./{command_name}", time.perf_counter() - started)
+
+@bot.tree.command(name="recipe", description="Cari recipe item tertentu")
+@app_commands.describe(item_name="Nama item")
+@app_commands.autocomplete(item_name=item_name_autocomplete)
+async def slash_recipe(interaction: discord.Interaction, item_name: str):
+    await respond_slash(interaction, "recipe", recipe_response, item_name)
+
+@bot.tree.command(name="iteminfo", description="Info lengkap tentang item")
+@app_commands.describe(item_name="Nama item")
+@app_commands.autocomplete(item_name=item_name_autocomplete)
+async def slash_iteminfo(interaction: discord.Interaction, item_name: str):
+    await respond_slash(interaction, "iteminfo", iteminfo_response, item_name)
+
+@bot.tree.command(name="search", description="Cari item berdasarkan kata kunci")
+@app_commands.describe(keyword="Kata kunci nama item")
+@app_commands.autocomplete(keyword=item_name_autocomplete)
+async def slash_search(interaction: discord.Interaction, keyword: str):
+    await respond_slash(interaction, "search", search_response, keyword)
+
+# Instrumentasi latensi per command
+@bot.before_invoke
+async def start_command_timer(ctx):
+    ctx.command_started = time.perf_counter()
+
+@bot.after_invoke
+async def record_command_latency(ctx):
+    started = getattr(ctx, "command_started", None)
+    if started is not None and ctx.command is not None:
+        metrics.observe(f"command.{ctx.command.qualified_name}", time.perf_counter() - started)
+
+async def collect_gauges():
+    """Kumpulkan gauge dari katalog, cache, penjadwal sync dan antrean pengumuman; return jumlah item"""
+    item_count = await query_catalog(len, catalog)
+    cache_stats = embed_cache.stats()
+    metrics.gauge("catalog.items", item_count)
+    metrics.gauge("catalog.version", catalog.version)
+    metrics.gauge("catalog.generation", catalog.revision)
+    metrics.gauge("embed_cache.hit_rate", cache_stats['hit_rate'])
+    metrics.gauge("embed_cache.hits", cache_stats['hits'])
+    metrics.gauge("embed_cache.misses", cache_stats['misses'])
+    metrics.gauge("sync.runs", sync_scheduler.runs)
+    metrics.gauge("announcements.pending", announcements.pending())
+    metrics.gauge("single_flight.coalesced", query_flight.coalesced)
+    metrics.gauge("cooldown.buckets", command_limiter.stats()['buckets'])
+    if bot.latency == bot.latency:  # NaN sebelum heartbeat pertama
+        metrics.gauge("gateway.latency", bot.latency)
+    return item_count
+
+# Sampling latensi gateway dan dump metrik ke file secara berkala
+@tasks.loop(seconds=60)
+async def collect_metrics():
+    try:
+        await collect_gauges()
+        if bot.latency == bot.latency:
+            metrics.observe("gateway.latency", bot.latency)
+        await async_db.run_db(metrics.dump, BOT_METRICS_FILE)
     except Exception as e:
+        print(f"❌ Error collecting metrics: {e}")
+
+def format_latency(seconds):
+    """Format detik ke ms/µs yang mudah dibaca"""
+    if seconds is None:
+        return "-"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds * 1e6:.0f}µs"
+
+def format_histograms(summaries, strip_prefix, limit=8):
+    """Baris ringkas 'nama n=.. p50=.. p99=..' urut jumlah panggilan"""
+    rows = sorted(summaries.items(), key=lambda entry: -entry[1]['count'])[:limit]
+    return "\n".join(
+        f"{name[len(strip_prefix):]:<14} n={summary['count']:<6} p50={format_latency(summary['p50']):<8} "
+        f"p99={format_latency(summary['p99'])}"
+        for name, summary in rows
+    )
+
+# Command statistik bot
+@bot.command(name="stats")
+async def stats(ctx):
+    item_count = await collect_gauges()
+    snapshot = metrics.snapshot()
+    cache_stats = embed_cache.stats()
+    sync_stats = sync_scheduler.stats()
+    gateway = snapshot['histograms'].get("gateway.latency", {})
+
+    embed = discord.Embed(
+        title="📊 STATISTIK BOT",
+        description=f"⏱️ Uptime: **{int(snapshot['uptime'] // 3600)}j {int(snapshot['uptime'] % 3600 // 60)}m** | "
+                    f"📦 Item: **{item_count}** (versi {catalog.version}, generasi {catalog.revision})",
+        color=discord.Color.gold()
+    )
+
+    command_text = format_histograms(metrics.summaries("command."), "command.")
+    embed.add_field(
+        name="⚡ **Latensi Command**",
+        value=f"```{command_text}```" if command_text else "Belum ada data",
+        inline=False
+    )
+
+    db_text = format_histograms(metrics.summaries("db."), "db.")
+    embed.add_field(
+        name="🗄️ **Query Database**",
+        value=f"```{db_text}```" if db_text else "Belum ada data",
+        inline=False
+    )
+
+    embed.add_field(
+        name="🧠 **Cache Embed**",
+        value=f"Hit rate: **{cache_stats['hit_rate']:.0%}**\n"
+              f"Hit/Miss: {cache_stats['hits']}/{cache_stats['misses']}\n"
+              f"Ukuran: {cache_stats['size']}/{cache_stats['max_size']}",
+        inline=True
+    )
+
+    embed.add_field(
+        name="🔄 **Sinkronisasi**",
+        value=f"Run: **{sync_stats['runs']}** (reload: {sync_stats['reloads']}, *sync digabung: {sync_stats['coalesced']})\n"
+              f"Durasi terakhir: {format_latency(sync_stats['last_duration'])}",
+        inline=True
+    )
+
+    embed.add_field(
+        name="📡 **Gateway**",
+        value=f"Sekarang: {format_latency(bot.latency) if bot.latency == bot.latency else '-'}\n"
+              f"p99: {format_latency(gateway.get('p99'))}\n"
+              f"Shard: {describe_shards()}",
+        inline=True
+    )
+
+    flight_stats = query_flight.stats()
+    limiter_stats = command_limiter.stats()
+    embed.add_field(
+        name="🛡️ **Flood Control**",
+        value=f"Lookup digabung: **{flight_stats['coalesced']}** / {flight_stats['calls'] + flight_stats['coalesced']}\n"
+              f"Cooldown user/channel: {limiter_stats['rejected_user']}/{limiter_stats['rejected_channel']}",
+        inline=True
+    )
+
+    embed.set_footer(text=f"Growtopia Recipe Bot • Metrik lengkap: {BOT_METRICS_FILE}")
+
+    await ctx.send(embed=embed)
+
+# Command sinkronisasi manual (admin)
+@bot.command(name="sync")
+@commands.has_permissions(administrator=True)
+async def sync_command(ctx):
+    if sync_scheduler.request():
         embed = discord.Embed(
-            title="⚠️ Error",
-            description=f"Terjadi kesalahan: {str(e)}",
-            color=discord.Color.red()
+            title="🔄 Sinkronisasi Dijadwalkan",
+            description=f"items.json akan disinkronkan dalam {sync_scheduler.debounce:.0f} detik. "
+                        f"Permintaan berdekatan digabung jadi satu sinkronisasi.",
+            color=discord.Color.green()
         )
-        await ctx.send(embed=embed)
+    else:
+        embed = discord.Embed(
+            title="⚠️ Sinkronisasi Tidak Tersedia",
+            description="Sinkronisasi hanya dijalankan oleh proses leader katalog.",
+            color=discord.Color.orange()
+        )
+    await ctx.send(embed=embed)
 
 # Command help
 @bot.command(name="help")
@@ -326,13 +949,19 @@ async def help_command(ctx):
     # Tambahkan field untuk setiap kategori command
     embed.add_field(
         name="🔍 **PENCARIAN ITEM**",
-        value="```css\n*recipe [nama_item] - Cari recipe item tertentu\n*search [keyword] - Cari item berdasarkan kata kunci\n*iteminfo [nama_item] - Info lengkap tentang item```",
+        value="```css\n*recipe [nama_item] - Cari recipe item tertentu\n*recipe [item1, item2, ...] - Beberapa item sekaligus (juga *iteminfo)\n*tree [nama_item] - Pohon crafting sampai bahan dasar\n*cost [jumlah] [nama_item] - Total bahan dasar untuk sejumlah item\n*uses [nama_item] [halaman] - Item yang memakai bahan ini\n*search [keyword] - Cari item berdasarkan kata kunci\n*iteminfo [nama_item] - Info lengkap tentang item```",
+        inline=False
+    )
+
+    embed.add_field(
+        name="⚡ **SLASH COMMAND**",
+        value="```css\n/recipe, /iteminfo, /search - Sama seperti di atas, dengan autocomplete nama item```",
         inline=False
     )
     
     embed.add_field(
         name="📊 **STATISTIK & INFO**",
-        value="```fix\n*help - Menampilkan menu bantuan ini\n*stats - Statistik bot (coming soon)```",
+        value="```fix\n*help - Menampilkan menu bantuan ini\n*stats - Statistik performa bot\n*sync - Sinkronkan items.json sekarang (admin)```",
         inline=False
     )
     
@@ -359,6 +988,13 @@ async def on_command_error(ctx, error):
             color=discord.Color.red()
         )
         await ctx.send(embed=embed)
+    elif isinstance(error, commands.MissingPermissions):
+        embed = discord.Embed(
+            title="🔒 Akses Ditolak",
+            description="Command ini hanya untuk admin server.",
+            color=discord.Color.red()
+        )
+        await ctx.send(embed=embed)
     elif isinstance(error, commands.CheckFailure):
         # Jangan kirim pesan error untuk channel yang tidak diizinkan
         # karena sudah dikirim di channel_check
@@ -373,13 +1009,17 @@ async def on_command_error(ctx, error):
 
 # Jalankan bot
 if __name__ == "__main__":
-    # Inisialisasi database pertama
-    initialize_database()
-    
-    # Jalankan item_parser di thread terpisah (akan berjalan setiap 24 jam)
-    parser_thread = threading.Thread(target=run_item_parser_periodically, daemon=True)
-    parser_thread.start()
-    print("✅ Item parser thread started")
+    # Inisialisasi database pertama; shard non-leader cukup memetakan snapshot leader
+    if CATALOG_SERVICE_ADDRESS:
+        try:
+            info = catalog.ping()
+            print(f"✅ Catalog service {CATALOG_SERVICE_ADDRESS}: {info['items']} items (revisi {info['revision']})")
+        except CatalogServiceError as e:
+            print(f"⚠️ {e}")
+    elif CATALOG_LEADER:
+        initialize_database()
+    elif not refresh_shared_catalog():
+        print(f"⏳ Menunggu leader menerbitkan snapshot katalog ({CATALOG_SNAPSHOT_FILE})")
     
     token = os.getenv("DISCORD_BOT_TOKEN")
 
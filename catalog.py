@@ -0,0 +1,815 @@
+import gc
+import sys
+import threading
+from contextlib import contextmanager
+from array import array
+from bisect import bisect_left, insort
+from itertools import accumulate
+from catalog_snapshot import CATALOG_SNAPSHOT_FILE, SnapshotError, read_snapshot, write_snapshot
+from database import get_all_item_rows, get_catalog_revision
+from fuzzy import FuzzyMatcher
+from recipe_graph import CostTable, RecipeAnalysis, RecipeGraph, parse_recipe
+
+def normalize_name(name):
+    """Normalisasi nama item untuk key index (lowercase, spasi dirapikan)"""
+    return " ".join(str(name).split()).lower()
+
+ITEM_FIELDS = ('id', 'name', 'tier', 'recipe', 'image_url')
+
+class Item:
+    """
+    Record item ringkas di katalog: __slots__ tanpa dict per objek, nama dan recipe
+    di-intern sehingga string yang sama dipakai bersama oleh semua index.
+    Tetap bisa dibaca seperti dict (item['name'], item.get('tier')) oleh embed bot.
+    """
+
+    __slots__ = ITEM_FIELDS + ('key',)
+
+    def __init__(self, item_id, name, tier, recipe, image_url=None):
+        self.id = item_id
+        self.name = sys.intern(name)
+        # Nama yang dinormalisasi, dipakai sebagai key di semua index
+        self.key = sys.intern(normalize_name(name))
+        self.tier = tier
+        self.recipe = sys.intern(recipe) if isinstance(recipe, str) else recipe
+        self.image_url = image_url
+
+    def __getitem__(self, field):
+        if field not in ITEM_FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in ITEM_FIELDS else default
+
+    def keys(self):
+        return ITEM_FIELDS
+
+    def __repr__(self):
+        return f"Item({self.id!r}, {self.name!r})"
+
+def _row_to_item(row):
+    """Konversi row (id, name, tier, recipe, image_url) ke Item"""
+    return Item(*row)
+
+def _tier_sort_key(item):
+    """Urutkan berdasarkan tier (tier tidak diketahui di akhir), lalu nama"""
+    tier = item.tier
+    return (tier if tier else float('inf'), item.name)
+
+def _item_id(item):
+    return item.id
+
+def _item_name(item):
+    # Nama unik (key hasil normalisasi unik), jadi urutannya sama dengan name_order
+    return item.name
+
+def _sorted_contains(keys, key):
+    index = bisect_left(keys, key)
+    return index < len(keys) and keys[index] == key
+
+def _patch_worthwhile(changes, size):
+    """Perubahan kecil ditambal pada index lama; yang besar lebih murah dibangun ulang"""
+    return changes <= max(16, size // 64)
+
+def _bisect_by(order, value, sort_key):
+    """bisect_left atas list terurut berdasarkan sort_key(elemen)"""
+    low, high = 0, len(order)
+    while low < high:
+        middle = (low + high) // 2
+        if sort_key(order[middle]) < value:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+def _patched_order(order, old_items, new_items, sort_key):
+    """Salinan list terurut (sort_key unik per item) dengan old_items diganti new_items"""
+    order = list(order)
+    for item in old_items:
+        index = _bisect_by(order, sort_key(item), sort_key)
+        if index < len(order) and order[index] is item:
+            del order[index]
+    for item in new_items:
+        order.insert(_bisect_by(order, sort_key(item), sort_key), item)
+    return order
+
+def _name_order_key(item):
+    # Sama dengan sort stabil berdasarkan nama atas urutan id
+    return item.name, item.id
+
+def _index_uses(uses, item, add):
+    """
+    Tambah/hapus item dari reverse index bahan -> tuple id item.
+    Tuple selalu dibuat baru agar pembaca index lama tidak terpengaruh.
+    """
+    for ingredient in set(map(normalize_name, parse_recipe(item.recipe))):
+        ids = uses.get(ingredient, ())
+        if add:
+            if item.id not in ids:
+                uses[sys.intern(ingredient)] = ids + (item.id,)
+        elif item.id in ids:
+            ids = tuple(item_id for item_id in ids if item_id != item.id)
+            if ids:
+                uses[ingredient] = ids
+            else:
+                del uses[ingredient]
+
+def _downstream(uses, by_id, changed_keys, changed_ids):
+    """
+    Id item yang vektor bahan dasarnya bisa berubah: item yang berubah dan semua item
+    yang (secara transitif) memakai salah satu nama yang berubah di recipe-nya
+    """
+    dirty = {item_id for item_id in changed_ids if item_id in by_id}
+    pending = list(changed_keys)
+    seen = set(pending)
+    while pending:
+        for item_id in uses.get(pending.pop(), ()):
+            item = by_id.get(item_id)
+            if item is None or item_id in dirty:
+                continue
+            dirty.add(item_id)
+            if item.key not in seen:
+                seen.add(item.key)
+                pending.append(item.key)
+    return dirty
+
+# Posisi akhiran kata dikodekan sebagai (indeks nama << 16) | offset karakter
+WORD_OFFSET_BITS = 16
+WORD_OFFSET_MASK = (1 << WORD_OFFSET_BITS) - 1
+
+def _build_prefix_index(by_name):
+    """
+    Array terurut untuk autocomplete dengan bisect: nama lengkap yang dinormalisasi,
+    dan setiap akhiran yang dimulai di batas kata ('barn door' -> 'door'). Akhiran
+    tidak disimpan sebagai string, hanya sebagai posisi di array('q').
+    """
+    prefix_keys = sorted(by_name)
+    suffixes = []
+    for position, key in enumerate(prefix_keys):
+        start = key.find(" ")
+        while start != -1 and start < WORD_OFFSET_MASK:
+            suffixes.append((key[start + 1:], position << WORD_OFFSET_BITS | start + 1))
+            start = key.find(" ", start + 1)
+    suffixes.sort()
+    return prefix_keys, array('q', [code for _, code in suffixes])
+
+def _patched_prefix_index(prefix_index, by_name, old_keys, new_keys):
+    """
+    Index prefix generasi baru dari index lama: hanya key yang hilang (old_keys yang tidak
+    lagi ada di by_name) dan key baru yang diubah, akhiran item lain dipakai ulang dengan
+    posisinya digeser. Perubahan besar dibangun ulang penuh.
+    """
+    prefix_keys, word_codes = prefix_index
+    removed = sorted({key for key in old_keys if key not in by_name})
+    removed = [key for key in removed if _sorted_contains(prefix_keys, key)]
+    added = sorted({key for key in new_keys if key in by_name and not _sorted_contains(prefix_keys, key)})
+    if not removed and not added:
+        return prefix_index
+    if not _patch_worthwhile(len(removed) + len(added), len(prefix_keys)):
+        return _build_prefix_index(by_name)
+
+    # Geseran posisi setiap key lama (sudah dalam satuan code): +1 untuk setiap key baru
+    # yang disisipkan sebelumnya, -1 untuk setiap key yang dihapus sebelumnya
+    steps = [0] * (len(prefix_keys) + 1)
+    for key in added:
+        steps[bisect_left(prefix_keys, key)] += 1 << WORD_OFFSET_BITS
+    gone = set()
+    for key in removed:
+        position = bisect_left(prefix_keys, key)
+        gone.add(position)
+        steps[position + 1] -= 1 << WORD_OFFSET_BITS
+    shifts = list(accumulate(steps))
+    keys = [key for position, key in enumerate(prefix_keys) if position not in gone] if gone else list(prefix_keys)
+    for key in added:
+        insort(keys, key)
+    if gone:
+        codes = array('q', [
+            code + shifts[code >> WORD_OFFSET_BITS] for code in word_codes
+            if code >> WORD_OFFSET_BITS not in gone
+        ])
+    else:
+        codes = array('q', [code + shifts[code >> WORD_OFFSET_BITS] for code in word_codes])
+
+    for key in added:
+        position = bisect_left(keys, key)
+        start = key.find(" ")
+        while start != -1 and start < WORD_OFFSET_MASK:
+            code = position << WORD_OFFSET_BITS | start + 1
+            entry = (key[start + 1:], code)
+            # Urutan sama dengan _build_prefix_index: (akhiran, code)
+            low, high = 0, len(codes)
+            while low < high:
+                middle = (low + high) // 2
+                other = codes[middle]
+                if (keys[other >> WORD_OFFSET_BITS][other & WORD_OFFSET_MASK:], other) < entry:
+                    low = middle + 1
+                else:
+                    high = middle
+            codes.insert(low, code)
+            start = key.find(" ", start + 1)
+    return keys, codes
+
+def _prefix_range(keys, prefix, limit):
+    """Posisi (di array terurut keys) maksimal limit nama yang diawali prefix"""
+    result = []
+    index = bisect_left(keys, prefix)
+    while index < len(keys) and len(result) < limit:
+        if not keys[index].startswith(prefix):
+            break
+        result.append(index)
+        index += 1
+    return result
+
+def _word_range(keys, word_codes, prefix, limit):
+    """Posisi maksimal limit nama yang salah satu katanya (selain kata pertama) diawali prefix"""
+    low, high = 0, len(word_codes)
+    while low < high:
+        middle = (low + high) // 2
+        code = word_codes[middle]
+        if keys[code >> WORD_OFFSET_BITS][code & WORD_OFFSET_MASK:] < prefix:
+            low = middle + 1
+        else:
+            high = middle
+    result = []
+    while low < len(word_codes) and len(result) < limit:
+        code = word_codes[low]
+        if not keys[code >> WORD_OFFSET_BITS].startswith(prefix, code & WORD_OFFSET_MASK):
+            break
+        result.append(code >> WORD_OFFSET_BITS)
+        low += 1
+    return result
+
+def _autocomplete_positions(keys, word_codes, prefix, limit):
+    """Posisi nama untuk autocomplete: prefix nama lengkap dulu, lalu prefix kata di tengah nama"""
+    prefix = normalize_name(prefix)
+    if not prefix:
+        return list(range(min(limit, len(keys))))
+    positions = _prefix_range(keys, prefix, limit)
+    if len(positions) < limit:
+        seen = set(positions)
+        for position in _word_range(keys, word_codes, prefix, limit * 2):
+            if position not in seen:
+                seen.add(position)
+                positions.append(position)
+                if len(positions) >= limit:
+                    break
+    return positions
+
+# Penanda tier kosong di kolom array('q') snapshot
+SNAPSHOT_NO_TIER = -(1 << 63)
+
+# Jumlah bahan terbesar yang muat di array('q') snapshot; vektor dengan jumlah lebih
+# besar ditulis kosong dan dihitung ulang oleh pembaca saat diminta
+SNAPSHOT_MAX_QUANTITY = (1 << 63) - 1
+
+class _StringTable:
+    """Tabel string unik untuk snapshot; referensi berupa indeks (-1 untuk None)"""
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, text):
+        if text is None:
+            return -1
+        position = self.index.get(text)
+        if position is None:
+            position = self.index[text] = len(self.strings)
+            self.strings.append(text)
+        return position
+
+def _csr(groups, typecode='i'):
+    """List of list integer -> (offsets, values) bergaya CSR dalam array"""
+    offsets = array('i', [0])
+    values = array(typecode)
+    for group in groups:
+        values.extend(group)
+        offsets.append(len(values))
+    return offsets, values
+
+@contextmanager
+def _gc_paused():
+    """
+    Matikan GC siklik selama membuat ratusan ribu objek sekaligus; objek index
+    tidak membentuk siklus, jadi pass GC di tengah pembuatan hanya membuang waktu
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+class _Generation:
+    """
+    Satu generasi lengkap index katalog. Tidak diubah setelah dipasang (kecuali cache
+    memo di graph yang hanya bertambah): reload dan diff membangun generasi baru di
+    samping, lalu Catalog menukar satu pointer. Pembaca mengambil pointer sekali per
+    panggilan, jadi selalu melihat satu generasi yang konsisten sampai selesai.
+    """
+
+    __slots__ = ('version', 'revision', 'by_id', 'by_name', 'id_order', 'name_order', 'uses',
+                 'fuzzy', 'graph', 'costs', 'analysis', 'prefix_index')
+
+def _index_generation(version, revision, by_id, by_name, uses, fuzzy, previous=None, dirty=None, changed=None):
+    """
+    Bangun index turunan dan rakit generasi baru (belum dipasang). Dengan previous,
+    dirty dan changed (id item yang ditambah, diubah atau dihapus), index generasi
+    sebelumnya ditambal alih-alih dibangun ulang.
+    """
+    if previous is not None and dirty is not None and changed is not None:
+        return _patched_generation(version, revision, by_id, by_name, uses, fuzzy, previous, dirty, changed)
+    generation = _Generation()
+    generation.version = version
+    # Revisi database yang dicerminkan generasi ini (None jika tidak diketahui)
+    generation.revision = revision
+    generation.by_id = by_id
+    generation.by_name = by_name
+    generation.uses = uses
+    generation.fuzzy = fuzzy
+    # Urutan berdasarkan id dipakai untuk partial match (sama seperti rowid SQLite),
+    # urutan berdasarkan nama dipakai untuk hasil pencarian
+    by_id_order = sorted(by_id.values(), key=lambda item: item.id)
+    generation.id_order = by_id_order
+    generation.name_order = sorted(by_id_order, key=lambda item: item.name)
+    generation.graph = RecipeGraph(by_id_order, normalize_name)
+    # Vektor bahan dasar serta tier turunan dan kedalaman: dihitung penuh,
+    # atau hanya untuk item kotor (dirty) dengan sisanya diambil dari generasi sebelumnya
+    generation.costs = CostTable(generation.graph, previous and previous.costs, dirty)
+    tiers = {item.id: item.tier for item in by_id_order}
+    generation.analysis = RecipeAnalysis(generation.graph, tiers, previous and previous.analysis, dirty)
+    generation.prefix_index = _build_prefix_index(by_name)
+    return generation
+
+def _patched_generation(version, revision, by_id, by_name, uses, fuzzy, previous, dirty, changed):
+    generation = _Generation()
+    generation.version = version
+    generation.revision = revision
+    generation.by_id = by_id
+    generation.by_name = by_name
+    generation.uses = uses
+    generation.fuzzy = fuzzy
+    old_items = [previous.by_id[item_id] for item_id in changed if item_id in previous.by_id]
+    new_items = [by_id[item_id] for item_id in changed if item_id in by_id]
+    if _patch_worthwhile(len(changed), len(by_id)):
+        generation.id_order = _patched_order(previous.id_order, old_items, new_items, _item_id)
+        generation.name_order = _patched_order(previous.name_order, old_items, new_items, _name_order_key)
+    else:
+        generation.id_order = sorted(by_id.values(), key=_item_id)
+        generation.name_order = sorted(generation.id_order, key=_item_name)
+
+    # Graph ditambal: edge item kotor di-resolve ulang dan SCC dihitung ulang hanya di
+    # sekitarnya; item yang komponennya berubah ikut dihitung ulang vektor dan tier-nya
+    def resolve(name):
+        item = by_name.get(normalize_name(name))
+        return item.id if item is not None else None
+
+    removed_ids = [item_id for item_id in changed if item_id not in by_id]
+    generation.graph, affected = previous.graph.patched(
+        sorted((by_id[item_id] for item_id in dirty), key=_item_id), removed_ids, resolve
+    )
+    # Id yang dihapus ikut dianggap kotor agar hasil lamanya dibuang
+    dirty = dirty | affected
+    dirty.update(removed_ids)
+    generation.costs = CostTable(generation.graph, previous.costs, dirty)
+    tiers = dict(previous.analysis.tiers)
+    for item_id in removed_ids:
+        tiers.pop(item_id, None)
+    for item in new_items:
+        tiers[item.id] = item.tier
+    generation.analysis = RecipeAnalysis(generation.graph, tiers, previous.analysis, dirty)
+    generation.prefix_index = _patched_prefix_index(
+        previous.prefix_index, by_name, [item.key for item in old_items], [item.key for item in new_items]
+    )
+    return generation
+
+class Catalog:
+    """
+    Index item di memori, dimuat sekali dari database dan melayani semua lookup bot.
+    Semua index berada di satu generasi (_Generation) yang ditukar secara atomik;
+    lock hanya dipakai antar penulis, pembaca tidak pernah menunggu.
+    """
+
+    def __init__(self, rows=(), revision=None):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._generation = self._build(rows, revision)
+
+    @property
+    def version(self):
+        """Nomor generasi, naik setiap kali isi katalog berubah; dipakai untuk invalidasi cache embed"""
+        return self._generation.version
+
+    @property
+    def revision(self):
+        """Revisi database yang dicerminkan katalog (None jika tidak diketahui)"""
+        return self._generation.revision
+
+    def _next_version(self):
+        generation = self._generation
+        return generation.version + 1 if generation is not None else 1
+
+    def _build(self, rows, revision):
+        """Bangun generasi baru dari row database (belum dipasang)"""
+        by_id = {}
+        by_name = {}
+        for row in rows:
+            item = _row_to_item(row)
+            by_id[item.id] = item
+            by_name[item.key] = item
+        fuzzy = FuzzyMatcher((key, item.name) for key, item in by_name.items())
+        uses = {}
+        for item in by_id.values():
+            _index_uses(uses, item, add=True)
+        return _index_generation(self._next_version(), revision, by_id, by_name, uses, fuzzy)
+
+    @classmethod
+    def load(cls):
+        """Muat katalog dari database"""
+        # Revisi dibaca sebelum rows: jika ada penulisan di antaranya, snapshot
+        # dari katalog ini hanya dianggap basi (aman), bukan sebaliknya
+        revision = get_catalog_revision()
+        return cls(get_all_item_rows(), revision)
+
+    def reload(self):
+        """
+        Muat ulang seluruh index dari database. Generasi baru dibangun di samping;
+        selama itu pembaca tetap dilayani generasi lama, lalu pointer ditukar sekali.
+        """
+        revision = get_catalog_revision()
+        rows = get_all_item_rows()
+        with self._lock:
+            self._generation = self._build(rows, revision)
+        print(f"✅ Catalog loaded: {len(self)} items")
+        return len(self)
+
+    def _apply(self, upserts, removed_ids, revision):
+        # Copy-on-write: semua index diubah pada salinan untuk generasi baru, pembaca
+        # tetap memakai generasi lama sampai generasi baru dipasang.
+        # Index fuzzy diperbarui per item, bukan dibangun ulang.
+        # Reverse index bahan -> item hanya diubah untuk bahan yang tersentuh.
+        with self._lock:
+            current = self._generation
+            by_id = dict(current.by_id)
+            by_name = dict(current.by_name)
+            uses = dict(current.uses)
+            fuzzy = current.fuzzy.copy()
+            changed_keys = set()
+            changed_ids = set(removed_ids)
+            for item_id in removed_ids:
+                old = by_id.pop(item_id, None)
+                if old is not None:
+                    changed_keys.add(old.key)
+                    by_name.pop(old.key, None)
+                    fuzzy.remove(old.key)
+                    _index_uses(uses, old, add=False)
+            for row in upserts:
+                item = _row_to_item(row)
+                old = by_id.get(item.id)
+                if old is not None:
+                    changed_keys.add(old.key)
+                    by_name.pop(old.key, None)
+                    fuzzy.remove(old.key)
+                    _index_uses(uses, old, add=False)
+                by_id[item.id] = item
+                by_name[item.key] = item
+                changed_keys.add(item.key)
+                changed_ids.add(item.id)
+                fuzzy.add(item.key, item.name)
+                _index_uses(uses, item, add=True)
+            # Hanya item di hilir perubahan yang vektor bahan dan tier turunannya dihitung ulang
+            dirty = _downstream(uses, by_id, changed_keys, changed_ids)
+            self._generation = _index_generation(
+                current.version + 1, revision, by_id, by_name, uses, fuzzy, current, dirty, changed_ids
+            )
+
+    def upsert(self, item_id, name, tier, recipe, image_url=None):
+        """Tambah atau perbarui satu item di index"""
+        self._apply([(item_id, name, tier, recipe, image_url)], [], self.revision)
+
+    def apply_diff(self, diff):
+        """
+        Terapkan diff dari items_parser.sync_items ke index tanpa reload penuh.
+        Diff yang contohnya terpotong (complete False) tidak memuat semua item yang
+        berubah, jadi katalog dimuat ulang dari database.
+        """
+        if diff.get("skipped"):
+            return
+        if not diff.get("complete", True):
+            self.reload()
+            return
+        upserts = [
+            (item['id'], item['name'], item['tier'], item['recipe'], item['image_url'])
+            for item in diff.get("added", []) + diff.get("modified", [])
+        ]
+        self._apply(upserts, [item['id'] for item in diff.get("removed", [])], diff.get("revision"))
+
+    def snapshot_sections(self):
+        """
+        Ekspor item, index nama, index autocomplete, index fuzzy, reverse index
+        bahan dan graph recipe ke section array untuk catalog_snapshot.
+        Urutan item (urutan id) menjadi nomor posisi yang dirujuk section lain.
+        Nama, key, trigram dan key reverse index disimpan sebagai tabel string
+        tersendiri (terurut untuk bisect) agar bisa dibaca langsung oleh SharedCatalog.
+        """
+        # Satu generasi dibaca utuh, tanpa lock: penulis tidak pernah mengubahnya
+        generation = self._generation
+        items = generation.id_order
+        by_name = generation.by_name
+        strings = _StringTable()
+        position = {item.id: index for index, item in enumerate(items)}
+        key_position = {item.key: index for index, item in enumerate(items)}
+        prefix_keys, word_codes = generation.prefix_index
+        name_order = array('i', [position[item.id] for item in generation.name_order])
+        name_rank = array('i', [0]) * len(items)
+        for rank, index in enumerate(name_order):
+            name_rank[index] = rank
+
+        sections = {
+            'ids': array('q', [item.id for item in items]),
+            'tiers': array('q', [SNAPSHOT_NO_TIER if item.tier is None else item.tier for item in items]),
+            'names': [item.name for item in items],
+            'keys': [item.key for item in items],
+            'recipes': array('i', [strings.add(item.recipe) for item in items]),
+            'images': array('i', [strings.add(item.image_url) for item in items]),
+            'name_order': name_order,
+            'name_rank': name_rank,
+            'prefix_order': array('i', [position[by_name[key].id] for key in prefix_keys]),
+            'word_codes': word_codes
+        }
+
+        fuzzy = sorted(generation.fuzzy.iter_postings())
+        sections['fuzzy_grams'] = [gram for gram, _ in fuzzy]
+        sections['fuzzy_offsets'], sections['fuzzy_slots'] = _csr(
+            [key_position[key] for key in keys] for _, keys in fuzzy
+        )
+
+        uses = sorted(generation.uses.items())
+        sections['uses_keys'] = [key for key, _ in uses]
+        sections['uses_offsets'], sections['uses_ids'] = _csr((ids for _, ids in uses), 'q')
+
+        # Edge recipe berupa id bahan; bahan yang tidak dikenal ditulis 0 di
+        # 'edges' dan dicatat terpisah sebagai (indeks edge, indeks string nama)
+        graph = generation.graph
+        edge_offsets = array('i', [0])
+        edges = array('q')
+        unknown = array('i')
+        for item in items:
+            for child in graph.ingredients[item.id]:
+                if type(child) is not int:
+                    unknown.extend((len(edges), strings.add(child)))
+                    child = 0
+                edges.append(child)
+            edge_offsets.append(len(edges))
+        sections['edge_offsets'] = edge_offsets
+        sections['edges'] = edges
+        sections['edge_unknown'] = unknown
+        sections['component'] = array('q', [graph.component[item.id] for item in items])
+        sections['cyclic'] = array('q', sorted(graph.cyclic))
+        # Tier turunan dan kedalaman (hasil analisis recipe) per item
+        analysis = generation.analysis
+        derived_tiers = (analysis.tier(item.id) for item in items)
+        sections['derived_tiers'] = array('q', [SNAPSHOT_NO_TIER if tier is None else tier for tier in derived_tiers])
+        sections['depths'] = array('i', [analysis.depth(item.id) for item in items])
+        # Vektor bahan dasar (indeks bahan, jumlah, ...) per item, CSR dalam urutan id
+        costs = generation.costs
+        cost_offsets = array('i', [0])
+        cost_vectors = array('q')
+        for item in items:
+            vector = costs.vector(item.id)
+            if max(vector[1::2]) <= SNAPSHOT_MAX_QUANTITY:
+                cost_vectors.extend(vector)
+            cost_offsets.append(len(cost_vectors))
+        sections['cost_offsets'] = cost_offsets
+        sections['cost_vectors'] = cost_vectors
+        # Setelah semua vektor dihitung: vektor yang baru dihitung bisa menambah bahan
+        sections['cost_bases'] = array('i', [strings.add(name) for name in costs.bases])
+        sections['strings'] = strings.strings
+        return generation.revision, sections
+
+    def _restore(self, sections, revision):
+        """Pasang semua index dari section snapshot sebagai generasi baru tanpa membangun ulang"""
+        strings = sections['strings']
+        ids = sections['ids']
+
+        # String dari tabel snapshot sudah dipakai bersama oleh semua index;
+        # indeks -1 menunjuk ke None di akhir list
+        strings.append(None)
+        ids = ids.tolist()
+        names = sections['names']
+        keys = sections['keys']
+        tiers = [None if tier == SNAPSHOT_NO_TIER else tier for tier in sections['tiers']]
+        recipes = [strings[index] for index in sections['recipes']]
+        images = [strings[index] for index in sections['images']]
+
+        new_item = Item.__new__
+        items = []
+        append = items.append
+        for item_id, name, key, tier, recipe, image in zip(ids, names, keys, tiers, recipes, images):
+            item = new_item(Item)
+            item.id = item_id
+            item.name = name
+            item.key = key
+            item.tier = tier
+            item.recipe = recipe
+            item.image_url = image
+            append(item)
+        by_id = dict(zip(ids, items))
+        by_name = dict(zip(keys, items))
+
+        fuzzy_offsets = sections['fuzzy_offsets']
+        fuzzy_slots = sections['fuzzy_slots']
+        postings = {
+            gram: fuzzy_slots[start:stop]
+            for gram, start, stop in zip(sections['fuzzy_grams'], fuzzy_offsets, fuzzy_offsets[1:])
+        }
+        fuzzy = FuzzyMatcher.from_postings(keys, names, postings)
+
+        uses_offsets = sections['uses_offsets']
+        uses_ids = sections['uses_ids'].tolist()
+        uses = {
+            key: tuple(uses_ids[start:stop])
+            for key, start, stop in zip(sections['uses_keys'], uses_offsets, uses_offsets[1:])
+        }
+
+        edge_offsets = sections['edge_offsets']
+        edges = sections['edges']
+        unknown = sections['edge_unknown']
+        if unknown:
+            edges = edges.tolist()
+            for edge, name in zip(unknown[::2], unknown[1::2]):
+                edges[edge] = strings[name]
+        ingredients = {
+            item_id: tuple(edges[start:stop])
+            for item_id, start, stop in zip(ids, edge_offsets, edge_offsets[1:])
+        }
+        graph = RecipeGraph.from_parts(
+            dict(zip(ids, names)), ingredients, dict(zip(ids, sections['component'])), set(sections['cyclic'])
+        )
+
+        name_order = [items[position] for position in sections['name_order']]
+        prefix_keys = [keys[position] for position in sections['prefix_order']]
+        # Vektor bahan dasar dari snapshot; vektor yang tidak tersimpan dihitung saat diminta
+        cost_offsets = sections['cost_offsets']
+        cost_vectors = sections['cost_vectors'].tolist()
+        vectors = {
+            item_id: tuple(cost_vectors[start:stop])
+            for item_id, start, stop in zip(ids, cost_offsets, cost_offsets[1:]) if start != stop
+        }
+        costs = CostTable.from_parts(graph, [strings[index] for index in sections['cost_bases']], vectors)
+        derived = zip((None if tier == SNAPSHOT_NO_TIER else tier for tier in sections['derived_tiers']), sections['depths'])
+        analysis = RecipeAnalysis.from_parts(graph, dict(zip(ids, tiers)), dict(zip(ids, derived)))
+        generation = _Generation()
+        generation.revision = revision
+        generation.fuzzy = fuzzy
+        generation.uses = uses
+        generation.by_id = by_id
+        generation.by_name = by_name
+        generation.id_order = items
+        generation.name_order = name_order
+        generation.graph = graph
+        generation.costs = costs
+        generation.analysis = analysis
+        generation.prefix_index = (prefix_keys, sections['word_codes'])
+        with self._lock:
+            generation.version = self._next_version()
+            self._generation = generation
+
+    def save_snapshot(self, path=CATALOG_SNAPSHOT_FILE):
+        """Tulis snapshot biner katalog (return ukuran file, atau None jika revisi tidak diketahui)"""
+        revision, sections = self.snapshot_sections()
+        if revision is None:
+            return None
+        return write_snapshot(path, revision, sections)
+
+    def load_snapshot(self, path=CATALOG_SNAPSHOT_FILE, expected_revision=None):
+        """
+        Muat katalog dari snapshot biner. expected_revision: revisi database saat ini;
+        snapshot dengan revisi lain dianggap basi. Melempar SnapshotError jika tidak valid.
+        """
+        revision, sections = read_snapshot(path, expected_revision)
+        try:
+            with _gc_paused():
+                self._restore(sections, revision)
+        except (KeyError, IndexError, TypeError) as e:
+            raise SnapshotError(f"isi snapshot tidak konsisten: {e}") from e
+        return len(self)
+
+    def __len__(self):
+        return len(self._generation.by_id)
+
+    def __contains__(self, item_name):
+        return normalize_name(item_name) in self._generation.by_name
+
+    def get_by_id(self, item_id):
+        """Dapatkan item berdasarkan id"""
+        return self._generation.by_id.get(item_id)
+
+    def get_item_details(self, item_name):
+        """Dapatkan detail item dengan nama persis (case-insensitive)"""
+        return self._generation.by_name.get(normalize_name(item_name))
+
+    def lookup_items(self, item_names, k=3):
+        """
+        Lookup banyak nama sekaligus dalam satu lintasan (satu versi index).
+        Return list (item, saran) sesuai urutan; item None dan saran fuzzy untuk nama yang tidak ditemukan
+        """
+        generation = self._generation
+        by_name = generation.by_name
+        fuzzy = generation.fuzzy
+        results = []
+        for item_name in item_names:
+            key = normalize_name(item_name)
+            item = by_name.get(key)
+            results.append((item, [] if item is not None else fuzzy.suggest(key, k=k)))
+        return results
+
+    def _containing(self, generation, keyword):
+        """
+        Item yang key-nya memuat keyword (sudah dinormalisasi), tanpa urutan tertentu.
+        Dicari lewat posting list trigram index fuzzy; keyword di bawah 3 karakter
+        memakai scan linear.
+        """
+        slots = generation.fuzzy.containing(keyword)
+        if slots is None:
+            return [item for item in generation.id_order if keyword in item.key]
+        by_name = generation.by_name
+        keys = generation.fuzzy.keys_for(slots)
+        return [by_name[key] for key in keys if key in by_name]
+
+    def get_recipe(self, item_name):
+        """Mendapatkan recipe item: exact match dulu, lalu partial match (id terkecil)"""
+        generation = self._generation
+        keyword = normalize_name(item_name)
+        item = generation.by_name.get(keyword)
+        if item is None:
+            item = min(self._containing(generation, keyword), key=_item_id, default=None)
+        return item.recipe if item else None
+
+    def search_items(self, keyword):
+        """Cari item berdasarkan kata kunci, hasil berupa (id, name) urut nama"""
+        items = self._containing(self._generation, normalize_name(keyword))
+        items.sort(key=_item_name)
+        return [(item.id, item.name) for item in items]
+
+    def suggest(self, item_name, k=5):
+        """Saran nama item terdekat (toleran typo) untuk miss path *recipe"""
+        return self._generation.fuzzy.suggest(normalize_name(item_name), k=k)
+
+    def autocomplete(self, prefix, limit=25):
+        """
+        Saran nama item untuk autocomplete (bisect atas array terurut, tanpa SQLite):
+        prefix nama lengkap dulu, lalu prefix kata di tengah nama
+        """
+        generation = self._generation
+        by_name = generation.by_name
+        prefix_keys, word_codes = generation.prefix_index
+        keys = [prefix_keys[index] for index in _autocomplete_positions(prefix_keys, word_codes, prefix, limit)]
+        return [by_name[key].name for key in keys if key in by_name]
+
+    def recipe_tree(self, item_name):
+        """
+        Ekspansi pohon crafting item sampai bahan dasar (memoized di RecipeGraph).
+        Kedalaman dan tier turunan diambil dari analisis recipe yang sudah dihitung.
+        Return dict {item, lines, base, depth, derived_tier} atau None jika item tidak ditemukan
+        """
+        generation = self._generation
+        item = generation.by_name.get(normalize_name(item_name))
+        if item is None:
+            return None
+        analysis = generation.analysis
+        return {
+            'item': item,
+            'lines': generation.graph.tree_lines(item.id),
+            'base': generation.costs.cost(item.id),
+            'depth': analysis.depth(item.id),
+            'derived_tier': analysis.tier(item.id)
+        }
+
+    def recipe_analysis(self):
+        """Hasil validasi recipe terakhir (RecipeAnalysis: cycles, unknown, mismatches, dsb.)"""
+        return self._generation.analysis
+
+    def recipe_cost(self, item_name, quantity=1):
+        """
+        Kebutuhan bahan dasar untuk membuat quantity item (vektor yang sudah dihitung
+        dikali quantity). Return dict {item, quantity, base} atau None jika item tidak ditemukan
+        """
+        generation = self._generation
+        item = generation.by_name.get(normalize_name(item_name))
+        if item is None:
+            return None
+        return {'item': item, 'quantity': quantity, 'base': generation.costs.cost(item.id, quantity)}
+
+    def uses(self, item_name):
+        """Item yang memakai bahan ini di recipe-nya, urut tier lalu nama"""
+        generation = self._generation
+        by_id = generation.by_id
+        ids = generation.uses.get(normalize_name(item_name), ())
+        return sorted((by_id[item_id] for item_id in ids if item_id in by_id), key=_tier_sort_key)
+
+    def all_items(self):
+        """Dapatkan semua item sebagai (id, name) urut nama"""
+        return [(item.id, item.name) for item in self._generation.name_order]
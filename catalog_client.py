@@ -0,0 +1,217 @@
+import os
+import queue
+import socket
+import threading
+from contextlib import contextmanager
+from catalog_protocol import (CATALOG_SERVICE_ADDRESS, DEFAULT_SERVICE_ADDRESS, FRAME, MAX_FRAME_SIZE, OPCODES,
+                              STATUS_OK, ProtocolError, decode_value, encode_frame, parse_address)
+from metrics import metrics
+
+# Jumlah koneksi socket per proses bot dan batas waktu satu request (detik)
+CATALOG_CLIENT_POOL_SIZE = int(os.getenv("CATALOG_CLIENT_POOL_SIZE", "4"))
+CATALOG_CLIENT_TIMEOUT = float(os.getenv("CATALOG_CLIENT_TIMEOUT", "10"))
+
+class CatalogServiceError(Exception):
+    """Catalog service tidak bisa dihubungi atau mengembalikan error"""
+
+class ServiceConnection:
+    """Satu koneksi socket blocking ke catalog service"""
+
+    def __init__(self, address, timeout=CATALOG_CLIENT_TIMEOUT):
+        kind, target = parse_address(address)
+        if kind == "unix":
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(target)
+        except OSError:
+            self._sock.close()
+            raise
+        self._buffer = bytearray()
+        self._next_id = 0
+
+    def _read_exactly(self, size):
+        while len(self._buffer) < size:
+            chunk = self._sock.recv(max(size - len(self._buffer), 1 << 16))
+            if not chunk:
+                raise ConnectionError("Koneksi ditutup oleh catalog service")
+            self._buffer += chunk
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def roundtrip(self, calls, timeout=CATALOG_CLIENT_TIMEOUT):
+        """
+        Kirim semua request (operasi, args) dalam satu write (pipelining), lalu baca
+        semua response. Return list (status, nilai) sesuai urutan calls.
+        """
+        self._sock.settimeout(timeout)
+        frames = []
+        ids = []
+        for operation, args in calls:
+            self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+            ids.append(self._next_id)
+            frames.append(encode_frame(self._next_id, OPCODES[operation], list(args)))
+        self._sock.sendall(b"".join(frames))
+
+        responses = {}
+        while len(responses) < len(ids):
+            length, request_id, status = FRAME.unpack(self._read_exactly(FRAME.size))
+            if length > MAX_FRAME_SIZE:
+                raise ProtocolError(f"Frame terlalu besar ({length} bytes)")
+            responses[request_id] = (status, decode_value(self._read_exactly(length)))
+        return [responses[request_id] for request_id in ids]
+
+    def close(self):
+        self._sock.close()
+
+class CatalogClient:
+    """
+    Klien tipis catalog service untuk proses bot: API baca sama dengan Catalog,
+    setiap panggilan dikirim lewat pool koneksi socket (aman dipakai dari banyak
+    thread). Item dikembalikan sebagai dict.
+    """
+
+    def __init__(self, address=CATALOG_SERVICE_ADDRESS or DEFAULT_SERVICE_ADDRESS,
+                 size=CATALOG_CLIENT_POOL_SIZE, timeout=CATALOG_CLIENT_TIMEOUT):
+        self.address = address
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        # Versi dan revisi katalog di service, diperbarui dari setiap response
+        self.version = 0
+        self.revision = None
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return ServiceConnection(self.address, self.timeout)
+                except OSError as e:
+                    self._created -= 1
+                    raise CatalogServiceError(f"Catalog service {self.address} tidak bisa dihubungi: {e}") from e
+        return self._idle.get()
+
+    def _discard(self, conn):
+        conn.close()
+        with self._lock:
+            self._created -= 1
+
+    @contextmanager
+    def connection(self):
+        """Pinjam koneksi dari pool; koneksi yang error dibuang, bukan dikembalikan"""
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            self._discard(conn)
+            raise
+        self._idle.put(conn)
+
+    def batch(self, calls, timeout=None):
+        """
+        Jalankan beberapa operasi sekaligus dalam satu round trip, mis.
+        batch([("get_item_details", ("Door",)), ("suggest", ("dor", 5))]).
+        Return list hasil sesuai urutan; error service dilempar sebagai CatalogServiceError.
+        """
+        calls = [(operation, tuple(args)) for operation, args in calls]
+        if not calls:
+            return []
+        # Koneksi pool yang basi (mis. service restart) dicoba ulang sekali dengan koneksi baru,
+        # kecuali untuk sync/reload yang tidak aman diulang
+        attempts = 1 if any(operation in ("sync", "reload") for operation, _ in calls) else 2
+        for attempt in range(attempts):
+            try:
+                with metrics.timer("catalog_client.roundtrip"), self.connection() as conn:
+                    responses = conn.roundtrip(calls, timeout or self.timeout)
+                break
+            except (OSError, ProtocolError) as e:
+                if attempt + 1 == attempts:
+                    raise CatalogServiceError(f"Request ke catalog service gagal: {e}") from e
+
+        results = []
+        for status, value in responses:
+            if status != STATUS_OK:
+                raise CatalogServiceError(value)
+            version, revision, result = value
+            # Bukan perbandingan >: versi dihitung ulang dari awal jika service restart
+            if version != self.version:
+                self.version = version
+                self.revision = revision
+            results.append(result)
+        return results
+
+    def call(self, operation, *args, timeout=None):
+        """Jalankan satu operasi di service"""
+        return self.batch([(operation, args)], timeout=timeout)[0]
+
+    def ping(self):
+        """Ringkasan service: jumlah item, versi dan revisi katalog"""
+        return self.call("ping")
+
+    def sync_items(self, force=False):
+        """Minta service menyinkronkan items.json; return diff (katalog service sudah diperbarui)"""
+        # Ingest bisa jauh lebih lama dari batas waktu query biasa
+        return self.call("sync", force, timeout=max(self.timeout, 600))
+
+    def reload_items(self):
+        """Minta service memuat ulang items.json penuh; return True jika katalog service diganti"""
+        return self.call("reload", timeout=max(self.timeout, 600))
+
+    def __len__(self):
+        return self.call("len")
+
+    def __contains__(self, item_name):
+        return self.call("contains", item_name)
+
+    def get_by_id(self, item_id):
+        return self.call("get_by_id", item_id)
+
+    def get_item_details(self, item_name):
+        return self.call("get_item_details", item_name)
+
+    def lookup_items(self, item_names, k=3):
+        return [tuple(entry) for entry in self.call("lookup_items", list(item_names), k)]
+
+    def get_recipe(self, item_name):
+        return self.call("get_recipe", item_name)
+
+    def search_items(self, keyword):
+        return [tuple(entry) for entry in self.call("search_items", keyword)]
+
+    def suggest(self, item_name, k=5):
+        return self.call("suggest", item_name, k)
+
+    def autocomplete(self, prefix, limit=25):
+        return self.call("autocomplete", prefix, limit)
+
+    def recipe_tree(self, item_name):
+        return self.call("recipe_tree", item_name)
+
+    def uses(self, item_name):
+        return self.call("uses", item_name)
+
+    def recipe_cost(self, item_name, quantity=1):
+        return self.call("recipe_cost", item_name, quantity)
+
+    def all_items(self):
+        return [tuple(entry) for entry in self.call("all_items")]
+
+    def close(self):
+        """Tutup semua koneksi idle"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
@@ -0,0 +1,135 @@
+import os
+import struct
+
+# Alamat catalog service: "unix:/path/ke/socket" atau "host:port" (TCP lokal)
+DEFAULT_SERVICE_ADDRESS = "unix:catalog.sock"
+CATALOG_SERVICE_ADDRESS = os.getenv("CATALOG_SERVICE_ADDRESS", "")
+
+# Frame: panjang payload, id request, opcode (request) atau status (response).
+# Beberapa frame boleh dikirim berturut-turut tanpa menunggu (pipelining);
+# response membawa id request yang sama.
+FRAME = struct.Struct("<IIB")
+MAX_FRAME_SIZE = int(os.getenv("CATALOG_MAX_FRAME_SIZE", str(64 << 20)))
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Operasi yang dilayani service; opcode = indeks di tuple ini
+OPERATIONS = (
+    "ping", "len", "contains", "get_by_id", "get_item_details", "get_recipe",
+    "search_items", "suggest", "autocomplete", "recipe_tree", "uses", "all_items", "sync",
+    "recipe_cost", "lookup_items", "reload"
+)
+OPCODES = {name: opcode for opcode, name in enumerate(OPERATIONS)}
+
+class ProtocolError(Exception):
+    """Frame atau payload tidak valid"""
+
+def parse_address(address):
+    """'unix:/tmp/catalog.sock' -> ('unix', path); 'host:port' -> ('tcp', (host, port))"""
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Alamat catalog service tidak valid: {address!r}")
+    return "tcp", (host, int(port))
+
+# Encoding nilai bergaya msgpack: satu byte tag lalu data little-endian.
+# Mendukung None, bool, int 64-bit, float, str, list/tuple, dict, dan objek
+# mapping (mis. Item) yang dikirim sebagai dict.
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+_LENGTH = struct.Struct("<I")
+
+def _encode(value, out):
+    if value is None:
+        out.append(b"N")
+    elif value is True:
+        out.append(b"T")
+    elif value is False:
+        out.append(b"F")
+    elif type(value) is int:
+        out.append(b"i" + _INT.pack(value))
+    elif type(value) is str:
+        data = value.encode("utf-8")
+        out.append(b"s" + _LENGTH.pack(len(data)))
+        out.append(data)
+    elif type(value) is float:
+        out.append(b"d" + _FLOAT.pack(value))
+    elif isinstance(value, (list, tuple)):
+        out.append(b"l" + _LENGTH.pack(len(value)))
+        for element in value:
+            _encode(element, out)
+    elif isinstance(value, dict) or hasattr(value, "keys"):
+        keys = list(value.keys())
+        out.append(b"m" + _LENGTH.pack(len(keys)))
+        for key in keys:
+            _encode(key, out)
+            _encode(value[key], out)
+    else:
+        raise ProtocolError(f"Tipe tidak bisa dikirim: {type(value).__name__}")
+
+def encode_value(value):
+    out = []
+    try:
+        _encode(value, out)
+    except struct.error as e:
+        # int di luar 64-bit atau panjang di luar 32-bit
+        raise ProtocolError(str(e)) from e
+    return b"".join(out)
+
+def _decode(data, offset):
+    tag = data[offset:offset + 1]
+    offset += 1
+    if tag == b"N":
+        return None, offset
+    if tag == b"T":
+        return True, offset
+    if tag == b"F":
+        return False, offset
+    if tag == b"i":
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == b"s":
+        length = _LENGTH.unpack_from(data, offset)[0]
+        start = offset + _LENGTH.size
+        if start + length > len(data):
+            raise ProtocolError("string terpotong")
+        return str(data[start:start + length], "utf-8"), start + length
+    if tag == b"d":
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    if tag == b"l":
+        count = _LENGTH.unpack_from(data, offset)[0]
+        offset += _LENGTH.size
+        result = []
+        for _ in range(count):
+            value, offset = _decode(data, offset)
+            result.append(value)
+        return result, offset
+    if tag == b"m":
+        count = _LENGTH.unpack_from(data, offset)[0]
+        offset += _LENGTH.size
+        result = {}
+        for _ in range(count):
+            key, offset = _decode(data, offset)
+            value, offset = _decode(data, offset)
+            result[key] = value
+        return result, offset
+    raise ProtocolError(f"Tag tidak dikenal: {tag!r}")
+
+def decode_value(data):
+    """Decode satu nilai yang mengisi seluruh payload"""
+    try:
+        value, offset = _decode(data, 0)
+    except (struct.error, UnicodeDecodeError, TypeError, RecursionError) as e:
+        # TypeError: key dict berupa list
+        raise ProtocolError(f"Payload rusak: {e}") from e
+    if offset != len(data):
+        raise ProtocolError("Sisa data setelah payload")
+    return value
+
+def encode_frame(request_id, code, value):
+    """Frame lengkap (header + payload) untuk satu request atau response"""
+    payload = encode_value(value)
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame terlalu besar ({len(payload)} bytes)")
+    return FRAME.pack(len(payload), request_id, code) + payload
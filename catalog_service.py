@@ -0,0 +1,171 @@
+import asyncio
+import os
+import stat
+import time
+import async_db
+from catalog import Catalog
+from catalog_protocol import (CATALOG_SERVICE_ADDRESS, DEFAULT_SERVICE_ADDRESS, FRAME, MAX_FRAME_SIZE, OPCODES,
+                              OPERATIONS, STATUS_ERROR, STATUS_OK, ProtocolError, decode_value, encode_frame,
+                              parse_address)
+from items_parser import initialize_catalog, reload_catalog, sync_items, validate_recipes, write_catalog_snapshot
+from metrics import metrics, METRICS_FILE
+
+# Interval dump metrik service ke file tersendiri (bot memakai METRICS_FILE)
+SERVICE_METRICS_INTERVAL = float(os.getenv("CATALOG_SERVICE_METRICS_INTERVAL", "60"))
+metrics_root, metrics_ext = os.path.splitext(METRICS_FILE)
+SERVICE_METRICS_FILE = f"{metrics_root}.service{metrics_ext}"
+
+class CatalogService:
+    """
+    Pemilik database dan index katalog di memori untuk semua proses bot.
+    Query dijawab langsung dari Catalog; sync dijalankan serial di thread sync.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.connections = 0
+        self.requests = 0
+        self.batches = 0
+
+    def execute(self, operation, args):
+        """Jalankan satu operasi protokol terhadap katalog"""
+        catalog = self.catalog
+        if operation == "ping":
+            return {
+                'items': len(catalog),
+                'version': catalog.version,
+                'revision': catalog.revision,
+                'connections': self.connections,
+                'requests': self.requests,
+                'batches': self.batches
+            }
+        if operation == "len":
+            return len(catalog)
+        if operation == "contains":
+            return args[0] in catalog
+        if operation == "sync":
+            return self.sync(*args)
+        if operation == "reload":
+            return self.reload()
+        return getattr(catalog, operation)(*args)
+
+    def sync(self, force=False):
+        """Sinkronisasi items.json: database, katalog di memori, validasi recipe, lalu snapshot untuk shard"""
+        diff = sync_items(force=force)
+        if not diff.get("skipped"):
+            self.catalog.apply_diff(diff)
+            validate_recipes(self.catalog)
+            write_catalog_snapshot(self.catalog)
+        # Kegagalan berisi objek exception; cukup dikirim sebagai teks
+        return dict(diff, failures=[str(error) for _, error in diff["failures"]])
+
+    def reload(self):
+        """Reload penuh items.json: tabel staging lalu penukaran generasi katalog; return True jika katalog diganti"""
+        return reload_catalog(self.catalog)
+
+    def answer(self, request_id, opcode, payload):
+        """Jawab satu request; error apa pun dikirim balik sebagai frame error"""
+        self.requests += 1
+        started = time.perf_counter()
+        operation = OPERATIONS[opcode] if opcode < len(OPERATIONS) else None
+        try:
+            if operation is None:
+                raise ProtocolError(f"Opcode tidak dikenal: {opcode}")
+            args = decode_value(payload)
+            if not isinstance(args, list):
+                raise ProtocolError("Argumen harus berupa list")
+            result = self.execute(operation, args)
+            catalog = self.catalog
+            frame = encode_frame(request_id, STATUS_OK, [catalog.version, catalog.revision, result])
+        except Exception as e:
+            frame = encode_frame(request_id, STATUS_ERROR, f"{type(e).__name__}: {e}")
+        metrics.observe(f"service.{operation or 'invalid'}", time.perf_counter() - started)
+        return frame
+
+class CatalogServiceProtocol(asyncio.Protocol):
+    """
+    Satu koneksi klien. Semua frame lengkap yang tiba dalam satu read dijawab
+    dengan satu write (batching); klien boleh mengirim request tanpa menunggu
+    response sebelumnya (pipelining).
+    """
+
+    def __init__(self, service):
+        self.service = service
+        self.transport = None
+        self.buffer = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.service.connections += 1
+
+    def connection_lost(self, exc):
+        self.service.connections -= 1
+
+    def data_received(self, data):
+        buffer = self.buffer
+        buffer += data
+        responses = []
+        while len(buffer) >= FRAME.size:
+            length, request_id, opcode = FRAME.unpack_from(buffer)
+            if length > MAX_FRAME_SIZE:
+                print(f"⚠️ Frame {length} bytes ditolak, koneksi ditutup")
+                self.transport.close()
+                return
+            end = FRAME.size + length
+            if len(buffer) < end:
+                break
+            payload = bytes(buffer[FRAME.size:end])
+            del buffer[:end]
+            if opcode in (OPCODES["sync"], OPCODES["reload"]):
+                # Ingest berjalan lama: jangan tahan query lain di koneksi ini
+                asyncio.ensure_future(self._answer_later(request_id, opcode, payload))
+            else:
+                responses.append(self.service.answer(request_id, opcode, payload))
+        if responses:
+            self.service.batches += 1
+            self.transport.write(b"".join(responses))
+
+    async def _answer_later(self, request_id, opcode, payload):
+        frame = await async_db.run_sync_job(self.service.answer, request_id, opcode, payload)
+        if not self.transport.is_closing():
+            self.transport.write(frame)
+
+async def dump_metrics_periodically():
+    while True:
+        await asyncio.sleep(SERVICE_METRICS_INTERVAL)
+        try:
+            await async_db.run_db(metrics.dump, SERVICE_METRICS_FILE)
+        except OSError as e:
+            print(f"❌ Error writing service metrics: {e}")
+
+async def serve(service, address):
+    """Layani koneksi klien di alamat unix:/path atau host:port sampai dihentikan"""
+    loop = asyncio.get_running_loop()
+    kind, target = parse_address(address)
+    if kind == "unix":
+        # Socket sisa proses sebelumnya yang berhenti mendadak
+        if os.path.exists(target) and stat.S_ISSOCK(os.stat(target).st_mode):
+            os.unlink(target)
+        server = await loop.create_unix_server(lambda: CatalogServiceProtocol(service), path=target)
+    else:
+        server = await loop.create_server(lambda: CatalogServiceProtocol(service), *target)
+    print(f"✅ Catalog service listening on {address} ({len(service.catalog)} items)")
+    metrics_task = loop.create_task(dump_metrics_periodically())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        metrics_task.cancel()
+        if kind == "unix" and os.path.exists(target):
+            os.unlink(target)
+
+if __name__ == "__main__":
+    catalog = Catalog()
+    print("🔄 Menginisialisasi database...")
+    initialize_catalog(catalog)
+    try:
+        asyncio.run(serve(CatalogService(catalog), CATALOG_SERVICE_ADDRESS or DEFAULT_SERVICE_ADDRESS))
+    except KeyboardInterrupt:
+        print("🛑 Catalog service dihentikan")
+    finally:
+        async_db.shutdown()
@@ -0,0 +1,223 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+
+CATALOG_SNAPSHOT_FILE = os.getenv("CATALOG_SNAPSHOT_FILE", "catalog.snapshot")
+
+SNAPSHOT_MAGIC = b"GTCS"
+SNAPSHOT_VERSION = 4
+
+# Header: magic, versi format, byte order (0 little / 1 big), jumlah section,
+# revisi database sumber, panjang payload, checksum blake2b payload
+HEADER = struct.Struct("<4sHBBqQ16s")
+# Tabel section: nama, typecode array ('s' untuk tabel string), itemsize,
+# jumlah elemen, offset dan panjang data (byte) relatif terhadap awal area data.
+# Section 's' berisi offset awal tiap string (int64, jumlah + 1) lalu blob UTF-8
+# yang dipisah NUL, sehingga satu string bisa dibaca langsung tanpa decode semua.
+SECTION = struct.Struct("<16scBQQQ")
+# Setiap section dimulai di kelipatan 8 byte agar bisa dibaca langsung dari mmap
+SECTION_ALIGN = 8
+BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+class SnapshotError(Exception):
+    """Snapshot tidak ada, rusak, beda versi/platform, atau basi"""
+
+def _checksum(*chunks):
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.digest()
+
+def _encode_section(value):
+    """Return (typecode, itemsize, jumlah elemen, bytes) untuk array atau list string"""
+    if isinstance(value, array):
+        return value.typecode, value.itemsize, len(value), value.tobytes()
+    encoded = [text.encode("utf-8") for text in value]
+    offsets = array('q', [0])
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data) + 1)
+    return "s", offsets.itemsize, len(value), offsets.tobytes() + b"\0".join(encoded)
+
+def write_snapshot(path, revision, sections):
+    """
+    Tulis snapshot secara atomik (file sementara lalu os.replace).
+    sections: dict nama -> array.array atau list string
+    """
+    table = []
+    chunks = []
+    offset = 0
+    for name, value in sections.items():
+        typecode, itemsize, count, data = _encode_section(value)
+        padding = -len(data) % SECTION_ALIGN
+        table.append(SECTION.pack(name.encode("ascii"), typecode.encode("ascii"), itemsize, count, offset, len(data)))
+        chunks.append(data + b"\0" * padding)
+        offset += len(data) + padding
+
+    table_bytes = b"".join(table)
+    payload_length = len(table_bytes) + offset
+    header = HEADER.pack(
+        SNAPSHOT_MAGIC, SNAPSHOT_VERSION, BYTE_ORDER, len(table), revision,
+        payload_length, _checksum(table_bytes, *chunks)
+    )
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(table_bytes)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+    return HEADER.size + payload_length
+
+class MappedStrings:
+    """Tabel string di dalam mmap: string dibaca per indeks, tanpa disalin seluruhnya"""
+
+    def __init__(self, mapped, offsets, start, count):
+        self._mapped = mapped
+        self._offsets = offsets
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def raw(self, index):
+        """String ke-index sebagai bytes UTF-8"""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._mapped[self._start + self._offsets[index]:self._start + self._offsets[index + 1] - 1]
+
+    def __getitem__(self, index):
+        return self.raw(index).decode("utf-8")
+
+    def find(self, needle, start=0):
+        """
+        Cari needle (bytes) di blob mulai dari string ke-start.
+        Return (indeks string, offset di dalam string) atau None
+        """
+        if start >= self._count:
+            return None
+        found = self._mapped.find(needle, self._start + self._offsets[start], self._start + self._offsets[self._count])
+        if found == -1:
+            return None
+        offset = found - self._start
+        index = bisect_right(self._offsets, offset, start, self._count) - 1
+        return index, offset - self._offsets[index]
+
+def _sections(view, count, decode):
+    """
+    Iterasi (nama, typecode, itemsize, jumlah, data) untuk setiap section; data berupa
+    memoryview yang diteruskan ke decode(nama, typecode, itemsize, jumlah, data, awal)
+    """
+    data_start = HEADER.size + count * SECTION.size
+    sections = {}
+    for position in range(count):
+        name, typecode, itemsize, length, offset, size = SECTION.unpack_from(view, HEADER.size + position * SECTION.size)
+        name = name.rstrip(b"\0").decode("ascii")
+        typecode = typecode.decode("ascii")
+        start = data_start + offset
+        if start + size > len(view):
+            raise SnapshotError(f"section {name} terpotong")
+        if typecode == "s" and size < (length + 1) * itemsize:
+            raise SnapshotError(f"section {name} terpotong")
+        sections[name] = decode(name, typecode, itemsize, length, view[start:start + size], start)
+        if len(sections[name]) != length:
+            raise SnapshotError(f"jumlah elemen section {name} tidak cocok")
+    return sections
+
+def _copy_section(name, typecode, itemsize, length, data, start):
+    """Decode section ke objek Python biasa (list string / array)"""
+    with data:
+        if typecode == "s":
+            with data[(length + 1) * itemsize:] as blob:
+                return bytes(blob).decode("utf-8").split("\0") if length else []
+        value = array(typecode)
+        if value.itemsize != itemsize:
+            raise SnapshotError(f"ukuran elemen section {name} berbeda ({itemsize} != {value.itemsize})")
+        value.frombytes(data)
+        return value
+
+def _open_snapshot(path, expected_revision):
+    """Buka dan validasi snapshot; return (file, mmap, memoryview, revisi, jumlah section)"""
+    f = open(path, "rb")
+    try:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        f.close()
+        raise
+    view = memoryview(mapped)
+    try:
+        if len(view) < HEADER.size:
+            raise SnapshotError("file terlalu kecil")
+        magic, version, byte_order, count, revision, payload_length, checksum = HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC:
+            raise SnapshotError("bukan file snapshot katalog")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"versi format {version}, diharapkan {SNAPSHOT_VERSION}")
+        if byte_order != BYTE_ORDER:
+            raise SnapshotError("byte order berbeda dengan mesin ini")
+        if expected_revision is not None and revision != expected_revision:
+            raise SnapshotError(f"basi (revisi {revision}, database {expected_revision})")
+        if len(view) != HEADER.size + payload_length:
+            raise SnapshotError("ukuran file tidak cocok dengan header")
+        with view[HEADER.size:] as payload:
+            if _checksum(payload) != checksum:
+                raise SnapshotError("checksum tidak cocok")
+    except BaseException:
+        view.release()
+        mapped.close()
+        f.close()
+        raise
+    return f, mapped, view, revision, count
+
+def read_snapshot(path, expected_revision=None):
+    """
+    Baca snapshot lewat mmap (satu kali baca file): validasi header, versi,
+    byte order, checksum, dan revisi database bila expected_revision diberikan.
+    Return (revisi, dict section). Melempar SnapshotError jika tidak valid.
+    """
+    try:
+        f, mapped, view, revision, count = _open_snapshot(path, expected_revision)
+        with f, mapped, view:
+            return revision, _sections(view, count, _copy_section)
+    except (OSError, ValueError, struct.error, UnicodeDecodeError) as e:
+        # ValueError: mmap file kosong; struct.error: tabel section rusak
+        raise SnapshotError(str(e)) from e
+
+class MappedSnapshot:
+    """
+    Snapshot yang tetap di-mmap (read-only, zero-copy): section array berupa
+    memoryview, section string berupa MappedStrings. Halaman file dipakai bersama
+    oleh semua proses yang memetakan file yang sama.
+    """
+
+    def __init__(self, path, expected_revision=None):
+        try:
+            f, mapped, view, revision, count = _open_snapshot(path, expected_revision)
+        except (OSError, ValueError, struct.error) as e:
+            raise SnapshotError(str(e)) from e
+        with f:
+            self.path = path
+            self.revision = revision
+            self._mapped = mapped
+            try:
+                self.sections = _sections(view, count, self._map_section)
+            except (ValueError, TypeError, struct.error) as e:
+                raise SnapshotError(str(e)) from e
+
+    def _map_section(self, name, typecode, itemsize, length, data, start):
+        if typecode == "s":
+            offsets = data[:(length + 1) * itemsize].cast("q")
+            return MappedStrings(self._mapped, offsets, start + (length + 1) * itemsize, length)
+        if struct.calcsize(typecode) != itemsize:
+            raise SnapshotError(f"ukuran elemen section {name} berbeda")
+        return data.cast(typecode)
+
+    def __getitem__(self, name):
+        return self.sections[name]
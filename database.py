@@ -1,31 +1,276 @@
 import sqlite3
 import os
+import hashlib
+import queue
+import threading
+from contextlib import contextmanager
+from metrics import timed
 
 DB_FILE = "growtopia_items.db"
 
+# Ukuran pool koneksi baca dan cache prepared statement per koneksi
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+STATEMENT_CACHE_SIZE = 256
+
+# Pragma yang diterapkan ke setiap koneksi baru
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA mmap_size=67108864",
+    "PRAGMA busy_timeout=5000",
+    # Agar INSERT OR REPLACE ikut memicu trigger DELETE (sinkronisasi tabel FTS)
+    "PRAGMA recursive_triggers=ON",
+)
+
+# Index pencarian: lookup nama exact (NOCASE) dan full-text trigram untuk search_items
+SEARCH_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_items_name_nocase ON items (name COLLATE NOCASE)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+        name, content='items', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, name) VALUES (new.id, new.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF id, name ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        INSERT INTO items_fts (rowid, name) VALUES (new.id, new.name);
+    END""",
+)
+
+FTS_TRIGGERS = ("items_fts_insert", "items_fts_delete", "items_fts_update")
+
+# Tokenizer trigram hanya bisa mencocokkan kata kunci minimal 3 karakter
+FTS_MIN_KEYWORD = 3
+
+# Jumlah baris per executemany saat bulk insert
+BULK_CHUNK_SIZE = int(os.getenv("DB_BULK_CHUNK_SIZE", "5000"))
+
+UPSERT_ITEM_SQL = "INSERT OR REPLACE INTO items (id, name, tier, recipe, image_url, content_hash) VALUES (?, ?, ?, ?, ?, ?)"
+
+# Tabel staging untuk reload penuh: isi baru ditulis di sini dulu, lalu ditukar ke
+# tabel items dalam satu transaksi pendek
+STAGING_TABLE_SQL = """
+CREATE TABLE items_staging (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE,
+    tier INTEGER,
+    recipe TEXT,
+    image_url TEXT,
+    content_hash TEXT
+)
+"""
+UPSERT_STAGING_SQL = UPSERT_ITEM_SQL.replace("INTO items ", "INTO items_staging ")
+
+# Id item yang terlihat di file selama satu sinkronisasi (per koneksi tulis, tidak di memori)
+SEEN_TABLE_SQL = "CREATE TEMP TABLE IF NOT EXISTS sync_seen (id INTEGER PRIMARY KEY)"
+UNSEEN_ITEMS = "id NOT IN (SELECT id FROM temp.sync_seen)"
+
+# Revisi isi tabel items: naik di setiap transaksi tulis, dipakai untuk
+# mendeteksi snapshot katalog yang basi
+CATALOG_REVISION_KEY = "catalog_revision"
+BUMP_REVISION_SQL = (
+    "INSERT INTO sync_state (key, value) VALUES (?, '1') "
+    "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+)
+
+RECIPE_ISSUES_SQL = """
+CREATE TABLE IF NOT EXISTS recipe_issues (
+    item_id INTEGER,
+    kind TEXT,
+    detail TEXT
+)
+"""
+
+def item_content_hash(row):
+    """Hash konten satu item (id, name, tier, recipe, image_url) untuk deteksi perubahan"""
+    payload = repr(tuple(row[:5]))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+def _bump_revision(conn):
+    """Naikkan revisi katalog di transaksi yang sedang berjalan"""
+    conn.execute(BUMP_REVISION_SQL, (CATALOG_REVISION_KEY,))
+
+def _with_hash(row):
+    """Tambahkan content_hash ke row 5 kolom"""
+    row = tuple(row)
+    return row[:5] + (item_content_hash(row),)
+
+def _connect(db_file):
+    """Buka koneksi SQLite dengan pragma dan statement cache"""
+    conn = sqlite3.connect(
+        db_file,
+        check_same_thread=False,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        timeout=5.0
+    )
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+class ConnectionPool:
+    """Pool koneksi SQLite yang thread-safe: beberapa koneksi baca dan satu koneksi tulis"""
+
+    def __init__(self, db_file, size=POOL_SIZE):
+        self.db_file = db_file
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._closed = False
+        self.fts_available = None
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return _connect(self.db_file)
+                except sqlite3.Error:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    def _release(self, conn):
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def read(self):
+        """Pinjam koneksi baca dari pool (WAL: tidak diblokir oleh penulis)"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._release(conn)
+
+    @contextmanager
+    def write(self):
+        """Koneksi tulis tunggal dalam satu transaksi (commit/rollback otomatis)"""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = _connect(self.db_file)
+            conn = self._writer
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def close(self):
+        """Tutup semua koneksi di pool"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Dapatkan pool koneksi untuk DB_FILE saat ini (dibuat ulang jika DB_FILE berubah)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.db_file != DB_FILE:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_FILE)
+        return _pool
+
+def close_pool():
+    """Tutup pool koneksi global"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+def _ensure_search_index(conn):
+    """Buat index NOCASE dan tabel FTS5 beserta trigger sinkronisasinya"""
+    conn.execute(SEARCH_INDEX_SQL[0])
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'").fetchone()
+    try:
+        for sql in SEARCH_INDEX_SQL[1:]:
+            conn.execute(sql)
+        if not exists:
+            # Isi index FTS dari data yang sudah ada
+            conn.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+            print("✅ Index full-text items_fts berhasil dibuat")
+    except sqlite3.OperationalError as e:
+        # SQLite tanpa FTS5/trigram: search_items kembali ke LIKE
+        print(f"⚠️ FTS5 trigram tidak tersedia, pencarian memakai LIKE: {e}")
+
+def _has_fts(conn):
+    """Cek (sekali per pool) apakah tabel items_fts tersedia"""
+    pool = get_pool()
+    if pool.fts_available is None:
+        pool.fts_available = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_fts'"
+        ).fetchone() is not None
+    return pool.fts_available
+
+def _fts_phrase(keyword):
+    """Quote kata kunci sebagai frase FTS5"""
+    return '"' + keyword.replace('"', '""') + '"'
+
 def init_db():
     """Inisialisasi database dan buat tabel jika belum ada"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    
-    # Buat tabel items dengan kolom image_url
-    c.execute("""
-    CREATE TABLE IF NOT EXISTS items (
-        id INTEGER PRIMARY KEY,
-        name TEXT UNIQUE,
-        tier INTEGER,
-        recipe TEXT,
-        image_url TEXT
-    )
-    """)
-    
-    # Verifikasi tabel berhasil dibuat
-    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='items'")
-    result = c.fetchone()
-    
-    conn.commit()
-    conn.close()
-    
+    with get_pool().write() as conn:
+        c = conn.cursor()
+
+        # Buat tabel items dengan kolom image_url
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE,
+            tier INTEGER,
+            recipe TEXT,
+            image_url TEXT,
+            content_hash TEXT,
+            derived_tier INTEGER,
+            depth INTEGER
+        )
+        """)
+
+        # Laporan validasi recipe terakhir (siklus, bahan tidak dikenal, tier tidak cocok)
+        c.execute(RECIPE_ISSUES_SQL)
+
+        # Tabel state sinkronisasi (digest items.json terakhir, dsb.)
+        c.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        """)
+
+        _ensure_search_index(conn)
+        get_pool().fts_available = None
+
+        # Verifikasi tabel berhasil dibuat
+        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='items'")
+        result = c.fetchone()
+
     if result:
         print(f"✅ Tabel 'items' berhasil dibuat/ditemukan di {DB_FILE}")
         return True
@@ -33,69 +278,329 @@ def init_db():
         print(f"❌ Gagal membuat tabel 'items' di {DB_FILE}")
         return False
 
+@timed("db.save_item")
 def save_item(item_id, name, tier, recipe, image_url=None):
     """Menyimpan item ke database dengan URL gambar"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
     try:
-        c.execute("INSERT OR REPLACE INTO items (id, name, tier, recipe, image_url) VALUES (?, ?, ?, ?, ?)", 
-                 (item_id, name, tier, recipe, image_url))
-        conn.commit()
+        with get_pool().write() as conn:
+            conn.execute(UPSERT_ITEM_SQL, _with_hash((item_id, name, tier, recipe, image_url)))
+            _bump_revision(conn)
         return True
     except sqlite3.Error as e:
         print(f"❌ Error saving item {name}: {e}")
         return False
-    finally:
-        conn.close()
 
+def _save_rows(conn, rows, chunk_size, failures, sql=UPSERT_ITEM_SQL):
+    """Tulis rows dengan executemany per chunk di transaksi yang sedang berjalan"""
+    saved = 0
+
+    def flush(chunk):
+        # Satu savepoint per chunk: jika executemany gagal, ulangi per baris
+        # agar baris yang bermasalah bisa dilaporkan satu per satu
+        conn.execute("SAVEPOINT bulk_chunk")
+        try:
+            conn.executemany(sql, chunk)
+            conn.execute("RELEASE bulk_chunk")
+            return len(chunk)
+        except sqlite3.Error:
+            conn.execute("ROLLBACK TO bulk_chunk")
+            conn.execute("RELEASE bulk_chunk")
+        ok = 0
+        for row in chunk:
+            try:
+                conn.execute(sql, row)
+                ok += 1
+            except sqlite3.Error as e:
+                failures.append((row, str(e)))
+        return ok
+
+    chunk = []
+    for row in rows:
+        chunk.append(_with_hash(row))
+        if len(chunk) >= chunk_size:
+            saved += flush(chunk)
+            chunk = []
+    if chunk:
+        saved += flush(chunk)
+    return saved
+
+@timed("db.save_items")
+def save_items(rows, chunk_size=None, rebuild_search_index=False):
+    """
+    Simpan banyak item sekaligus dalam satu transaksi (executemany per chunk).
+    rows: iterable (id, name, tier, recipe, image_url).
+    rebuild_search_index: untuk import penuh, trigger FTS dimatikan selama penulisan
+    lalu index FTS dibangun ulang sekali di akhir (jauh lebih cepat daripada per baris).
+    Return (jumlah tersimpan, list kegagalan (row, pesan error))
+    """
+    failures = []
+    try:
+        with get_pool().write() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            fts = rebuild_search_index and _has_fts(conn)
+            if fts:
+                # DDL ikut transaksi: koneksi lain tidak pernah melihat trigger hilang
+                for trigger in FTS_TRIGGERS:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            saved = _save_rows(conn, rows, chunk_size or BULK_CHUNK_SIZE, failures)
+            if fts:
+                for sql in SEARCH_INDEX_SQL[2:]:
+                    conn.execute(sql)
+                conn.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+            if saved:
+                _bump_revision(conn)
+    except sqlite3.Error as e:
+        print(f"❌ Error saving items: {e}")
+        return 0, failures + [(None, str(e))]
+
+    return saved, failures
+
+@timed("db.replace_items")
+def replace_items(rows, state=None, chunk_size=None, rebuild_search_index=False):
+    """
+    Ganti seluruh isi tabel items (reload penuh) lewat tabel staging.
+    rows (iterable (id, name, tier, recipe, image_url), boleh generator) ditulis dulu ke
+    items_staging tanpa menyentuh items; pembaca (WAL) tetap melihat isi lama.
+    Lalu dalam satu transaksi pendek: item yang tidak ada di staging dihapus, item baru
+    atau berubah (content_hash beda) disalin, state disimpan dan revisi dinaikkan.
+    Pembaca melihat isi lama atau isi baru secara utuh, tidak pernah campuran.
+    rebuild_search_index: trigger FTS dimatikan selama penukaran, index dibangun ulang sekali.
+    Return (jumlah row di staging, jumlah item ditulis, jumlah item dihapus, list kegagalan)
+    """
+    failures = []
+    pool = get_pool()
+    try:
+        with pool.write() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            conn.execute("DROP TABLE IF EXISTS items_staging")
+            conn.execute(STAGING_TABLE_SQL)
+            staged = _save_rows(conn, rows, chunk_size or BULK_CHUNK_SIZE, failures, UPSERT_STAGING_SQL)
+            if failures:
+                conn.execute("DROP TABLE items_staging")
+        if failures:
+            # Sebagian baris gagal masuk staging: isi items lama tetap dipakai
+            print(f"⚠️ {len(failures)} item gagal ditulis ke staging, reload dibatalkan")
+            return staged, 0, 0, failures
+
+        with pool.write() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            fts = rebuild_search_index and _has_fts(conn)
+            if fts:
+                for trigger in FTS_TRIGGERS:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            removed = conn.execute("DELETE FROM items WHERE id NOT IN (SELECT id FROM items_staging)").rowcount
+            written = conn.execute(
+                "INSERT OR REPLACE INTO items (id, name, tier, recipe, image_url, content_hash) "
+                "SELECT s.id, s.name, s.tier, s.recipe, s.image_url, s.content_hash "
+                "FROM items_staging s LEFT JOIN items i ON i.id = s.id "
+                "WHERE i.content_hash IS NOT s.content_hash"
+            ).rowcount
+            if fts:
+                for sql in SEARCH_INDEX_SQL[2:]:
+                    conn.execute(sql)
+                conn.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+            for key, value in (state or {}).items():
+                conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+            if written or removed:
+                _bump_revision(conn)
+            conn.execute("DROP TABLE items_staging")
+    except sqlite3.Error as e:
+        print(f"❌ Error replacing items: {e}")
+        return 0, 0, 0, failures + [(None, str(e))]
+
+    return staged, written, removed, failures
+
+@timed("db.apply_item_changes")
+def apply_item_changes(batches, state=None, chunk_size=None, removed_sample=0):
+    """
+    Terapkan sinkronisasi dalam satu transaksi: tulis item yang berubah, hapus item
+    yang tidak ada lagi di file, dan simpan state (mis. digest file).
+    batches: iterable (id semua item di batch, row yang berubah), boleh berupa generator
+    yang di-stream. Id dicatat di tabel TEMP, bukan di memori; setelah batch terakhir
+    item yang tidak tercatat dihapus dengan satu DELETE.
+    Return (jumlah tersimpan, jumlah dihapus, maksimal removed_sample row yang dihapus
+    (urut id), list kegagalan)
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    failures = []
+    saved = 0
+    try:
+        with get_pool().write() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            conn.execute(SEEN_TABLE_SQL)
+            conn.execute("DELETE FROM temp.sync_seen")
+            for item_ids, rows in batches:
+                conn.executemany("INSERT OR IGNORE INTO temp.sync_seen (id) VALUES (?)", [(item_id,) for item_id in item_ids])
+                saved += _save_rows(conn, rows, chunk_size, failures)
+            removed_rows = conn.execute(
+                f"SELECT id, name, tier, recipe, image_url FROM items WHERE {UNSEEN_ITEMS} ORDER BY id LIMIT ?",
+                (removed_sample,)
+            ).fetchall()
+            removed = conn.execute(f"DELETE FROM items WHERE {UNSEEN_ITEMS}").rowcount
+            conn.execute("DELETE FROM temp.sync_seen")
+            for key, value in (state or {}).items():
+                conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+            if saved or removed:
+                _bump_revision(conn)
+    except sqlite3.Error as e:
+        print(f"❌ Error applying item changes: {e}")
+        return 0, 0, [], failures + [(None, str(e))]
+
+    return saved, removed, removed_rows, failures
+
+@timed("db.save_recipe_analysis")
+def save_recipe_analysis(derived, issues, chunk_size=None):
+    """
+    Simpan hasil analisis recipe dalam satu transaksi. Seperti sinkronisasi item, hanya
+    row yang nilainya berubah yang ditulis: kolom turunan dibandingkan dengan isi tabel,
+    dan recipe_issues hanya diganti jika laporannya berbeda.
+    derived: iterable (id, tier turunan, kedalaman); issues: iterable (id item, jenis, detail)
+    yang menggantikan seluruh isi recipe_issues. Kolom turunan tidak mengubah revisi katalog.
+    Return jumlah item yang kolom turunannya ditulis, atau None jika gagal
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    issues = sorted(issues)
+    try:
+        with get_pool().write() as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            stored = {
+                item_id: (tier, depth)
+                for item_id, tier, depth in conn.execute("SELECT id, derived_tier, depth FROM items")
+            }
+            changed = [
+                (tier, depth, item_id) for item_id, tier, depth in derived
+                if item_id in stored and stored[item_id] != (tier, depth)
+            ]
+            for start in range(0, len(changed), chunk_size):
+                conn.executemany(
+                    "UPDATE items SET derived_tier = ?, depth = ? WHERE id = ?", changed[start:start + chunk_size]
+                )
+            current = conn.execute("SELECT item_id, kind, detail FROM recipe_issues ORDER BY item_id, kind, detail").fetchall()
+            if current != issues:
+                conn.execute("DELETE FROM recipe_issues")
+                conn.executemany("INSERT INTO recipe_issues (item_id, kind, detail) VALUES (?, ?, ?)", issues)
+        return len(changed)
+    except sqlite3.Error as e:
+        print(f"❌ Error saving recipe analysis: {e}")
+        return None
+
+@timed("db.get_recipe_issues")
+def get_recipe_issues(kind=None):
+    """Laporan validasi recipe terakhir sebagai list (id item, jenis, detail)"""
+    try:
+        with get_pool().read() as conn:
+            if kind is None:
+                return conn.execute("SELECT item_id, kind, detail FROM recipe_issues ORDER BY kind, item_id").fetchall()
+            return conn.execute(
+                "SELECT item_id, kind, detail FROM recipe_issues WHERE kind = ? ORDER BY item_id", (kind,)
+            ).fetchall()
+    except sqlite3.Error as e:
+        print(f"❌ Error getting recipe issues: {e}")
+        return []
+
+@timed("db.get_stored_items")
+def get_stored_items(item_ids):
+    """
+    Row tersimpan untuk sekumpulan id dalam satu query (untuk membandingkan satu batch
+    sinkronisasi): mapping id -> ((id, name, tier, recipe, image_url), content_hash).
+    Jumlah id per panggilan dibatasi pemanggil (batas variabel SQLite).
+    """
+    item_ids = list(item_ids)
+    if not item_ids:
+        return {}
+    placeholders = ",".join("?" * len(item_ids))
+    with get_pool().read() as conn:
+        rows = conn.execute(
+            f"SELECT id, name, tier, recipe, image_url, content_hash FROM items WHERE id IN ({placeholders})",
+            item_ids
+        ).fetchall()
+    return {row[0]: (row[:5], row[5]) for row in rows}
+
+@timed("db.get_sync_state")
+def get_sync_state(key, default=None):
+    """Baca nilai dari tabel sync_state"""
+    try:
+        with get_pool().read() as conn:
+            result = conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return result[0] if result else default
+    except sqlite3.Error as e:
+        print(f"❌ Error reading sync state {key}: {e}")
+        return default
+
+def get_catalog_revision():
+    """Revisi isi tabel items saat ini (0 jika belum pernah ditulis)"""
+    try:
+        return int(get_sync_state(CATALOG_REVISION_KEY, 0))
+    except (TypeError, ValueError):
+        return 0
+
+@timed("db.set_sync_state")
+def set_sync_state(key, value):
+    """Simpan nilai ke tabel sync_state"""
+    try:
+        with get_pool().write() as conn:
+            conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", (key, value))
+        return True
+    except sqlite3.Error as e:
+        print(f"❌ Error saving sync state {key}: {e}")
+        return False
+
+@timed("db.get_recipe")
 def get_recipe(item_name):
     """Mendapatkan recipe untuk item tertentu (case-insensitive)"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    try:
-        # Coba pencarian case-insensitive dengan LIKE
-        cursor.execute("SELECT recipe FROM items WHERE LOWER(name) = LOWER(?)", (item_name,))
-        result = cursor.fetchone()
-        
-        if not result:
-            # Coba partial match jika exact match tidak ditemukan
-            cursor.execute("SELECT recipe FROM items WHERE LOWER(name) LIKE LOWER(?)", (f"%{item_name}%",))
-            result = cursor.fetchone()
-        
+    try:
+        with get_pool().read() as conn:
+            # Pencarian case-insensitive lewat index NOCASE
+            result = conn.execute("SELECT recipe FROM items WHERE name = ? COLLATE NOCASE", (item_name,)).fetchone()
+
+            if not result:
+                # Coba partial match jika exact match tidak ditemukan
+                if len(item_name) >= FTS_MIN_KEYWORD and _has_fts(conn):
+                    result = conn.execute(
+                        "SELECT i.recipe FROM items_fts f JOIN items i ON i.id = f.rowid "
+                        "WHERE items_fts MATCH ? ORDER BY f.rowid LIMIT 1",
+                        (_fts_phrase(item_name),)
+                    ).fetchone()
+                else:
+                    result = conn.execute("SELECT recipe FROM items WHERE LOWER(name) LIKE LOWER(?)", (f"%{item_name}%",)).fetchone()
+
         return result[0] if result else None
     except sqlite3.Error as e:
         print(f"❌ Error getting recipe for {item_name}: {e}")
         return None
-    finally:
-        conn.close()
 
+@timed("db.get_all_items")
 def get_all_items():
     """Mendapatkan semua items dari database"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("SELECT id, name FROM items ORDER BY name")
-        items = cursor.fetchall()
-        return items
+        with get_pool().read() as conn:
+            return conn.execute("SELECT id, name FROM items ORDER BY name").fetchall()
     except sqlite3.Error as e:
         print(f"❌ Error getting all items: {e}")
         return []
-    finally:
-        conn.close()
 
+@timed("db.get_all_item_rows")
+def get_all_item_rows():
+    """Mendapatkan semua kolom item dari database (untuk memuat katalog di memori)"""
+    try:
+        with get_pool().read() as conn:
+            return conn.execute("SELECT id, name, tier, recipe, image_url FROM items ORDER BY id").fetchall()
+    except sqlite3.Error as e:
+        print(f"❌ Error getting item rows: {e}")
+        return []
+
+@timed("db.get_item_details")
 def get_item_details(item_name):
     """Dapatkan detail lengkap item termasuk image_url"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    
-    # Cari item dengan nama yang cocok (case-insensitive)
-    c.execute("SELECT id, name, tier, recipe, image_url FROM items WHERE LOWER(name) = LOWER(?)", (item_name,))
-    result = c.fetchone()
-    
-    conn.close()
-    
+    with get_pool().read() as conn:
+        # Cari item dengan nama yang cocok (case-insensitive)
+        result = conn.execute("SELECT id, name, tier, recipe, image_url FROM items WHERE name = ? COLLATE NOCASE", (item_name,)).fetchone()
+
     if result:
         return {
             'id': result[0],
@@ -106,108 +611,105 @@ def get_item_details(item_name):
         }
     return None
 
+@timed("db.search_items")
 def search_items(keyword):
-    """Cari item berdasarkan kata kunci"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
+    """Cari item berdasarkan kata kunci (FTS5 trigram, diurutkan berdasarkan relevansi)"""
     try:
-        cursor.execute("SELECT id, name FROM items WHERE LOWER(name) LIKE LOWER(?) ORDER BY name", (f"%{keyword}%",))
-        items = cursor.fetchall()
-        return items
+        with get_pool().read() as conn:
+            if len(keyword) >= FTS_MIN_KEYWORD and _has_fts(conn):
+                # Exact match dulu, lalu prefix, lalu skor bm25, lalu nama
+                return conn.execute(
+                    "SELECT i.id, i.name FROM items_fts f JOIN items i ON i.id = f.rowid "
+                    "WHERE items_fts MATCH ? "
+                    "ORDER BY i.name = ? COLLATE NOCASE DESC, i.name LIKE ? DESC, f.rank, i.name",
+                    (_fts_phrase(keyword), keyword, f"{keyword}%")
+                ).fetchall()
+            return conn.execute("SELECT id, name FROM items WHERE LOWER(name) LIKE LOWER(?) ORDER BY name", (f"%{keyword}%",)).fetchall()
     except sqlite3.Error as e:
         print(f"❌ Error searching items: {e}")
         return []
-    finally:
-        conn.close()
 
+@timed("db.get_item_image_url")
 def get_item_image_url(item_name):
     """Mendapatkan URL gambar untuk item tertentu"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("SELECT image_url FROM items WHERE LOWER(name) = LOWER(?)", (item_name,))
-        result = cursor.fetchone()
+        with get_pool().read() as conn:
+            result = conn.execute("SELECT image_url FROM items WHERE name = ? COLLATE NOCASE", (item_name,)).fetchone()
         return result[0] if result else None
     except sqlite3.Error as e:
         print(f"❌ Error getting image URL for {item_name}: {e}")
         return None
-    finally:
-        conn.close()
 
 def update_db_schema():
-    """Menambahkan kolom image_url ke tabel items jika belum ada"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    
-    try:
-        # Cek jika kolom image_url sudah ada
-        c.execute("PRAGMA table_info(items)")
-        columns = [column[1] for column in c.fetchall()]
-        
-        if 'image_url' not in columns:
-            c.execute("ALTER TABLE items ADD COLUMN image_url TEXT")
-            conn.commit()
-            print("✅ Kolom image_url berhasil ditambahkan")
-        else:
-            print("✅ Kolom image_url sudah ada")
-            
+    """Menambahkan kolom image_url dan content_hash ke tabel items jika belum ada"""
+    try:
+        with get_pool().write() as conn:
+            # Cek jika kolom image_url sudah ada
+            columns = [column[1] for column in conn.execute("PRAGMA table_info(items)").fetchall()]
+
+            if 'image_url' not in columns:
+                conn.execute("ALTER TABLE items ADD COLUMN image_url TEXT")
+                print("✅ Kolom image_url berhasil ditambahkan")
+            else:
+                print("✅ Kolom image_url sudah ada")
+
+            if 'content_hash' not in columns:
+                conn.execute("ALTER TABLE items ADD COLUMN content_hash TEXT")
+                print("✅ Kolom content_hash berhasil ditambahkan")
+
+            # Tier turunan dan kedalaman recipe, dihitung saat ingest
+            for column in ('derived_tier', 'depth'):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE items ADD COLUMN {column} INTEGER")
+                    print(f"✅ Kolom {column} berhasil ditambahkan")
+
+            conn.execute(RECIPE_ISSUES_SQL)
+
+            conn.execute("CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)")
+
     except sqlite3.Error as e:
         print(f"❌ Error updating database schema: {e}")
-    finally:
-        conn.close()
 
 def normalize_item_names():
     """Normalisasi nama item ke Title Case"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    try:
-        # Ambil semua item
-        cursor.execute("SELECT id, name FROM items")
-        items = cursor.fetchall()
-        
-        updated_count = 0
-        for item_id, item_name in items:
-            normalized_name = item_name.title()
-            if normalized_name != item_name:
-                cursor.execute("UPDATE items SET name = ? WHERE id = ?", 
-                             (normalized_name, item_id))
-                print(f"Updated: {item_name} -> {normalized_name}")
-                updated_count += 1
-        
-        conn.commit()
+    try:
+        with get_pool().write() as conn:
+            # Ambil semua item
+            items = conn.execute("SELECT id, name FROM items").fetchall()
+
+            updated_count = 0
+            for item_id, item_name in items:
+                normalized_name = item_name.title()
+                if normalized_name != item_name:
+                    conn.execute("UPDATE items SET name = ? WHERE id = ?",
+                                 (normalized_name, item_id))
+                    print(f"Updated: {item_name} -> {normalized_name}")
+                    updated_count += 1
+            if updated_count:
+                _bump_revision(conn)
+
         print(f"✅ Database normalized successfully! {updated_count} items updated.")
         return updated_count
     except sqlite3.Error as e:
         print(f"❌ Error normalizing database: {e}")
         return 0
-    finally:
-        conn.close()
 
 def check_database():
     """Memeriksa status database"""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-    
-    try:
-        # Periksa tabel yang ada
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [table[0] for table in cursor.fetchall()]
-        print(f"📊 Tabel dalam database: {tables}")
-        
-        # Periksa jumlah item
-        cursor.execute("SELECT COUNT(*) FROM items")
-        count = cursor.fetchone()[0]
-        print(f"📦 Jumlah item dalam database: {count}")
-        
+    try:
+        with get_pool().read() as conn:
+            # Periksa tabel yang ada
+            tables = [table[0] for table in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
+            print(f"📊 Tabel dalam database: {tables}")
+
+            # Periksa jumlah item
+            count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            print(f"📦 Jumlah item dalam database: {count}")
+
         return True, count
     except sqlite3.Error as e:
         print(f"❌ Error checking database: {e}")
         return False, 0
-    finally:
-        conn.close()
 
 if __name__ == "__main__":
     # Inisialisasi database terlebih dahulu
@@ -0,0 +1,61 @@
+import os
+import threading
+from collections import OrderedDict
+
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "512"))
+
+class EmbedCache:
+    """
+    LRU cache embed yang sudah dirender, key (command, item_id).
+    Seluruh isi cache dibuang begitu versi katalog berubah.
+    """
+
+    def __init__(self, max_size=EMBED_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_render(self, command, item_id, version, render):
+        """Ambil embed dari cache, atau render dan simpan jika belum ada"""
+        key = (command, item_id)
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+            embed = self._entries.get(key)
+            if embed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embed
+            self.misses += 1
+
+        embed = render()
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = embed
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return embed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Statistik cache: ukuran, hit, miss, hit rate"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'invalidations': self.invalidations
+        }
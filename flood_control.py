@@ -0,0 +1,171 @@
+import asyncio
+import os
+import time
+
+# Cooldown command: token bucket per user dan per channel (jumlah command per periode detik)
+COMMAND_USER_RATE = int(os.getenv("COMMAND_USER_RATE", "5"))
+COMMAND_USER_PER = float(os.getenv("COMMAND_USER_PER", "10"))
+COMMAND_CHANNEL_RATE = int(os.getenv("COMMAND_CHANNEL_RATE", "20"))
+COMMAND_CHANNEL_PER = float(os.getenv("COMMAND_CHANNEL_PER", "10"))
+# Bucket yang sudah penuh kembali dibuang jika jumlah bucket melewati batas ini
+COOLDOWN_MAX_BUCKETS = int(os.getenv("COOLDOWN_MAX_BUCKETS", "10000"))
+
+class SingleFlight:
+    """
+    Gabungkan pemanggilan identik yang sedang berjalan: pemanggil pertama menjalankan
+    fungsi, pemanggil berikutnya dengan key yang sama menunggu hasil yang sama.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def run(self, key, func, *args, **kwargs):
+        """Jalankan await func(*args) sekali untuk semua pemanggil bersamaan dengan key yang sama"""
+        future = self._inflight.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced += 1
+        # shield: pemanggil yang dibatalkan tidak ikut membatalkan pekerjaan bersama
+        return await asyncio.shield(future)
+
+    def _finish(self, key, future):
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            # Tandai exception sudah dibaca walaupun semua pemanggil sudah pergi
+            future.exception()
+
+    def stats(self):
+        return {
+            'inflight': len(self._inflight),
+            'calls': self.calls,
+            'coalesced': self.coalesced
+        }
+
+class TokenBucket:
+    """Token bucket tanpa menunggu: request yang tidak kebagian token langsung ditolak"""
+
+    __slots__ = ('rate', 'per', 'tokens', 'updated', 'notified')
+
+    def __init__(self, rate, per, now):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = now
+        # Pesan cooldown hanya dikirim sekali per rentetan penolakan
+        self.notified = False
+
+    def refill(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    def retry_after(self, now):
+        """Detik sampai token berikutnya tersedia (0 jika tersedia sekarang)"""
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def full(self, now):
+        self.refill(now)
+        return self.tokens >= self.rate
+
+class CooldownTable:
+    """Kumpulan token bucket per key (user id atau channel id)"""
+
+    def __init__(self, rate, per, max_buckets=COOLDOWN_MAX_BUCKETS):
+        self.rate = rate
+        self.per = per
+        self.max_buckets = max_buckets
+        self._buckets = {}
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def bucket(self, key, now):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_buckets:
+                self._prune(now)
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.per, now)
+        return bucket
+
+    def _prune(self, now):
+        """Buang bucket yang sudah terisi penuh (sama saja dengan belum pernah dipakai)"""
+        for key in [key for key, bucket in self._buckets.items() if bucket.full(now)]:
+            del self._buckets[key]
+
+class CommandLimiter:
+    """
+    Cooldown command per user dan per channel. Request ditolak sebelum menyentuh
+    katalog/database; token hanya dipakai jika kedua bucket mengizinkan.
+    """
+
+    def __init__(self, user_rate=COMMAND_USER_RATE, user_per=COMMAND_USER_PER,
+                 channel_rate=COMMAND_CHANNEL_RATE, channel_per=COMMAND_CHANNEL_PER):
+        self.users = CooldownTable(user_rate, user_per)
+        self.channels = CooldownTable(channel_rate, channel_per)
+        self.allowed = 0
+        self.rejected = {'user': 0, 'channel': 0}
+
+    def check(self, user_id, channel_id):
+        """
+        Return None jika diizinkan, atau (scope, retry_after, notify) jika ditolak.
+        notify True hanya untuk penolakan pertama dalam satu rentetan.
+        """
+        now = time.monotonic()
+        user_bucket = self.users.bucket(user_id, now)
+        channel_bucket = self.channels.bucket(channel_id, now)
+        for scope, bucket in (('user', user_bucket), ('channel', channel_bucket)):
+            retry_after = bucket.retry_after(now)
+            if retry_after:
+                self.rejected[scope] += 1
+                notify = not bucket.notified
+                bucket.notified = True
+                return scope, retry_after, notify
+        user_bucket.tokens -= 1
+        channel_bucket.tokens -= 1
+        user_bucket.notified = channel_bucket.notified = False
+        self.allowed += 1
+        return None
+
+    def stats(self):
+        return {
+            'allowed': self.allowed,
+            'rejected_user': self.rejected['user'],
+            'rejected_channel': self.rejected['channel'],
+            'buckets': len(self.users) + len(self.channels)
+        }
+
+if __name__ == "__main__":
+    # Simulasi burst: 400 request *recipe item yang sama dari 50 user secara bersamaan
+    async def main():
+        flight = SingleFlight()
+        limiter = CommandLimiter(channel_rate=1000)
+
+        async def lookup(name):
+            await asyncio.sleep(0.05)
+            return name.upper()
+
+        async def request(user_id):
+            if limiter.check(user_id % 50, 1):
+                return None
+            return await flight.run(("recipe", "dirt"), lookup, "dirt")
+
+        started = time.monotonic()
+        results = await asyncio.gather(*(request(user_id) for user_id in range(400)))
+        elapsed = time.monotonic() - started
+        print(f"✅ {sum(result is not None for result in results)} dijawab, {flight.calls} lookup, "
+              f"{flight.coalesced} digabung, {elapsed * 1e3:.0f}ms")
+        print(limiter.stats())
+
+    asyncio.run(main())
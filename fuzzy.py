@@ -0,0 +1,312 @@
+import heapq
+from array import array
+from collections import Counter
+from itertools import compress, islice
+
+# Jumlah kandidat (skor trigram tertinggi) yang dihitung edit distance-nya
+CANDIDATE_LIMIT = 24
+
+# Batas jumlah entry posting yang dihitung per query. Trigram dibaca dari yang paling
+# jarang; trigram umum (mis. ' do' di ribuan nama '... Door') dilewati begitu batas
+# ini terlampaui, kecuali trigram pertama yang selalu dihitung.
+POSTINGS_BUDGET = 2048
+
+# Hanya slot dengan overlap trigram terbanyak yang diberi skor Dice; jika ada trigram
+# yang dilewati, overlap kandidat ini dihitung ulang secara lengkap
+RESCORE_LIMIT = CANDIDATE_LIMIT * 4
+
+# Saat mencari substring, irisan posting list berhenti begitu kandidatnya sebanyak ini
+# atau kurang; sisanya langsung dicek dengan 'in'
+CONTAINS_VERIFY_LIMIT = 64
+
+def trigrams(text):
+    """Trigram dari teks dengan padding spasi di awal dan akhir"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def most_common(counter, n):
+    """
+    Sama dengan counter.most_common(n) sebagai himpunan (skor sama: urutan masuk lebih
+    dulu), tanpa mengurutkan semua entry: ambang skor dicari dari histogram skor lalu
+    entry disaring dengan compress/map, keduanya berjalan di C.
+    """
+    if len(counter) <= n:
+        return list(counter.items())
+    histogram = Counter(counter.values())
+    remaining = n
+    for threshold in sorted(histogram, reverse=True):
+        if histogram[threshold] >= remaining:
+            break
+        remaining -= histogram[threshold]
+    values = counter.values()
+    top = list(compress(counter.items(), map(threshold.__lt__, values)))
+    top.extend(islice(compress(counter.items(), map(threshold.__eq__, values)), remaining))
+    return top
+
+def edit_distance(a, b, limit=None):
+    """
+    Levenshtein distance, dihitung bit-parallel (Myers/Hyyrö): satu kolom DP per
+    karakter sebagai operasi integer. Dengan limit hasil > limit dikembalikan
+    sebagai limit + 1.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    n, m = len(a), len(b)
+    if limit is None:
+        limit = n
+    if n - m > limit:
+        return limit + 1
+    if not m:
+        return n
+    # Bit i di peq[c] menyala jika b[i] == c
+    peq = {}
+    for i, c in enumerate(b):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    positive, negative = mask, 0
+    distance = m
+    for c in a:
+        eq = peq.get(c, 0)
+        vertical = eq | negative
+        horizontal = (((eq & positive) + positive) ^ positive) | eq
+        up = negative | (~(horizontal | positive) & mask)
+        down = positive & horizontal
+        if up & high:
+            distance += 1
+        elif down & high:
+            distance -= 1
+        up = ((up << 1) | 1) & mask
+        down = (down << 1) & mask
+        positive = down | (~(vertical | up) & mask)
+        negative = up & vertical
+    return min(distance, limit + 1)
+
+class FuzzyMatcher:
+    """
+    Index trigram atas nama item untuk saran 'mungkin maksud Anda' yang toleran typo.
+    Setiap nama mendapat nomor slot; posting list per trigram berupa array('i')
+    berisi nomor slot (4 byte per entry, bukan set string).
+
+    Biaya suggest tidak tumbuh dengan jumlah item selama ada trigram query yang jarang:
+    paling banyak POSTINGS_BUDGET entry posting dihitung, RESCORE_LIMIT kandidat diberi
+    skor dan CANDIDATE_LIMIT kandidat dihitung edit distance-nya. Batasnya ada pada query
+    yang trigram paling jarangnya pun sangat umum (mis. typo pendek seperti 'dor' di
+    katalog berisi puluhan ribu '... Door'): posting list itu tetap dibaca utuh, jadi
+    biayanya linear dengan jumlah nama yang memuat trigram tersebut, dan nama yang hanya
+    cocok di trigram umum yang dilewati bisa tidak muncul sebagai saran.
+    """
+
+    def __init__(self, names=()):
+        self._postings = {}
+        self._slots = {}
+        self._keys = []
+        self._display = []
+        self._free = []
+        # Trigram yang posting list-nya milik index ini sendiri; None = semuanya
+        self._owned = None
+        for key, display in names:
+            self.add(key, display)
+
+    @classmethod
+    def from_postings(cls, keys, displays, postings, read_only=False):
+        """
+        Bangun index dari posting list yang sudah jadi (mis. dari snapshot katalog).
+        keys/displays: sequence per slot; postings: mapping trigram -> array nomor slot.
+        read_only=True memakai sequence apa adanya (tanpa disalin, tanpa dict slot);
+        index seperti itu hanya bisa dipakai untuk suggest, bukan add/remove.
+        """
+        matcher = cls()
+        if read_only:
+            matcher._keys = keys
+            matcher._display = displays
+            matcher._slots = None
+        else:
+            matcher._keys = list(keys)
+            matcher._display = list(displays)
+            matcher._slots = {key: slot for slot, key in enumerate(matcher._keys)}
+        matcher._postings = postings
+        return matcher
+
+    def copy(self):
+        """
+        Salinan yang bisa diubah tanpa mempengaruhi index ini (untuk generasi katalog baru).
+        Posting list dipakai bersama dan baru disalin saat trigram-nya diubah salinan ini.
+        """
+        matcher = FuzzyMatcher()
+        matcher._postings = dict(self._postings)
+        matcher._owned = set()
+        matcher._slots = dict(self._slots)
+        matcher._keys = list(self._keys)
+        matcher._display = list(self._display)
+        matcher._free = list(self._free)
+        return matcher
+
+    def iter_postings(self):
+        """Posting list sebagai (trigram, list key) untuk diekspor"""
+        keys = self._keys
+        for gram, postings in self._postings.items():
+            yield gram, [keys[slot] for slot in postings]
+
+    def __len__(self):
+        return len(self._keys) - len(self._free)
+
+    def containing(self, text):
+        """
+        Slot (terurut) semua nama yang memuat text (sudah dinormalisasi) sebagai substring.
+        Setiap trigram text pasti ada di posting list nama tersebut, jadi posting list
+        diiris mulai dari yang terpendek lalu kandidatnya dicek ulang dengan 'in'.
+        Return None jika text lebih pendek dari satu trigram (index tidak bisa dipakai).
+        """
+        if len(text) < 3:
+            return None
+        found = []
+        for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+            postings = self._postings.get(gram)
+            if not postings:
+                return []
+            found.append(postings)
+        if len(found) == 1 and " " not in text:
+            # Satu trigram tanpa spasi (bukan trigram padding): posting list-nya tepat
+            # himpunan nama yang memuat text
+            return sorted(found[0].tolist())
+        found.sort(key=len)
+        slots = set(found[0].tolist())
+        for postings in found[1:]:
+            if len(slots) <= CONTAINS_VERIFY_LIMIT:
+                break
+            slots.intersection_update(postings.tolist())
+        keys = self._keys
+        return sorted(slot for slot in slots if keys[slot] is not None and text in keys[slot])
+
+    def keys_for(self, slots):
+        """Key nama untuk setiap slot hasil containing"""
+        keys = self._keys
+        return [keys[slot] for slot in slots]
+
+    def _own(self, gram, create=False):
+        """Posting list trigram yang boleh diubah (disalin dulu jika masih dipakai bersama)"""
+        postings = self._postings.get(gram)
+        owned = self._owned
+        if owned is None or gram in owned:
+            if postings is None and create:
+                postings = self._postings[gram] = array('i')
+            return postings
+        if postings is not None:
+            postings = self._postings[gram] = postings[:]
+        elif create:
+            postings = self._postings[gram] = array('i')
+        else:
+            return None
+        owned.add(gram)
+        return postings
+
+    def add(self, key, display):
+        """Tambahkan nama (key sudah dinormalisasi) ke index"""
+        slot = self._slots.get(key)
+        if slot is not None:
+            self._display[slot] = display
+            return
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+            self._display[slot] = display
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            self._display.append(display)
+        self._slots[key] = slot
+        for gram in trigrams(key):
+            self._own(gram, create=True).append(slot)
+
+    def remove(self, key):
+        """Hapus nama dari index (slot dipakai ulang oleh nama berikutnya)"""
+        slot = self._slots.pop(key, None)
+        if slot is None:
+            return
+        for gram in trigrams(key):
+            postings = self._own(gram)
+            if postings is not None:
+                postings.remove(slot)
+                if not postings:
+                    del self._postings[gram]
+        self._keys[slot] = None
+        self._display[slot] = None
+        self._free.append(slot)
+
+    def suggest(self, query, k=5, max_distance=None):
+        """
+        Top-k nama terdekat dengan query (sudah dinormalisasi).
+        Kandidat diambil dari trigram yang sama, lalu diurutkan berdasarkan edit distance.
+        """
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        # Urutan (panjang posting, trigram) tetap sama di semua proses, sehingga urutan
+        # masuk Counter (penentu hasil most_common untuk skor sama) juga tetap
+        found = []
+        for gram in query_grams:
+            postings = self._postings.get(gram)
+            if postings:
+                found.append((len(postings), gram, postings))
+        found.sort(key=lambda entry: entry[:2])
+        shared = Counter()
+        counted = 0
+        skipped = ()
+        for index, (_, _, postings) in enumerate(found):
+            if counted and counted + len(postings) > POSTINGS_BUDGET:
+                # Sisanya lebih umum lagi (terurut): cukup dihitung ulang untuk kandidat teratas
+                skipped = [gram for _, gram, _ in found[index:]]
+                break
+            counted += len(postings)
+            # tolist() menyalin array secara atomik terhadap update dari thread lain
+            shared.update(postings.tolist())
+        if not shared:
+            return []
+
+        if max_distance is None:
+            max_distance = max(2, len(query) // 3)
+
+        # Skor Dice antar himpunan trigram: menyukai nama dengan panjang yang mirip.
+        # Skor sama diurutkan berdasarkan key agar hasil tidak bergantung pada urutan
+        # iterasi set (hash acak per proses) dan sama di semua proses shard/service.
+        size = len(query_grams)
+        keys = self._keys
+        named = [(keys[slot], common, slot) for slot, common in most_common(shared, RESCORE_LIMIT) if keys[slot] is not None]
+        if skipped:
+            # Trigram yang dilewati ada di nama jika muncul di nama yang sudah di-padding
+            named = [
+                (key, common + sum(gram in f"  {key} " for gram in skipped), slot)
+                for key, common, slot in named
+            ]
+        candidates = heapq.nsmallest(
+            CANDIDATE_LIMIT, named,
+            key=lambda entry: (-2 * entry[1] / (size + len(entry[0]) + 1), entry[0])
+        )
+
+        scored = []
+        limit = max_distance
+        for key, common, slot in candidates:
+            substring = query in key
+            # Satu operasi edit mengubah paling banyak 3 trigram query, jadi trigram
+            # yang tidak sama memberi batas bawah distance tanpa menghitungnya
+            if not substring and (abs(len(key) - len(query)) > limit or size - common > 3 * limit):
+                continue
+            distance = edit_distance(query, key, limit)
+            if distance <= limit:
+                scored.append((distance, -common, key, slot))
+            elif substring:
+                # Substring tetap relevan walaupun nama aslinya jauh lebih panjang
+                scored.append((max_distance + 1, -common, key, slot))
+            else:
+                continue
+            if len(scored) >= k:
+                # Kandidat berikutnya hanya berguna jika tidak lebih jauh dari saran ke-k
+                limit = min(limit, sorted(entry[0] for entry in scored)[k - 1])
+        scored.sort()
+        display = self._display
+        # Slot yang dihapus thread lain di tengah pencarian berisi None
+        found = (display[slot] for _, _, _, slot in scored[:k])
+        return [name for name in found if name is not None]
@@ -1,92 +1,488 @@
 import json
 import os
-from database import save_item, get_all_items
+import hashlib
+import time
+from database import (replace_items, apply_item_changes, get_stored_items, get_sync_state,
+                      item_content_hash, get_catalog_revision, init_db, update_db_schema,
+                      get_all_items, save_recipe_analysis)
+from catalog import Catalog
+from catalog_snapshot import CATALOG_SNAPSHOT_FILE, SnapshotError
+from metrics import metrics
 
 ITEMS_FILE = "items.json"
 
-def fetch_and_parse_items():
+# Jumlah contoh per jenis masalah yang dicetak di laporan validasi recipe
+VALIDATION_REPORT_LIMIT = 10
+DIGEST_STATE_KEY = "items_file_digest"
+
+# Ukuran blok baca saat streaming items.json (karakter)
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Jumlah item per batch saat sinkronisasi membandingkan hash dengan database
+# (satu query per batch; tetap di bawah batas variabel SQLite)
+SYNC_BATCH_SIZE = int(os.getenv("SYNC_BATCH_SIZE", "500"))
+# Jumlah item yang disimpan utuh di diff per jenis (added/modified/removed/failures),
+# mis. untuk pengumuman item baru; selebihnya hanya dihitung di diff["counts"]
+DIFF_SAMPLE_LIMIT = int(os.getenv("SYNC_DIFF_SAMPLE_LIMIT", "500"))
+
+class DiffSample(list):
+    """List yang hanya menyimpan limit entry pertama; jumlah semua entry ada di total"""
+
+    def __init__(self, limit=None):
+        super().__init__()
+        self.limit = DIFF_SAMPLE_LIMIT if limit is None else limit
+        self.total = 0
+
+    def append(self, entry):
+        self.total += 1
+        if len(self) < self.limit:
+            super().append(entry)
+
+def iter_json_array(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Parse array JSON top-level secara bertahap dan yield elemennya satu per satu.
+    Memori yang dipakai sebanding dengan ukuran satu elemen, bukan ukuran file.
+    Raise json.JSONDecodeError jika file tidak valid.
     """
-    Ambil items.json, parse, simpan ke DB, return list item baru
+    decoder = json.JSONDecoder()
+    with open(file_path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+            block = f.read(chunk_size)
+            if not block:
+                eof = True
+            buffer = buffer[pos:] + block
+            pos = 0
+
+        def skip_whitespace():
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                fill()
+
+        skip_whitespace()
+        if buffer[pos:pos + 1] != "[":
+            raise json.JSONDecodeError("Expecting '['", buffer, pos)
+        pos += 1
+
+        expect_value = True
+        first = True
+        while True:
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            char = buffer[pos]
+            if char == "]" and (first or not expect_value):
+                pos += 1
+                break
+            if not expect_value:
+                if char != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                expect_value = True
+                continue
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    fill()
+                    continue
+                if not eof and (end == len(buffer) or (
+                        isinstance(value, (int, float)) and buffer[end] in "0123456789+-.eE")):
+                    # Nilai di ujung buffer (mis. angka) mungkin masih terpotong
+                    fill()
+                    continue
+                break
+            pos = end
+            yield value
+            first = False
+            expect_value = False
+
+        skip_whitespace()
+        if pos < len(buffer):
+            raise json.JSONDecodeError("Extra data", buffer, pos)
+
+def validate_item(item):
+    """Validasi satu record item; return pesan error atau None jika valid"""
+    if not isinstance(item, dict):
+        return "Item bukan object"
+    if "id" not in item:
+        return "Missing key 'id'"
+    if "name" not in item:
+        return "Missing key 'name'"
+    if not isinstance(item["id"], int) or isinstance(item["id"], bool):
+        return f"id tidak valid: {item['id']!r}"
+    if not isinstance(item["name"], str) or not item["name"].strip():
+        return f"name tidak valid: {item['name']!r}"
+    tier = item.get("tier", 0)
+    if tier is not None and (not isinstance(tier, int) or isinstance(tier, bool)):
+        return f"tier tidak valid: {tier!r}"
+    if not isinstance(item.get("recipe", ""), str):
+        return f"recipe tidak valid: {item['recipe']!r}"
+    if item.get("image_url") is not None and not isinstance(item["image_url"], str):
+        return f"image_url tidak valid: {item['image_url']!r}"
+    return None
+
+def iter_items(file_path=ITEMS_FILE, failures=None):
+    """
+    Stream item valid dari file JSON. Record yang tidak valid dilewati
+    dan dicatat ke list failures sebagai (item, pesan error).
+    """
+    for item in iter_json_array(file_path):
+        error = validate_item(item)
+        if error is None:
+            yield item
+        elif failures is not None:
+            failures.append((item, error))
+
+def file_digest(file_path):
+    """Hitung digest SHA-256 dari file (dibaca per blok)"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def row_to_dict(row):
+    """Konversi row (id, name, tier, recipe, image_url) ke dict item"""
+    item_id, name, tier, recipe, image_url = row
+    return {
+        "id": item_id,
+        "name": name,
+        "tier": tier,
+        "recipe": recipe,
+        "image_url": image_url
+    }
+
+def empty_diff(digest=None, skipped=False):
+    """
+    Diff sinkronisasi kosong. added/modified/removed/failures hanya berisi contoh
+    (maksimal DIFF_SAMPLE_LIMIT); jumlah sebenarnya ada di counts, dan complete False
+    jika ada contoh item yang terpotong (katalog harus dimuat ulang, bukan ditambal).
+    """
+    return {
+        "digest": digest,
+        "skipped": skipped,
+        "added": [],
+        "modified": [],
+        "removed": [],
+        "failures": [],
+        "counts": {"added": 0, "modified": 0, "removed": 0, "failures": 0},
+        "complete": True
+    }
+
+def item_to_row(item):
+    """Konversi satu entry JSON ke row (id, name, tier, recipe, image_url)"""
+    return (
+        item["id"],
+        item["name"],
+        item.get("tier", 0),
+        item.get("recipe", "Tidak ada recipe"),
+        item.get("image_url")  # Ambil URL gambar
+    )
+
+def report_failures(failures):
+    """Cetak daftar item yang gagal diproses"""
+    for item, error in failures:
+        if isinstance(item, dict):
+            name = item.get("name", "unknown")
+        elif isinstance(item, (tuple, list)) and len(item) > 1:
+            name = item[1]
+        else:
+            name = "unknown"
+        print(f"❌ Error processing item {name}: {error}")
+
+def ingest_items(items, state=None, chunk_size=None, rebuild_search_index=False):
+    """
+    Ganti isi DB dengan item (iterable/stream entry JSON): row ditulis per chunk ke
+    tabel staging sambil dibaca, lalu ditukar ke tabel items dalam satu transaksi
+    (item yang tidak ada lagi ikut dihapus). Jika penulisan database gagal, tabel
+    items tidak disentuh sama sekali.
+    Return (jumlah item ditulis + dihapus, list kegagalan, penukaran berhasil)
+    """
+    failures = []
+
+    def rows():
+        for item in items:
+            error = validate_item(item)
+            if error is None:
+                yield item_to_row(item)
+            else:
+                failures.append((item, error))
+
+    _, written, removed, db_failures = replace_items(
+        rows(), state=state, chunk_size=chunk_size, rebuild_search_index=rebuild_search_index
+    )
+    failures.extend(db_failures)
+    report_failures(failures)
+    if db_failures:
+        print(f"❌ Reload database dibatalkan: {len(db_failures)} item gagal ditulis, isi lama tetap dipakai")
+        return 0, failures, False
+    print(f"🔁 Reload database: {written} item ditulis, {removed} item dihapus")
+    return written + removed, failures, True
+
+def sync_items(force=False, chunk_size=None, batch_size=None):
+    """
+    Sinkronisasi items.json ke DB berdasarkan content hash.
+    Skip seluruh proses jika digest file sama dengan sinkronisasi terakhir,
+    selain itu stream file sekali dan hanya tulis item yang ditambah, diubah atau dihapus.
+    Memori tidak tumbuh dengan ukuran file: item dibandingkan per batch SYNC_BATCH_SIZE
+    (hash dan row lama diambil dalam satu query), id yang terlihat dicatat di database,
+    dan diff hanya menyimpan jumlah serta contoh item terbatas.
+    Return diff: {digest, skipped, added, modified, removed, failures, counts, complete, revision}
     """
     if not os.path.exists(ITEMS_FILE):
         print("❌ items.json tidak ditemukan!")
-        return []
+        return empty_diff(skipped=True)
+
+    try:
+        digest = file_digest(ITEMS_FILE)
+    except OSError as e:
+        print(f"❌ Error reading items.json: {e}")
+        return empty_diff(skipped=True)
+
+    if not force and digest == get_sync_state(DIGEST_STATE_KEY):
+        print("✅ items.json tidak berubah, skip sinkronisasi")
+        return empty_diff(digest, skipped=True)
+
+    diff = empty_diff(digest)
+    for kind in ("added", "modified", "failures"):
+        diff[kind] = DiffSample()
+    batch_size = batch_size or SYNC_BATCH_SIZE
+
+    def changed_in(batch):
+        stored = get_stored_items(row[0] for row in batch)
+        changed = []
+        for row in batch:
+            old, old_hash = stored.get(row[0], (None, None))
+            if old is None:
+                diff["added"].append(row_to_dict(row))
+                changed.append(row)
+            elif old_hash != item_content_hash(row):
+                changes = {
+                    field: (old_value, new_value)
+                    for field, old_value, new_value in zip(("name", "tier", "recipe", "image_url"), old[1:], row[1:])
+                    if old_value != new_value
+                }
+                diff["modified"].append(dict(row_to_dict(row), changes=changes))
+                changed.append(row)
+        return [row[0] for row in batch], changed
+
+    def batches():
+        # Dibandingkan dan ditulis sambil di-stream: paling banyak satu batch di memori
+        batch = []
+        for item in iter_items(ITEMS_FILE, diff["failures"]):
+            batch.append(item_to_row(item))
+            if len(batch) >= batch_size:
+                yield changed_in(batch)
+                batch = []
+        if batch:
+            yield changed_in(batch)
 
     try:
-        with open(ITEMS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception as e:
+        _, removed, removed_rows, db_failures = apply_item_changes(
+            batches(), state={DIGEST_STATE_KEY: digest}, chunk_size=chunk_size, removed_sample=DIFF_SAMPLE_LIMIT
+        )
+    except (OSError, ValueError) as e:
+        # JSON rusak di tengah stream: transaksi sudah di-rollback
         print(f"❌ Error reading items.json: {e}")
-        return []
-
-    # Dapatkan daftar item yang sudah ada di database
-    existing_items = {name.lower() for _, name in get_all_items()}
-    new_items = []
-
-    for item in data:
-        try:
-            item_id = item["id"]
-            name = item["name"]
-            tier = item.get("tier", 0)
-            recipe = item.get("recipe", "Tidak ada recipe")
-            image_url = item.get("image_url")  # Ambil URL gambar
-            
-            # Simpan item ke database
-            save_item(item_id, name, tier, recipe, image_url)
-            
-            # Cek jika item baru
-            if name.lower() not in existing_items:
-                new_items.append({
-                    "id": item_id,
-                    "name": name,
-                    "tier": tier,
-                    "recipe": recipe,
-                    "image_url": image_url
-                })
-        except KeyError as e:
-            print(f"❌ Error processing item: Missing key {e} in item {item}")
-        except Exception as e:
-            print(f"❌ Error processing item {item.get('name', 'unknown')}: {e}")
-
-    print(f"✅ Loaded {len(data)} items, {len(new_items)} new items")
-    return new_items
-
-def load_all_items():
-    """Memuat semua item dari JSON ke database"""
+        return empty_diff(digest, skipped=True)
+    for failure in db_failures:
+        diff["failures"].append(failure)
+    if any(row is None for row, _ in db_failures):
+        # Transaksi di-rollback: tidak ada yang berubah di database
+        report_failures(diff["failures"])
+        print("❌ Sinkronisasi items.json dibatalkan, database tidak berubah")
+        return empty_diff(digest, skipped=True)
+
+    diff["removed"] = [row_to_dict(row) for row in removed_rows]
+    diff["counts"] = {
+        "added": diff["added"].total,
+        "modified": diff["modified"].total,
+        "removed": removed,
+        "failures": diff["failures"].total
+    }
+    diff["complete"] = all(len(diff[kind]) == diff["counts"][kind] for kind in ("added", "modified", "removed"))
+    for kind in ("added", "modified", "failures"):
+        diff[kind] = list(diff[kind])
+    # Revisi database setelah diff ditulis (sync berjalan serial, jadi tidak tertukar)
+    diff["revision"] = get_catalog_revision()
+    report_failures(diff["failures"])
+    if diff["counts"]["failures"] > len(diff["failures"]):
+        print(f"❌ ... dan {diff['counts']['failures'] - len(diff['failures'])} item lain gagal diproses")
+
+    counts = diff["counts"]
+    print(f"✅ Sync items.json: {counts['added']} baru, {counts['modified']} berubah, "
+          f"{counts['removed']} dihapus")
+    return diff
+
+def fetch_and_parse_items(chunk_size=None):
+    """
+    Ambil items.json, sinkronkan ke DB, return list item baru
+    (maksimal DIFF_SAMPLE_LIMIT; jumlah sebenarnya ada di diff["counts"] dari sync_items)
+    """
+    return sync_items(chunk_size=chunk_size)["added"]
+
+def load_all_items(chunk_size=None):
+    """
+    Memuat ulang semua item dari JSON ke database (streaming lewat tabel staging, ditukar atomik).
+    Return True hanya jika penukaran berhasil dan ada item yang ditulis atau dihapus.
+    """
     if not os.path.exists(ITEMS_FILE):
         print("❌ items.json tidak ditemukan!")
         return False
 
     try:
-        with open(ITEMS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception as e:
+        # Digest disimpan di transaksi penukaran yang sama
+        digest = file_digest(ITEMS_FILE)
+        changed, failures, swapped = ingest_items(
+            iter_json_array(ITEMS_FILE), state={DIGEST_STATE_KEY: digest},
+            chunk_size=chunk_size, rebuild_search_index=True
+        )
+    except (OSError, ValueError) as e:
         print(f"❌ Error reading items.json: {e}")
         return False
 
-    success_count = 0
-    for item in data:
-        try:
-            item_id = item["id"]
-            name = item["name"]
-            tier = item.get("tier", 0)
-            recipe = item.get("recipe", "Tidak ada recipe")
-            image_url = item.get("image_url")  # Ambil URL gambar
-            
-            if save_item(item_id, name, tier, recipe, image_url):
-                success_count += 1
-        except Exception as e:
-            print(f"❌ Error saving item {item.get('name', 'unknown')}: {e}")
-
-    print(f"✅ Successfully loaded {success_count} items to database")
-    return success_count > 0
+    if not swapped:
+        print("❌ Gagal memuat items.json ke database")
+        return False
+    if not changed:
+        print("✅ Database sudah sesuai dengan items.json, tidak ada yang dimuat ulang")
+        return False
+    print(f"✅ Successfully loaded {changed} item changes to database")
+    return True
+
+def recipe_issues(analysis):
+    """Masalah hasil analisis recipe sebagai list (id item, jenis, detail)"""
+    names = analysis.graph.names
+    issues = []
+    for members in analysis.cycles:
+        cycle = " → ".join(names[item_id] for item_id in members + members[:1])
+        issues.extend((item_id, "cycle", cycle) for item_id in members)
+    for name, item_ids in sorted(analysis.unknown.items()):
+        issues.extend((item_id, "unknown", name) for item_id in sorted(item_ids))
+    for item_id, tier, derived in analysis.mismatches:
+        issues.append((item_id, "tier", f"tier {tier}, recipe menghasilkan tier {derived}"))
+    return issues
+
+def validate_recipes(catalog=None):
+    """
+    Validasi graph recipe setelah ingest: simpan tier turunan dan kedalaman setiap item
+    ke database, ganti laporan recipe_issues, lalu cetak ringkasannya.
+    Analisis (urutan topologis) sudah dihitung katalog saat item diterapkan; tanpa
+    argumen catalog, katalog dibangun dari database.
+    Return dict jumlah masalah {cycles, unknown, mismatches}
+    """
+    if catalog is None:
+        catalog = Catalog.load()
+    analysis = catalog.recipe_analysis()
+    issues = recipe_issues(analysis)
+    derived = ((item_id, tier, depth) for item_id, (tier, depth) in analysis.derived.items())
+    save_recipe_analysis(derived, issues)
+
+    summary = {
+        "cycles": len(analysis.cycles),
+        "unknown": len(analysis.unknown),
+        "mismatches": len(analysis.mismatches)
+    }
+    for kind, label in (("cycle", "Siklus recipe"), ("unknown", "Bahan tidak dikenal"), ("tier", "Tier tidak cocok")):
+        found = [(item_id, detail) for item_id, issue_kind, detail in issues if issue_kind == kind]
+        for item_id, detail in found[:VALIDATION_REPORT_LIMIT]:
+            print(f"⚠️ {label}: {analysis.graph.names[item_id]} — {detail}")
+        if len(found) > VALIDATION_REPORT_LIMIT:
+            print(f"⚠️ {label}: {len(found) - VALIDATION_REPORT_LIMIT} lainnya di tabel recipe_issues")
+    print(f"✅ Validasi recipe: {summary['cycles']} siklus, {summary['unknown']} bahan tidak dikenal, "
+          f"{summary['mismatches']} tier tidak cocok")
+    return summary
+
+def write_catalog_snapshot(catalog=None, path=CATALOG_SNAPSHOT_FILE):
+    """
+    Tulis snapshot biner katalog untuk cold start bot. Tanpa argumen catalog,
+    katalog dibangun dari database (saat ingest dijalankan di luar bot).
+    """
+    try:
+        if catalog is None:
+            catalog = Catalog.load()
+        size = catalog.save_snapshot(path)
+    except (OSError, SnapshotError, TypeError, OverflowError) as e:
+        # TypeError/OverflowError: nilai kolom yang tidak muat di array snapshot
+        print(f"❌ Error writing catalog snapshot: {e}")
+        return False
+    if size is None:
+        print("⚠️ Revisi katalog tidak diketahui, snapshot tidak ditulis")
+        return False
+    print(f"✅ Snapshot katalog ditulis ke {path} ({size} bytes, revisi {catalog.revision})")
+    return True
+
+def restore_catalog_snapshot(catalog, path=CATALOG_SNAPSHOT_FILE):
+    """Muat katalog dari snapshot biner jika masih sesuai dengan revisi database"""
+    started = time.perf_counter()
+    try:
+        catalog.load_snapshot(path, expected_revision=get_catalog_revision())
+    except SnapshotError as e:
+        print(f"⚠️ Snapshot katalog tidak dipakai ({e}), membangun ulang dari database")
+        return False
+    elapsed = time.perf_counter() - started
+    metrics.observe("catalog.snapshot_load", elapsed)
+    print(f"✅ Catalog loaded from snapshot: {len(catalog)} items ({elapsed * 1e3:.0f}ms)")
+    return len(catalog) > 0
+
+def reload_catalog(catalog):
+    """
+    Reload penuh tanpa downtime: items.json ditukar ke database lewat tabel staging,
+    generasi katalog baru dibangun di samping lalu dipasang dengan satu penukaran
+    pointer, kemudian validasi recipe dan snapshot shard diperbarui. Query yang
+    sedang berjalan selesai di generasi lama; tidak ada yang menunggu reload.
+    """
+    started = time.perf_counter()
+    if not load_all_items():
+        return False
+    catalog.reload()
+    validate_recipes(catalog)
+    write_catalog_snapshot(catalog)
+    metrics.observe("catalog.reload", time.perf_counter() - started)
+    return True
+
+def initialize_catalog(catalog):
+    """
+    Siapkan database lalu isi katalog: snapshot yang masih valid langsung dipakai,
+    jika tidak item dimuat ke database (bila kosong), katalog dibangun ulang dan
+    snapshot baru ditulis
+    """
+    init_db()
+    update_db_schema()
+
+    # Cold start cepat: snapshot katalog yang masih valid langsung dipakai
+    if restore_catalog_snapshot(catalog):
+        return
+
+    # Load items ke database jika belum ada
+    if len(get_all_items()) == 0:
+        print("🔄 Loading items to database...")
+        if reload_catalog(catalog):
+            return
+
+    catalog.reload()
+    validate_recipes(catalog)
+    write_catalog_snapshot(catalog)
 
 def validate_json(file_path):
-    """Validasi file JSON"""
+    """Validasi file JSON (streaming) beserta setiap record item"""
+    failures = []
     try:
-        with open(file_path, 'r') as f:
-            json.load(f)
-        print("✅ JSON valid")
+        count = sum(1 for _ in iter_items(file_path, failures))
+        for item, error in failures[:10]:
+            print(f"⚠️ Item tidak valid: {error}")
+        print(f"✅ JSON valid ({count} item, {len(failures)} record tidak valid)")
         return True
     except json.JSONDecodeError as e:
         print(f"❌ JSON invalid: {e}")
@@ -94,8 +490,10 @@ def validate_json(file_path):
 
 if __name__ == "__main__":
     # Jalankan ini untuk memuat semua item ke database
-    from database import init_db, update_db_schema
     init_db()
     update_db_schema()
-    validate_json(ITEMS_FILE)
-    load_all_items()
+    if validate_json(ITEMS_FILE):
+        if not sync_items()["skipped"]:
+            catalog = Catalog.load()
+            validate_recipes(catalog)
+            write_catalog_snapshot(catalog)
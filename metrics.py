@@ -0,0 +1,132 @@
+import functools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+METRICS_FILE = os.getenv("METRICS_FILE", "metrics.json")
+
+# Batas bucket histogram (detik): 1µs, 1.41µs, 2µs, ... ~67 detik (faktor √2 per bucket)
+BUCKET_BOUNDS = tuple(1e-6 * 2 ** (i / 2) for i in range(53))
+
+class Histogram:
+    """Histogram latensi dengan bucket eksponensial tetap (memori konstan)"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, pct):
+        """Estimasi persentil dari batas atas bucket"""
+        if not self.count:
+            return None
+        target = pct / 100 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                bound = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'p50': self.percentile(50),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
+
+class Metrics:
+    """Registry metrik in-process: histogram latensi, counter, dan gauge"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def gauge(self, name, value):
+        with self._lock:
+            self.gauges[name] = value
+
+    @contextmanager
+    def timer(self, name):
+        """Ukur durasi blok kode ke histogram name"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def summaries(self, prefix=""):
+        """Ringkasan histogram yang namanya diawali prefix"""
+        with self._lock:
+            return {
+                name: histogram.summary()
+                for name, histogram in self.histograms.items() if name.startswith(prefix)
+            }
+
+    def snapshot(self):
+        """Semua metrik dalam bentuk dict yang bisa di-serialize ke JSON"""
+        with self._lock:
+            return {
+                'timestamp': time.time(),
+                'uptime': time.time() - self.started,
+                'histograms': {name: histogram.summary() for name, histogram in self.histograms.items()},
+                'counters': dict(self.counters),
+                'gauges': dict(self.gauges)
+            }
+
+    def dump(self, path=METRICS_FILE, extra=None):
+        """Tulis snapshot metrik ke file JSON (atomik lewat file sementara)"""
+        data = self.snapshot()
+        if extra:
+            data.update(extra)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+# Registry global yang dipakai semua modul
+metrics = Metrics()
+
+def timed(name):
+    """Decorator: catat jumlah panggilan dan durasi fungsi ke histogram name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
@@ -0,0 +1,448 @@
+import sys
+
+NO_RECIPE = "Tidak ada recipe"
+
+# Batas baris output *tree agar muat di embed Discord
+MAX_TREE_LINES = 40
+
+def known_tier(tier):
+    """Tier dari data, atau None jika kosong atau 0 (nilai default items.json, bukan tier sungguhan)"""
+    return tier or None
+
+def parse_recipe(recipe):
+    """Pecah teks recipe 'A + B' menjadi list nama bahan"""
+    if not recipe or recipe.strip() == NO_RECIPE:
+        return []
+    return [part.strip() for part in recipe.split("+") if part.strip()]
+
+def _without(memo, *stale):
+    """Salinan memo tanpa entry untuk id di stale (disalin utuh lalu dihapus, bukan difilter)"""
+    memo = dict(memo)
+    for ids in stale:
+        for item_id in ids:
+            memo.pop(item_id, None)
+    return memo
+
+class RecipeGraph:
+    """
+    Graph dependensi recipe: nama bahan di-resolve ke id item, adjacency list disimpan,
+    dan siklus dideteksi (Tarjan SCC). Edge di dalam satu SCC diperlakukan sebagai daun
+    sehingga sisa graph berupa DAG dan hasil ekspansi bisa di-memoize per item.
+    """
+
+    def __init__(self, items, normalize):
+        items = list(items)
+        self.names = {item['id']: item['name'] for item in items}
+        name_to_id = {normalize(item['name']): item['id'] for item in items}
+
+        # Adjacency list ringkas: id -> tuple id bahan; bahan yang tidak dikenal
+        # disimpan sebagai nama (string di-intern) di posisi yang sama
+        self.ingredients = {}
+        self.unknown = {}
+        for item in items:
+            edges = []
+            for name in parse_recipe(item.get('recipe')):
+                ingredient_id = name_to_id.get(normalize(name))
+                if ingredient_id is None:
+                    name = sys.intern(name)
+                    self.unknown.setdefault(name, []).append(item['id'])
+                    edges.append(name)
+                else:
+                    edges.append(ingredient_id)
+            self.ingredients[item['id']] = tuple(edges)
+
+        self.component = self._strongly_connected_components(self.ingredients)
+        self._init_caches()
+
+    @classmethod
+    def from_parts(cls, names, ingredients, component, cyclic=None, unknown=None):
+        """
+        Bangun graph dari bagian yang sudah dihitung (mis. dari snapshot katalog), tanpa Tarjan ulang.
+        names/ingredients/component cukup berupa mapping id -> nilai (get dan []); jika cyclic
+        dan unknown diberikan, ingredients tidak perlu bisa diiterasi.
+        """
+        graph = cls.__new__(cls)
+        graph.names = names
+        graph.ingredients = ingredients
+        if unknown is None:
+            unknown = {}
+            for item_id, edges in ingredients.items():
+                for child in edges:
+                    if type(child) is not int:
+                        unknown.setdefault(child, []).append(item_id)
+        graph.unknown = unknown
+        graph.component = component
+        graph._init_caches(cyclic)
+        return graph
+
+    def patched(self, items, removed_ids, resolve):
+        """
+        Graph baru dari graph ini tanpa membangun ulang semuanya: edge item di items
+        (item yang berubah dan item yang recipe-nya menyebut nama yang berubah) di-resolve
+        ulang lewat resolve(nama bahan) -> id atau None, item di removed_ids dihapus, dan
+        SCC hanya dihitung ulang untuk item yang komponennya bisa berubah. items harus
+        memuat semua pemakai (transitif) item yang berubah, sehingga setiap siklus baru
+        berada di dalamnya. Memo pohon item lain dipakai ulang.
+        Return (graph, id item yang komponennya dihitung ulang).
+        """
+        graph = RecipeGraph.__new__(RecipeGraph)
+        graph.names = names = dict(self.names)
+        graph.ingredients = ingredients = dict(self.ingredients)
+        graph.component = component = dict(self.component)
+
+        touched = set(removed_ids)
+        touched.update(item['id'] for item in items)
+        # Anggota SCC lama dari item yang tersentuh bisa terpisah dari siklusnya
+        affected = set(touched)
+        members = {}
+        for item_id in self.cyclic:
+            members.setdefault(self.component[item_id], []).append(item_id)
+        for item_id in touched:
+            if item_id in self.cyclic:
+                affected.update(members[self.component[item_id]])
+
+        unknown = dict(self.unknown)
+        stale = set()
+        for item_id in touched:
+            for child in self.ingredients.get(item_id, ()):
+                if type(child) is not int:
+                    stale.add(child)
+        for name in stale:
+            unknown[name] = [user for user in unknown[name] if user not in touched]
+        for item_id in removed_ids:
+            names.pop(item_id, None)
+            ingredients.pop(item_id, None)
+            component.pop(item_id, None)
+        for item in items:
+            edges = []
+            for name in parse_recipe(item.get('recipe')):
+                ingredient_id = resolve(name)
+                if ingredient_id is None:
+                    name = sys.intern(name)
+                    if name not in stale:
+                        # List lama milik graph sebelumnya: disalin sebelum ditambah
+                        unknown[name] = list(unknown.get(name, ()))
+                        stale.add(name)
+                    unknown[name].append(item['id'])
+                    edges.append(name)
+                else:
+                    edges.append(ingredient_id)
+            names[item['id']] = item['name']
+            ingredients[item['id']] = tuple(edges)
+        for name in stale:
+            # Urutan id sama dengan graph yang dibangun penuh
+            if unknown[name]:
+                unknown[name].sort()
+            else:
+                del unknown[name]
+        graph.unknown = unknown
+
+        affected.intersection_update(ingredients)
+        component.update(graph._strongly_connected_components(sorted(affected)))
+        cyclic = {item_id for item_id in self.cyclic if item_id not in affected and item_id in ingredients}
+        for item_id in affected:
+            if any(type(child) is int and component.get(child) == component[item_id]
+                   for child in ingredients[item_id]):
+                cyclic.add(item_id)
+        graph._init_caches(cyclic)
+        # Pohon item di luar affected tidak berubah: semua turunannya juga tidak berubah
+        graph._lines_cache = _without(self._lines_cache, affected, removed_ids)
+        return graph, affected
+
+    def _init_caches(self, cyclic=None):
+        if cyclic is None:
+            cyclic = {
+                item_id for item_id, edges in self.ingredients.items()
+                if any(type(child) is int and self.component[child] == self.component[item_id] for child in edges)
+            }
+        self.cyclic = cyclic
+
+        self._lines_cache = {}
+
+    def _strongly_connected_components(self, nodes):
+        """
+        Tarjan SCC iteratif (aman untuk rantai recipe yang sangat dalam) atas nodes;
+        edge ke item di luar nodes diabaikan
+        """
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        component = {}
+        counter = 0
+        members = nodes if isinstance(nodes, (set, dict)) else set(nodes)
+        for root in nodes:
+            if root in index:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, edge_pos = work.pop()
+                if edge_pos == 0:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                edges = self.ingredients[node]
+                while edge_pos < len(edges):
+                    child = edges[edge_pos]
+                    edge_pos += 1
+                    if type(child) is not int or child not in members:
+                        continue
+                    if child not in index:
+                        work.append((node, edge_pos))
+                        work.append((child, 0))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                else:
+                    if low[node] == index[node]:
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component[member] = node
+                            if member == node:
+                                break
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+        return component
+
+    def edges(self, item_id):
+        """Edge recipe sebagai (id atau None jika bahan tidak dikenal, nama bahan)"""
+        names = self.names
+        return [
+            (child, names[child]) if type(child) is int else (None, child)
+            for child in self.ingredients.get(item_id, ())
+        ]
+
+    def children(self, item_id):
+        """Edge yang bisa diekspansi: (id atau None jika daun, nama bahan)"""
+        result = []
+        for child, name in self.edges(item_id):
+            if child is not None and self.component[child] == self.component[item_id]:
+                child = None
+            result.append((child, name))
+        return result
+
+    def topological_order(self):
+        """Semua id item, setiap bahan sebelum item yang memakainya (edge siklus diabaikan)"""
+        order = []
+        visited = set()
+        for root in self.ingredients:
+            if root in visited:
+                continue
+            stack = [(root, False)]
+            while stack:
+                node, ready = stack.pop()
+                if ready:
+                    order.append(node)
+                    continue
+                if node in visited:
+                    continue
+                visited.add(node)
+                stack.append((node, True))
+                for child, _ in self.children(node):
+                    if child is not None and child not in visited:
+                        stack.append((child, False))
+        return order
+
+    def _memoized(self, root, cache, combine):
+        """Hitung combine(node) secara post-order iteratif dan simpan hasilnya di cache"""
+        if root in cache:
+            return cache[root]
+        stack = [(root, False)]
+        while stack:
+            node, ready = stack.pop()
+            if node in cache:
+                continue
+            if ready:
+                cache[node] = combine(node)
+                continue
+            stack.append((node, True))
+            for child, _ in self.children(node):
+                if child is not None and child not in cache:
+                    stack.append((child, False))
+        return cache[root]
+
+    def _combine_lines(self, node):
+        lines = [self.names[node]]
+        edges = self.edges(node)
+        for position, (child, name) in enumerate(edges):
+            last = position == len(edges) - 1
+            branch, indent = ("└─ ", "   ") if last else ("├─ ", "│  ")
+            if child is None:
+                sub = [name]
+            elif self.component[child] == self.component[node]:
+                # Edge siklus: tampilkan sebagai daun bertanda
+                sub = [name + " ↻"]
+            else:
+                sub = self._lines_cache[child]
+            lines.append(branch + sub[0])
+            lines.extend(indent + line for line in sub[1:])
+            if len(lines) > MAX_TREE_LINES:
+                return lines[:MAX_TREE_LINES] + ["…"]
+        return lines
+
+    def tree_lines(self, item_id):
+        """Baris pohon crafting lengkap sampai bahan dasar (dibatasi MAX_TREE_LINES)"""
+        return self._memoized(item_id, self._lines_cache, self._combine_lines)
+
+class RecipeAnalysis:
+    """
+    Tier turunan (satu di atas bahan tertinggi; item tanpa recipe memakai tier dari data)
+    dan kedalaman recipe setiap item, dihitung dalam satu lintasan topologis, beserta
+    masalah data: siklus, bahan tidak dikenal, dan tier yang tidak cocok dengan recipe.
+    Bahan yang tier turunannya tidak bisa dihitung memakai tier dari data; tier turunan
+    None jika ada bahan yang tidak dikenal atau edge siklus. Tier data kosong atau 0
+    dianggap tidak diketahui (lihat known_tier), bukan sebagai tier yang bertentangan.
+    Seperti CostTable, analisis baru bisa dibuat dari yang lama dengan hanya menghitung
+    ulang item yang kotor (dirty juga memuat id item yang dihapus).
+    """
+
+    def __init__(self, graph, tiers, previous=None, dirty=None):
+        # tiers: mapping id -> tier dari items.json
+        self.graph = graph
+        self.tiers = tiers
+        if previous is None or dirty is None:
+            # id -> (tier turunan, kedalaman)
+            self.derived = {}
+            for node in graph.topological_order():
+                self.derived[node] = self._combine(node)
+        else:
+            self.derived = _without(previous.derived, dirty)
+            for item_id in dirty:
+                if item_id in graph.ingredients:
+                    graph._memoized(item_id, self.derived, self._combine)
+        self._collect_issues(previous, dirty)
+
+    @classmethod
+    def from_parts(cls, graph, tiers, derived):
+        """Analisis dari hasil yang sudah dihitung (mis. dari snapshot katalog), tanpa menelusuri graph"""
+        analysis = cls.__new__(cls)
+        analysis.graph = graph
+        analysis.tiers = tiers
+        analysis.derived = derived
+        analysis._collect_issues()
+        return analysis
+
+    def _collect_issues(self, previous=None, dirty=None):
+        graph = self.graph
+        tiers = self.tiers
+        cycles = {}
+        for item_id in graph.cyclic:
+            cycles.setdefault(graph.component[item_id], []).append(item_id)
+        # List kelompok id yang saling bergantung
+        self.cycles = sorted(sorted(members) for members in cycles.values())
+        # Nama bahan tidak dikenal -> id item yang memakainya
+        self.unknown = graph.unknown
+        # (id, tier data, tier turunan); analisis inkremental hanya memeriksa item kotor
+        if previous is None or dirty is None:
+            checked = self.derived
+            mismatches = []
+        else:
+            checked = {item_id: self.derived[item_id] for item_id in dirty if item_id in self.derived}
+            mismatches = [entry for entry in previous.mismatches if entry[0] not in dirty]
+        mismatches.extend(
+            (item_id, tiers.get(item_id), tier) for item_id, (tier, _) in checked.items()
+            if tier is not None and known_tier(tiers.get(item_id)) not in (None, tier)
+        )
+        self.mismatches = sorted(mismatches)
+
+    def _combine(self, node):
+        edges = self.graph.children(node)
+        if not edges:
+            return known_tier(self.tiers.get(node)), 0
+        derived = self.derived
+        tiers = []
+        depth = 0
+        for child, _ in edges:
+            if child is None:
+                tiers.append(None)
+                continue
+            tier, child_depth = derived[child]
+            tiers.append(tier if tier is not None else known_tier(self.tiers.get(child)))
+            depth = max(depth, child_depth)
+        return (None if None in tiers else 1 + max(tiers)), depth + 1
+
+    def tier(self, item_id):
+        """Tier turunan item, atau None"""
+        return self.derived.get(item_id, (None, None))[0]
+
+    def depth(self, item_id):
+        """Kedalaman recipe (0 untuk bahan dasar), atau None jika item tidak ada"""
+        return self.derived.get(item_id, (None, None))[1]
+
+class CostTable:
+    """
+    Vektor bahan dasar per item, dihitung bottom-up (anak lebih dulu, urutan topologis
+    graph) sehingga kebutuhan bahan untuk N item cukup satu perkalian vektor.
+    Vektor disimpan ringkas sebagai tuple (indeks bahan, jumlah, indeks bahan, jumlah, ...).
+    Tabel baru bisa dibuat dari tabel lama dengan hanya menghitung ulang item yang kotor
+    (dirty juga memuat id item yang dihapus, agar vektornya dibuang);
+    dengan eager=False vektor baru dihitung saat pertama diminta.
+    """
+
+    @classmethod
+    def from_parts(cls, graph, bases, vectors):
+        """
+        Tabel dari vektor yang sudah dihitung (mis. dari snapshot katalog). vectors cukup
+        mendukung 'in', [] dan penulisan untuk vektor yang belum ada (dihitung saat diminta).
+        """
+        table = cls.__new__(cls)
+        table.graph = graph
+        table.bases = list(bases)
+        table._base_ids = {name: base_id for base_id, name in enumerate(table.bases)}
+        table.vectors = vectors
+        table.recomputed = 0
+        return table
+
+    def __init__(self, graph, previous=None, dirty=None, eager=True):
+        self.graph = graph
+        if previous is None or dirty is None:
+            self.bases = []
+            self._base_ids = {}
+            self.vectors = {}
+            pending = list(graph.ingredients) if eager else []
+        else:
+            # Copy-on-write: pembaca tabel lama tidak terpengaruh
+            self.bases = list(previous.bases)
+            self._base_ids = dict(previous._base_ids)
+            self.vectors = _without(previous.vectors, dirty)
+            pending = [item_id for item_id in dirty if item_id in graph.ingredients]
+        reused = len(self.vectors)
+        for item_id in pending:
+            graph._memoized(item_id, self.vectors, self._combine)
+        # Jumlah vektor yang benar-benar dihitung (bukan disalin dari tabel lama)
+        self.recomputed = len(self.vectors) - reused
+
+    def _base_id(self, name):
+        base_id = self._base_ids.get(name)
+        if base_id is None:
+            base_id = self._base_ids[name] = len(self.bases)
+            self.bases.append(name)
+        return base_id
+
+    def _combine(self, node):
+        edges = self.graph.children(node)
+        if not edges:
+            return (self._base_id(self.graph.names[node]), 1)
+        counts = {}
+        vectors = self.vectors
+        for child, name in edges:
+            vector = vectors[child] if child is not None else (self._base_id(name), 1)
+            for position in range(0, len(vector), 2):
+                base_id = vector[position]
+                counts[base_id] = counts.get(base_id, 0) + vector[position + 1]
+        return tuple(value for entry in sorted(counts.items()) for value in entry)
+
+    def vector(self, item_id):
+        """Vektor (indeks bahan, jumlah, ...) untuk satu item (indeks ke self.bases)"""
+        return self.graph._memoized(item_id, self.vectors, self._combine)
+
+    def cost(self, item_id, quantity=1):
+        """Jumlah bahan dasar untuk membuat quantity item (dict nama -> jumlah), atau None"""
+        if item_id not in self.graph.ingredients:
+            return None
+        vector = self.vector(item_id)
+        bases = self.bases
+        return {bases[vector[position]]: vector[position + 1] * quantity for position in range(0, len(vector), 2)}
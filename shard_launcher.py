@@ -0,0 +1,72 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+# Jumlah shard total dan jumlah proses bot di mesin ini; shard dibagi rata ke setiap proses.
+# Semua proses membaca snapshot katalog yang sama (CATALOG_SNAPSHOT_FILE) lewat mmap.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "2"))
+SHARD_PROCESSES = int(os.getenv("SHARD_PROCESSES", str(SHARD_COUNT)))
+# Jeda sebelum proses shard yang berhenti dijalankan ulang
+SHARD_RESTART_DELAY = float(os.getenv("SHARD_RESTART_DELAY", "5"))
+
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bot.py")
+
+def assign_shards(shard_count, processes):
+    """Bagi shard secara round-robin; shard 0 (leader katalog) selalu di proses pertama"""
+    processes = max(1, min(processes, shard_count))
+    return [list(range(first, shard_count, processes)) for first in range(processes)]
+
+def start_shard_process(shard_ids):
+    """Jalankan bot.py untuk sekelompok shard"""
+    env = dict(
+        os.environ,
+        SHARD_COUNT=str(SHARD_COUNT),
+        SHARD_IDS=",".join(map(str, shard_ids)),
+        CATALOG_LEADER="1" if 0 in shard_ids else "0"
+    )
+    print(f"🚀 Starting shard process {shard_ids}")
+    return subprocess.Popen([sys.executable, BOT_SCRIPT], env=env)
+
+def main():
+    groups = assign_shards(SHARD_COUNT, SHARD_PROCESSES)
+    print(f"🧩 {SHARD_COUNT} shard dalam {len(groups)} proses: {groups}")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    processes = [start_shard_process(shard_ids) for shard_ids in groups]
+    restart_at = [None] * len(groups)
+    try:
+        while not stopping:
+            time.sleep(1)
+            for index, process in enumerate(processes):
+                if process.poll() is None:
+                    continue
+                if restart_at[index] is None:
+                    print(f"⚠️ Shard {groups[index]} berhenti (exit {process.returncode}), "
+                          f"restart dalam {SHARD_RESTART_DELAY:.0f}s")
+                    restart_at[index] = time.monotonic() + SHARD_RESTART_DELAY
+                elif time.monotonic() >= restart_at[index]:
+                    restart_at[index] = None
+                    processes[index] = start_shard_process(groups[index])
+    finally:
+        print("🛑 Menghentikan semua proses shard...")
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in processes:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+if __name__ == "__main__":
+    main()
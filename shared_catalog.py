@@ -0,0 +1,366 @@
+import os
+from bisect import bisect_left, bisect_right
+from catalog import Item, normalize_name, _autocomplete_positions, _tier_sort_key, SNAPSHOT_NO_TIER
+from catalog_snapshot import CATALOG_SNAPSHOT_FILE, MappedSnapshot, SnapshotError
+from fuzzy import FuzzyMatcher
+from recipe_graph import CostTable, RecipeGraph
+
+# Interval (detik) proses shard memeriksa apakah leader menerbitkan snapshot baru
+CATALOG_REFRESH_INTERVAL = float(os.getenv("CATALOG_REFRESH_INTERVAL", "5"))
+
+class _Ordered:
+    """Urutan lain atas kolom snapshot tanpa menyalin: seq[i] = values[order[i]]"""
+
+    __slots__ = ('values', 'order')
+
+    def __init__(self, values, order):
+        self.values = values
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        return self.values[self.order[index]]
+
+class _Postings:
+    """Posting list trigram di snapshot; trigram terurut dicari dengan bisect"""
+
+    def __init__(self, grams, offsets, slots):
+        self._grams = grams
+        self._offsets = offsets
+        self._slots = slots
+
+    def get(self, gram, default=None):
+        index = bisect_left(self._grams, gram)
+        if index < len(self._grams) and self._grams[index] == gram:
+            return self._slots[self._offsets[index]:self._offsets[index + 1]]
+        return default
+
+class _ById:
+    """Kolom snapshot yang dibaca berdasarkan id item (mapping untuk RecipeGraph)"""
+
+    def __init__(self, view, read):
+        self._view = view
+        self._read = read
+
+    def get(self, item_id, default=None):
+        position = self._view.position(item_id)
+        return default if position is None else self._read(position)
+
+    def __contains__(self, item_id):
+        return self._view.position(item_id) is not None
+
+    def __getitem__(self, item_id):
+        position = self._view.position(item_id)
+        if position is None:
+            raise KeyError(item_id)
+        return self._read(position)
+
+class _StoredVectors(dict):
+    """
+    Vektor bahan dasar CostTable yang dibaca langsung dari snapshot (tanpa memo per
+    proses). Hanya vektor yang tidak tersimpan di snapshot (jumlah terlalu besar)
+    dihitung saat diminta dan disimpan di dict ini.
+    """
+
+    def __init__(self, view):
+        super().__init__()
+        self._view = view
+
+    def _stored(self, item_id):
+        position = self._view.position(item_id)
+        return self._view.cost_vector(position) if position is not None else ()
+
+    def __contains__(self, item_id):
+        return dict.__contains__(self, item_id) or bool(self._stored(item_id))
+
+    def __missing__(self, item_id):
+        vector = self._stored(item_id)
+        if not vector:
+            raise KeyError(item_id)
+        return vector
+
+class _SnapshotView:
+    """
+    Satu generasi katalog di atas MappedSnapshot. Semua kolom dan index dibaca
+    langsung dari mmap; objek Item hanya dibuat untuk item yang diminta.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.revision = snapshot.revision
+        self.ids = snapshot['ids']
+        self.tiers = snapshot['tiers']
+        self.names = snapshot['names']
+        self.keys = snapshot['keys']
+        self.recipes = snapshot['recipes']
+        self.images = snapshot['images']
+        self.strings = snapshot['strings']
+        self.name_order = snapshot['name_order']
+        self.name_rank = snapshot['name_rank']
+        self.prefix_order = snapshot['prefix_order']
+        self.word_codes = snapshot['word_codes']
+        self.sorted_keys = _Ordered(self.keys, self.prefix_order)
+        self.uses_keys = snapshot['uses_keys']
+        self.uses_offsets = snapshot['uses_offsets']
+        self.uses_ids = snapshot['uses_ids']
+        self.derived_tiers = snapshot['derived_tiers']
+        self.depths = snapshot['depths']
+        self.cost_offsets = snapshot['cost_offsets']
+        self.cost_vectors = snapshot['cost_vectors']
+
+        self.fuzzy = FuzzyMatcher.from_postings(
+            self.keys, self.names,
+            _Postings(snapshot['fuzzy_grams'], snapshot['fuzzy_offsets'], snapshot['fuzzy_slots']),
+            read_only=True
+        )
+
+        # Bahan tidak dikenal jumlahnya kecil, jadi cukup disalin ke dict
+        self.edge_offsets = snapshot['edge_offsets']
+        self.edges = snapshot['edges']
+        pairs = snapshot['edge_unknown']
+        self.unknown_edges = {edge: self.strings[name] for edge, name in zip(pairs[::2], pairs[1::2])}
+        unknown = {}
+        for edge, name in self.unknown_edges.items():
+            position = bisect_right(self.edge_offsets, edge) - 1
+            unknown.setdefault(name, []).append(self.ids[position])
+        component = snapshot['component']
+        self.graph = RecipeGraph.from_parts(
+            _ById(self, self.names.__getitem__), _ById(self, self._ingredients),
+            _ById(self, component.__getitem__), set(snapshot['cyclic']), unknown
+        )
+        self.costs = CostTable.from_parts(
+            self.graph, [self.strings[index] for index in snapshot['cost_bases']], _StoredVectors(self)
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def string(self, index):
+        return None if index < 0 else self.strings[index]
+
+    def _ingredients(self, position):
+        start, stop = self.edge_offsets[position], self.edge_offsets[position + 1]
+        unknown = self.unknown_edges
+        return tuple(
+            unknown[edge] if edge in unknown else self.edges[edge]
+            for edge in range(start, stop)
+        )
+
+    def cost_vector(self, position):
+        """Vektor bahan dasar (indeks bahan, jumlah, ...) item di posisi ini; kosong jika tidak tersimpan"""
+        return tuple(self.cost_vectors[self.cost_offsets[position]:self.cost_offsets[position + 1]])
+
+    def position(self, item_id):
+        """Posisi item di urutan id, atau None"""
+        index = bisect_left(self.ids, item_id)
+        if index < len(self.ids) and self.ids[index] == item_id:
+            return index
+        return None
+
+    def key_position(self, key):
+        """Posisi item dengan key (nama yang dinormalisasi), atau None"""
+        index = bisect_left(self.sorted_keys, key)
+        if index < len(self.sorted_keys) and self.sorted_keys[index] == key:
+            return self.prefix_order[index]
+        return None
+
+    def item(self, position):
+        item = Item.__new__(Item)
+        item.id = self.ids[position]
+        item.name = self.names[position]
+        item.key = self.keys[position]
+        tier = self.tiers[position]
+        item.tier = None if tier == SNAPSHOT_NO_TIER else tier
+        item.recipe = self.string(self.recipes[position])
+        item.image_url = self.string(self.images[position])
+        return item
+
+    def matching_positions(self, keyword):
+        """
+        Posisi (urutan id) semua item yang key-nya mengandung keyword. Slot index fuzzy
+        sama dengan posisi, jadi posting list trigram-nya langsung dipakai; keyword di
+        bawah 3 karakter memakai scan blob key.
+        """
+        positions = self.fuzzy.containing(keyword)
+        if positions is not None:
+            return positions
+        needle = keyword.encode("utf-8")
+        positions = []
+        found = self.keys.find(needle)
+        while found is not None:
+            positions.append(found[0])
+            found = self.keys.find(needle, found[0] + 1)
+        return positions
+
+    def uses_ids_for(self, key):
+        index = bisect_left(self.uses_keys, key)
+        if index < len(self.uses_keys) and self.uses_keys[index] == key:
+            return self.uses_ids[self.uses_offsets[index]:self.uses_offsets[index + 1]]
+        return ()
+
+class SharedCatalog:
+    """
+    Katalog read-only untuk proses shard. Semua index dibaca langsung dari snapshot
+    yang di-mmap, jadi halaman datanya dipakai bersama semua proses lewat page cache
+    (memori tidak berlipat per shard dan tanpa koneksi database).
+    Generasi katalog = revisi database snapshot; leader menerbitkan snapshot baru
+    dan refresh() memetakannya begitu revisinya berubah. API baca sama dengan Catalog.
+    """
+
+    def __init__(self, path=CATALOG_SNAPSHOT_FILE):
+        self.path = path
+        # Naik setiap kali generasi berganti; dipakai untuk invalidasi cache embed
+        self.version = 0
+        self._view = None
+        self._stamp = None
+
+    @property
+    def revision(self):
+        """Generasi (revisi database) yang sedang dipetakan, atau None"""
+        view = self._view
+        return view.revision if view is not None else None
+
+    def refresh(self):
+        """
+        Petakan ulang snapshot jika file sudah diganti leader. Return True jika
+        generasi berganti. Melempar SnapshotError jika snapshot baru tidak valid
+        (generasi lama tetap dipakai).
+        """
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return False
+        # Stamp dicatat dulu agar snapshot rusak hanya dilaporkan sekali
+        self._stamp = stamp
+        try:
+            view = _SnapshotView(MappedSnapshot(self.path))
+        except (KeyError, IndexError, TypeError) as e:
+            raise SnapshotError(f"isi snapshot tidak konsisten: {e}") from e
+        if self._view is not None and view.revision == self._view.revision:
+            return False
+        # Pembaca yang sedang berjalan tetap memakai generasi lama sampai selesai;
+        # mapping lama dilepas saat tidak ada lagi yang mereferensikannya
+        self._view = view
+        self.version += 1
+        return True
+
+    def __len__(self):
+        view = self._view
+        return len(view) if view is not None else 0
+
+    def __contains__(self, item_name):
+        view = self._view
+        return view is not None and view.key_position(normalize_name(item_name)) is not None
+
+    def get_by_id(self, item_id):
+        """Dapatkan item berdasarkan id"""
+        view = self._view
+        position = view.position(item_id) if view is not None else None
+        return view.item(position) if position is not None else None
+
+    def get_item_details(self, item_name):
+        """Dapatkan detail item dengan nama persis (case-insensitive)"""
+        view = self._view
+        position = view.key_position(normalize_name(item_name)) if view is not None else None
+        return view.item(position) if position is not None else None
+
+    def lookup_items(self, item_names, k=3):
+        """Lookup banyak nama sekaligus; return list (item, saran) seperti Catalog.lookup_items"""
+        view = self._view
+        if view is None:
+            return [(None, []) for _ in item_names]
+        results = []
+        for item_name in item_names:
+            key = normalize_name(item_name)
+            position = view.key_position(key)
+            if position is None:
+                results.append((None, view.fuzzy.suggest(key, k=k)))
+            else:
+                results.append((view.item(position), []))
+        return results
+
+    def get_recipe(self, item_name):
+        """Mendapatkan recipe item: exact match dulu, lalu partial match (urutan id)"""
+        view = self._view
+        if view is None:
+            return None
+        keyword = normalize_name(item_name)
+        position = view.key_position(keyword)
+        if position is None:
+            position = min(view.matching_positions(keyword), default=None)
+        return view.string(view.recipes[position]) if position is not None else None
+
+    def search_items(self, keyword):
+        """Cari item berdasarkan kata kunci, hasil berupa (id, name) urut nama"""
+        view = self._view
+        if view is None:
+            return []
+        positions = view.matching_positions(normalize_name(keyword))
+        positions.sort(key=view.name_rank.__getitem__)
+        return [(view.ids[position], view.names[position]) for position in positions]
+
+    def suggest(self, item_name, k=5):
+        """Saran nama item terdekat (toleran typo) untuk miss path *recipe"""
+        view = self._view
+        return view.fuzzy.suggest(normalize_name(item_name), k=k) if view is not None else []
+
+    def autocomplete(self, prefix, limit=25):
+        """Saran nama item untuk autocomplete (bisect atas key terurut di snapshot)"""
+        view = self._view
+        if view is None:
+            return []
+        positions = _autocomplete_positions(view.sorted_keys, view.word_codes, prefix, limit)
+        return [view.names[view.prefix_order[index]] for index in positions]
+
+    def recipe_tree(self, item_name):
+        """
+        Ekspansi pohon crafting item sampai bahan dasar (baris pohon di-memoize per
+        generasi); bahan dasar, kedalaman dan tier turunan dibaca dari snapshot.
+        Return dict {item, lines, base, depth, derived_tier} atau None jika item tidak ditemukan
+        """
+        view = self._view
+        position = view.key_position(normalize_name(item_name)) if view is not None else None
+        if position is None:
+            return None
+        item = view.item(position)
+        derived_tier = view.derived_tiers[position]
+        return {
+            'item': item,
+            'lines': view.graph.tree_lines(item.id),
+            'base': view.costs.cost(item.id),
+            'depth': view.depths[position],
+            'derived_tier': None if derived_tier == SNAPSHOT_NO_TIER else derived_tier
+        }
+
+    def recipe_cost(self, item_name, quantity=1):
+        """
+        Kebutuhan bahan dasar untuk membuat quantity item: vektor yang sudah dihitung
+        leader dibaca dari snapshot lalu dikali quantity.
+        Return dict {item, quantity, base} atau None jika item tidak ditemukan
+        """
+        view = self._view
+        position = view.key_position(normalize_name(item_name)) if view is not None else None
+        if position is None:
+            return None
+        item = view.item(position)
+        return {'item': item, 'quantity': quantity, 'base': view.costs.cost(item.id, quantity)}
+
+    def uses(self, item_name):
+        """Item yang memakai bahan ini di recipe-nya, urut tier lalu nama"""
+        view = self._view
+        if view is None:
+            return []
+        positions = (view.position(item_id) for item_id in view.uses_ids_for(normalize_name(item_name)))
+        return sorted((view.item(position) for position in positions if position is not None), key=_tier_sort_key)
+
+    def all_items(self):
+        """Dapatkan semua item sebagai (id, name) urut nama"""
+        view = self._view
+        if view is None:
+            return []
+        return [(view.ids[position], view.names[position]) for position in view.name_order]
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import time
+from metrics import metrics
+
+# Interval polling mtime items.json, jeda untuk menggabungkan trigger beruntun,
+# dan interval reload penuh (tabel staging + penukaran generasi katalog) walaupun
+# file tidak terlihat berubah
+SYNC_POLL_INTERVAL = float(os.getenv("SYNC_POLL_INTERVAL", "60"))
+SYNC_DEBOUNCE = float(os.getenv("SYNC_DEBOUNCE", "5"))
+SYNC_FULL_INTERVAL = float(os.getenv("SYNC_FULL_INTERVAL", "86400"))
+
+class SyncScheduler:
+    """
+    Satu-satunya penjadwal sinkronisasi items.json di dalam proses bot.
+    Memantau mtime/ukuran file, menggabungkan trigger yang berdekatan,
+    menjalankan satu ingest dalam satu waktu, lalu mem-publish hasilnya.
+    Jika file tidak berubah selama full_interval, reload penuh dijalankan
+    sebagai jaring pengaman (mis. database diubah di luar bot).
+    """
+
+    def __init__(self, file_path, sync, publish, reload=None, poll_interval=SYNC_POLL_INTERVAL,
+                 debounce=SYNC_DEBOUNCE, full_interval=SYNC_FULL_INTERVAL):
+        self.file_path = file_path
+        self._sync = sync
+        self._publish = publish
+        self._reload = reload
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.full_interval = full_interval
+
+        self._stamp = None
+        self._wakeup = None
+        self._lock = None
+        self._task = None
+
+        self.runs = 0
+        self.reloads = 0
+        self.coalesced = 0
+        self.last_run = None
+        self.last_duration = None
+        self.last_result = None
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _changed(self):
+        """Cek apakah file berubah sejak sinkronisasi terakhir (atau belum pernah disinkronkan)"""
+        return self.last_run is None or self._file_stamp() != self._stamp
+
+    def _due(self):
+        """Cek apakah file berubah sejak sinkronisasi terakhir atau interval penuh sudah lewat"""
+        return self._changed() or time.monotonic() - self.last_run >= self.full_interval
+
+    def start(self):
+        """Mulai loop penjadwal (aman dipanggil berulang, mis. dari on_ready)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+        print(f"✅ Sync scheduler started (poll {self.poll_interval:.0f}s)")
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def request(self):
+        """
+        Minta sinkronisasi (mis. command *sync); beberapa request berdekatan digabung
+        jadi satu run. Return False jika penjadwal tidak berjalan di proses ini.
+        """
+        if self._wakeup is None:
+            return False
+        if self._wakeup.is_set():
+            self.coalesced += 1
+        self._wakeup.set()
+        return True
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            if not self._wakeup.is_set() and not self._due():
+                continue
+            # Tunggu file selesai ditulis dan gabungkan trigger yang datang bersamaan
+            await asyncio.sleep(self.debounce)
+            # File berubah atau diminta: sinkronisasi diff; hanya interval penuh: reload penuh
+            full = not self._wakeup.is_set() and not self._changed()
+            self._wakeup.clear()
+            try:
+                await (self.run_reload() if full else self.run_once())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Error in sync scheduler: {e}")
+
+    async def run_once(self, force=False):
+        """Jalankan satu sinkronisasi (ingest berjalan serial di bawah lock) dan publish hasilnya"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            stamp = self._file_stamp()
+            started = time.monotonic()
+            result = await self._sync(force=force)
+            self._stamp = stamp
+            self.last_run = time.monotonic()
+            self.last_duration = self.last_run - started
+            metrics.observe("sync.run", self.last_duration)
+            metrics.increment("sync.skipped" if result.get("skipped") else "sync.applied")
+            self.last_result = result
+            self.runs += 1
+        if not result.get("skipped"):
+            await self._publish(result)
+        return result
+
+    async def run_reload(self):
+        """
+        Reload penuh (tabel staging + penukaran generasi katalog) di bawah lock yang sama
+        dengan sinkronisasi; query tetap dilayani generasi lama selama reload berjalan.
+        Tanpa fungsi reload, jatuh ke sinkronisasi paksa.
+        """
+        if self._reload is None:
+            return await self.run_once(force=True)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            stamp = self._file_stamp()
+            started = time.monotonic()
+            reloaded = await self._reload()
+            self._stamp = stamp
+            self.last_run = time.monotonic()
+            self.last_duration = self.last_run - started
+            metrics.observe("sync.reload", self.last_duration)
+            metrics.increment("sync.reloaded" if reloaded else "sync.skipped")
+            self.reloads += 1
+        return reloaded
+
+    def stats(self):
+        """Statistik penjadwal untuk observability"""
+        return {
+            'runs': self.runs,
+            'reloads': self.reloads,
+            'coalesced': self.coalesced,
+            'last_duration': self.last_duration,
+            'last_run_age': time.monotonic() - self.last_run if self.last_run is not None else None
+        }
@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import pytest
+
+# Modul bot berada langsung di root repo (tanpa package)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import database
+import items_parser
+
+def make_items(count=40):
+    """Katalog kecil: 4 bahan dasar, sisanya dibuat dari dua item sebelumnya"""
+    items = [
+        {"id": 1, "name": "Dirt", "tier": 1, "recipe": "Tidak ada recipe"},
+        {"id": 2, "name": "Rock", "tier": 1, "recipe": "Tidak ada recipe"},
+        {"id": 3, "name": "Lava", "tier": 1, "recipe": "Tidak ada recipe"},
+        {"id": 4, "name": "Cave Background", "tier": 1, "recipe": "Tidak ada recipe"},
+    ]
+    for item_id in range(5, count + 1):
+        first = items[(item_id * 7) % len(items)]
+        second = items[(item_id * 3 + 1) % len(items)]
+        items.append({
+            "id": item_id,
+            "name": f"Wood Block {item_id}" if item_id % 2 else f"Glass Door {item_id}",
+            "tier": max(first["tier"], second["tier"]) + 1,
+            "recipe": f"{first['name']} + {second['name']}",
+            "image_url": f"https://example.com/{item_id}.png" if item_id % 5 == 0 else None
+        })
+    return items
+
+@pytest.fixture
+def catalog_files(tmp_path, monkeypatch):
+    """
+    Database dan items.json sementara. Return fungsi write(items) yang menulis
+    items.json; database.DB_FILE dan items_parser.ITEMS_FILE diarahkan ke tmp_path.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "items.db"))
+    monkeypatch.setattr(items_parser, "ITEMS_FILE", str(tmp_path / "items.json"))
+    database.init_db()
+    database.update_db_schema()
+
+    def write(items):
+        with open(items_parser.ITEMS_FILE, "w", encoding="utf-8") as f:
+            json.dump(items, f)
+
+    yield write
+    database.close_pool()
+
+def catalog_state(catalog):
+    """Semua yang bisa diamati lewat API baca katalog, untuk membandingkan dua katalog"""
+    state = {"all_items": catalog.all_items(), "len": len(catalog)}
+    for item_id, name in catalog.all_items():
+        item = catalog.get_item_details(name)
+        tree = catalog.recipe_tree(name)
+        state[item_id] = (
+            (item.id, item.name, item.tier, item.recipe, item.image_url),
+            catalog.get_by_id(item_id).name,
+            catalog.get_recipe(name),
+            (tree["lines"], tree["base"], tree["depth"], tree["derived_tier"]),
+            catalog.recipe_cost(name, 3)["base"],
+            [used.id for used in catalog.uses(name)],
+        )
+    for keyword in ("", "d", "door", "wood block 1", " 1", "zzz"):
+        state[f"search:{keyword}"] = catalog.search_items(keyword)
+        state[f"recipe:{keyword}"] = catalog.get_recipe(keyword)
+        state[f"auto:{keyword}"] = catalog.autocomplete(keyword)
+    for typo in ("glas dor 12", "wod blok 7", "lavv"):
+        state[f"suggest:{typo}"] = catalog.suggest(typo)
+    return state
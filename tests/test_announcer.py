@@ -0,0 +1,63 @@
+import asyncio
+
+from announcer import AnnouncementQueue, LocalTransport, RateLimited
+
+def test_duplicate_keys_are_sent_once_per_channel():
+    async def scenario():
+        transport = LocalTransport(latency=0)
+        queue = AnnouncementQueue(transport, route_rate=100, route_per=1.0)
+        for channel_id in (1, 2):
+            for item_id in range(3):
+                assert queue.enqueue(channel_id, {"id": item_id}, key=item_id)
+                assert not queue.enqueue(channel_id, {"id": item_id}, key=item_id)
+        assert queue.pending() == 6
+        await queue.flush()
+        return transport, queue
+
+    transport, queue = asyncio.run(scenario())
+    assert sorted((channel_id, len(embeds)) for channel_id, embeds in transport.sent) == [(1, 3), (2, 3)]
+    assert queue.stats()["deduplicated"] == 6 and queue.stats()["pending"] == 0
+
+def test_embeds_are_batched_ten_per_message_in_order():
+    async def scenario():
+        transport = LocalTransport(latency=0)
+        queue = AnnouncementQueue(transport, route_rate=100, route_per=1.0)
+        for item_id in range(25):
+            queue.enqueue(7, {"id": item_id}, key=item_id)
+        await queue.flush()
+        return transport, queue
+
+    transport, queue = asyncio.run(scenario())
+    assert [len(embeds) for _, embeds in transport.sent] == [10, 10, 5]
+    assert [embed["id"] for _, embeds in transport.sent for embed in embeds] == list(range(25))
+    assert queue.sent_messages == 3 and queue.sent_embeds == 25
+
+def test_rate_limited_sends_back_off_and_are_retried():
+    async def scenario():
+        # Transport lebih ketat dari bucket antrean: sebagian kiriman mendapat 429
+        transport = LocalTransport(latency=0, rate=2, per=0.1)
+        queue = AnnouncementQueue(transport, route_rate=100, route_per=1.0)
+        for item_id in range(50):
+            queue.enqueue(3, {"id": item_id}, key=item_id)
+        await queue.flush()
+        return transport, queue
+
+    transport, queue = asyncio.run(scenario())
+    assert transport.rejected > 0 and queue.rate_limited == transport.rejected
+    assert queue.sent_embeds == 50 and queue.failed == 0
+    assert [embed["id"] for _, embeds in transport.sent for embed in embeds] == list(range(50))
+
+def test_batch_fails_after_retries_and_key_can_be_queued_again():
+    class AlwaysLimited:
+        async def send(self, channel_id, embeds):
+            raise RateLimited(0.001)
+
+    async def scenario():
+        queue = AnnouncementQueue(AlwaysLimited(), route_rate=100, route_per=1.0, max_retries=2)
+        queue.enqueue(1, {"id": 1}, key=1)
+        await queue.flush()
+        return queue
+
+    queue = asyncio.run(scenario())
+    assert queue.rate_limited == 3 and queue.failed == 1
+    assert queue.enqueue(1, {"id": 1}, key=1)
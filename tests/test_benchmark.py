@@ -0,0 +1,41 @@
+import json
+
+import benchmark
+import database
+import items_parser
+from catalog import normalize_name
+from recipe_graph import RecipeGraph
+
+def test_generate_catalog_is_deterministic_and_acyclic():
+    items = benchmark.generate_catalog(500, seed=4)
+    assert items == benchmark.generate_catalog(500, seed=4)
+    assert len({item["name"].lower() for item in items}) == 500
+    tiers = {item["name"]: item["tier"] for item in items}
+    for item in items:
+        first, second = item["recipe"].split(" + ")
+        assert item["tier"] > tiers.get(first, 1) and item["tier"] > tiers.get(second, 1)
+    assert not RecipeGraph(items, normalize_name).cyclic
+
+def test_percentile_picks_nearest_rank():
+    samples = list(range(1, 101))
+    assert benchmark.percentile(samples, 50) == 51
+    assert benchmark.percentile(samples, 99) == 99
+    assert benchmark.percentile([3.0], 99) == 3.0
+
+def test_benchmark_run_reports_every_metric(tmp_path, monkeypatch, capsys):
+    # run_size mengarahkan DB_FILE dan ITEMS_FILE ke workdir; monkeypatch mengembalikannya
+    monkeypatch.setattr(database, "DB_FILE", database.DB_FILE)
+    monkeypatch.setattr(items_parser, "ITEMS_FILE", items_parser.ITEMS_FILE)
+    output = tmp_path / "bench.json"
+    benchmark.main(["--sizes", "200", "--queries", "20", "--output", str(output)])
+    report = json.loads(output.read_text(encoding="utf-8"))
+    (result,) = report["results"]
+    assert result["size"] == 200
+    for key in ("get_recipe", "search_items", "catalog_get_recipe", "catalog_suggest",
+                "catalog_autocomplete", "shared_catalog_get_recipe"):
+        assert result[key]["ops"] == 20 and result[key]["p50_us"] > 0
+    assert result["catalog_memory"]["items"] == 200
+
+    benchmark.main(["--sizes", "200", "--queries", "20", "--output", str(tmp_path / "again.json"),
+                    "--compare", str(output)])
+    assert "size=200" in capsys.readouterr().out
@@ -0,0 +1,42 @@
+import pytest
+from catalog import Catalog
+from catalog_protocol import (FRAME, OPCODES, OPERATIONS, ProtocolError, decode_value, encode_frame,
+                              encode_value, parse_address)
+
+@pytest.mark.parametrize("value", [
+    None, True, False, 0, -1, (1 << 63) - 1, -(1 << 63), 1.5, "", "Wood Block ✨",
+    [], [1, "a", None, [2.0, False]], {}, {"id": 1, "name": "Door", "base": {"Dirt": 2}},
+    {1: "satu", None: [True]},
+])
+def test_value_round_trip(value):
+    assert decode_value(encode_value(value)) == value
+
+def test_tuple_and_mapping_objects_are_sent_as_list_and_dict():
+    item = Catalog([(1, "Door", 2, "Dirt + Rock", None)]).get_by_id(1)
+    assert decode_value(encode_value((1, "Door"))) == [1, "Door"]
+    assert decode_value(encode_value(item)) == {
+        "id": 1, "name": "Door", "tier": 2, "recipe": "Dirt + Rock", "image_url": None
+    }
+
+def test_frame_header_and_payload():
+    frame = encode_frame(7, OPCODES["search_items"], ["door"])
+    length, request_id, code = FRAME.unpack_from(frame)
+    assert (request_id, OPERATIONS[code]) == (7, "search_items")
+    assert length == len(frame) - FRAME.size
+    assert decode_value(frame[FRAME.size:]) == ["door"]
+
+@pytest.mark.parametrize("value", [1 << 63, object(), {1, 2}])
+def test_unencodable_values_raise_protocol_error(value):
+    with pytest.raises(ProtocolError):
+        encode_value(value)
+
+@pytest.mark.parametrize("data", [b"", b"X", b"s\x05\x00\x00\x00ab", b"NN", b"i\x01", b"m\x01\x00\x00\x00l\x00\x00\x00\x00N"])
+def test_corrupt_payload_raises_protocol_error(data):
+    with pytest.raises(ProtocolError):
+        decode_value(data)
+
+def test_parse_address():
+    assert parse_address("unix:/tmp/catalog.sock") == ("unix", "/tmp/catalog.sock")
+    assert parse_address("127.0.0.1:7000") == ("tcp", ("127.0.0.1", 7000))
+    with pytest.raises(ValueError):
+        parse_address("localhost")
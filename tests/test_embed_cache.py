@@ -0,0 +1,54 @@
+from embed_cache import EmbedCache
+
+def renderer(calls):
+    def render_for(name):
+        def render():
+            calls.append(name)
+            return {"title": name}
+        return render
+    return render_for
+
+def test_hits_reuse_the_rendered_embed():
+    calls = []
+    render = renderer(calls)
+    cache = EmbedCache(max_size=4)
+    first = cache.get_or_render("recipe", 1, 7, render("Dirt"))
+    assert cache.get_or_render("recipe", 1, 7, render("Dirt")) is first
+    cache.get_or_render("iteminfo", 1, 7, render("Dirt info"))
+    assert calls == ["Dirt", "Dirt info"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+def test_version_change_drops_every_entry():
+    calls = []
+    render = renderer(calls)
+    cache = EmbedCache(max_size=4)
+    cache.get_or_render("recipe", 1, 7, render("Dirt"))
+    cache.get_or_render("recipe", 2, 7, render("Rock"))
+    renamed = cache.get_or_render("recipe", 1, 8, render("Dirt v2"))
+    assert renamed == {"title": "Dirt v2"}
+    assert cache.stats()["invalidations"] == 1 and cache.stats()["size"] == 1
+    cache.get_or_render("recipe", 2, 8, render("Rock v2"))
+    assert calls == ["Dirt", "Rock", "Dirt v2", "Rock v2"]
+
+def test_render_for_an_old_version_is_not_cached():
+    cache = EmbedCache(max_size=4)
+
+    def stale_render():
+        # Versi katalog berubah selagi embed lama dirender
+        cache.get_or_render("recipe", 2, 9, lambda: {"title": "Rock"})
+        return {"title": "Dirt old"}
+
+    assert cache.get_or_render("recipe", 1, 8, stale_render) == {"title": "Dirt old"}
+    assert cache.get_or_render("recipe", 1, 9, lambda: {"title": "Dirt new"}) == {"title": "Dirt new"}
+
+def test_least_recently_used_entry_is_evicted():
+    calls = []
+    render = renderer(calls)
+    cache = EmbedCache(max_size=2)
+    cache.get_or_render("recipe", 1, 1, render("a"))
+    cache.get_or_render("recipe", 2, 1, render("b"))
+    cache.get_or_render("recipe", 1, 1, render("a"))
+    cache.get_or_render("recipe", 3, 1, render("c"))
+    cache.get_or_render("recipe", 1, 1, render("a"))
+    cache.get_or_render("recipe", 2, 1, render("b"))
+    assert calls == ["a", "b", "c", "b"]
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+import flood_control
+from flood_control import CommandLimiter, CooldownTable, SingleFlight
+
+def test_single_flight_coalesces_concurrent_calls():
+    calls = []
+
+    async def lookup(name):
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return name.upper()
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.run(("recipe", "dirt"), lookup, "dirt") for _ in range(20)))
+        assert len(flight) == 0
+        # Setelah selesai, pemanggilan berikutnya menjalankan fungsi lagi
+        await flight.run(("recipe", "dirt"), lookup, "dirt")
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert results == ["DIRT"] * 20
+    assert calls == ["dirt", "dirt"]
+    assert flight.stats() == {"inflight": 0, "calls": 2, "coalesced": 19}
+
+def test_single_flight_shares_errors_and_survives_cancelled_callers():
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        flight = SingleFlight()
+        outcomes = await asyncio.gather(*(flight.run("bad", failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+        first = asyncio.ensure_future(flight.run("slow", slow))
+        second = asyncio.ensure_future(flight.run("slow", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(flood_control.time, "monotonic", lambda: now[0])
+    return now
+
+def test_user_bucket_rejects_and_notifies_once(clock):
+    limiter = CommandLimiter(user_rate=2, user_per=10, channel_rate=100, channel_per=10)
+    assert limiter.check(1, 9) is None
+    assert limiter.check(1, 9) is None
+    scope, retry_after, notify = limiter.check(1, 9)
+    assert (scope, notify) == ("user", True) and retry_after == pytest.approx(5.0)
+    assert limiter.check(1, 9)[2] is False
+    # User lain di channel yang sama tidak terpengaruh
+    assert limiter.check(2, 9) is None
+    clock[0] += 5
+    assert limiter.check(1, 9) is None
+    assert limiter.stats()["rejected_user"] == 2 and limiter.stats()["allowed"] == 4
+
+def test_channel_rejection_does_not_spend_user_tokens(clock):
+    limiter = CommandLimiter(user_rate=2, user_per=10, channel_rate=1, channel_per=10)
+    assert limiter.check(1, 9) is None
+    assert limiter.check(2, 9)[0] == "channel"
+    # Token user 2 tidak terpakai oleh penolakan channel
+    assert limiter.check(2, 8) is None
+    assert limiter.check(2, 7) is None
+    assert limiter.stats()["rejected_channel"] == 1
+
+def test_cooldown_table_prunes_full_buckets(clock):
+    table = CooldownTable(rate=1, per=10, max_buckets=2)
+    table.bucket("a", clock[0]).tokens -= 1
+    table.bucket("b", clock[0])
+    table.bucket("c", clock[0])
+    assert len(table) == 2
+    assert table.bucket("a", clock[0]).tokens == 0
@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+
+import fuzzy
+from fuzzy import FuzzyMatcher, edit_distance, most_common
+
+NAMES = ["glass door", "glass pane", "wood block", "wooden door", "lava rock", "magic door",
+         "door", "crystal block", "golden sword", "rock"]
+
+def levenshtein(a, b):
+    """DP penuh sebagai pembanding"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j - 1] + (ca != cb), previous[j] + 1, current[j - 1] + 1))
+        previous = current
+    return previous[-1]
+
+def matcher():
+    return FuzzyMatcher((name, name.title()) for name in NAMES)
+
+def test_edit_distance_matches_full_dp():
+    rng = random.Random(7)
+    for _ in range(3000):
+        a = "".join(rng.choice("ab d") for _ in range(rng.randrange(12)))
+        b = "".join(rng.choice("ab d") for _ in range(rng.randrange(12)))
+        expected = levenshtein(a, b)
+        assert edit_distance(a, b) == expected
+        limit = rng.randrange(4)
+        assert edit_distance(a, b, limit) == min(expected, limit + 1)
+
+def test_most_common_keeps_counter_membership():
+    rng = random.Random(3)
+    for _ in range(200):
+        counter = Counter(rng.randrange(50) for _ in range(rng.randrange(1, 300)))
+        n = rng.randrange(1, 30)
+        assert sorted(most_common(counter, n)) == sorted(counter.most_common(n))
+
+def test_suggest_ranks_typos_by_distance():
+    index = matcher()
+    assert index.suggest("glas door")[0] == "Glass Door"
+    assert index.suggest("wodden door")[0] == "Wooden Door"
+    assert index.suggest("lavarock")[0] == "Lava Rock"
+    assert index.suggest("crystl block", k=1) == ["Crystal Block"]
+    assert index.suggest("zzzz") == []
+    assert index.suggest("") == []
+
+def test_suggest_rescores_skipped_common_trigrams(monkeypatch):
+    names = [(f"wood door {number}", f"Wood Door {number}") for number in range(300)]
+    index = FuzzyMatcher(names + [("golden door", "Golden Door")])
+    expected = index.suggest("goldn door", k=3)
+    monkeypatch.setattr(fuzzy, "POSTINGS_BUDGET", 16)
+    assert index.suggest("goldn door", k=3) == expected
+    assert expected[0] == "Golden Door"
+
+def test_containing_matches_substring_scan():
+    index = matcher()
+    for text in ("door", "ass", "ck", "rock", "oden d", "zzz", "s d"):
+        slots = index.containing(text)
+        if len(text) < 3:
+            assert slots is None
+            continue
+        assert sorted(index.keys_for(slots)) == sorted(name for name in NAMES if text in name)
+
+def test_copy_leaves_original_postings_untouched():
+    index = matcher()
+    copy = index.copy()
+    copy.remove("glass door")
+    copy.add("glass doors", "Glass Doors")
+    assert sorted(index.keys_for(index.containing("glass"))) == ["glass door", "glass pane"]
+    assert sorted(copy.keys_for(copy.containing("glass"))) == ["glass doors", "glass pane"]
+    assert index.suggest("glass dor", k=1) == ["Glass Door"]
+    assert len(index) == len(copy) == len(NAMES)
@@ -0,0 +1,37 @@
+import os
+
+import database
+import items_parser
+from catalog import Catalog
+from catalog_snapshot import CATALOG_SNAPSHOT_FILE
+from conftest import catalog_state, make_items
+
+def test_load_all_items_reports_noop_reload(catalog_files):
+    catalog_files(make_items(10))
+    assert items_parser.load_all_items()
+    assert not items_parser.load_all_items()
+
+def test_reload_swaps_in_a_new_generation(catalog_files):
+    catalog_files(make_items(30))
+    items_parser.load_all_items()
+    catalog = Catalog.load()
+    before = catalog_state(catalog)
+    old_generation = catalog._generation
+
+    catalog_files(make_items(20) + [{"id": 99, "name": "Magic Door", "tier": 2, "recipe": "Dirt + Rock"}])
+    assert items_parser.reload_catalog(catalog)
+    assert catalog._generation is not old_generation
+    assert catalog_state(catalog) == catalog_state(Catalog.load())
+    assert catalog.get_item_details("magic door").id == 99
+    assert os.path.exists(CATALOG_SNAPSHOT_FILE)
+
+    # Pembaca yang masih memegang generasi lama tetap melihat isi lama
+    catalog._generation = old_generation
+    assert catalog_state(catalog) == before
+    assert len(database.get_all_item_rows()) == 21
+
+    # Reload tanpa perubahan tidak menukar apa pun
+    catalog.reload()
+    current = catalog._generation
+    assert not items_parser.reload_catalog(catalog)
+    assert catalog._generation is current
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+import database
+import items_parser
+from catalog import Catalog
+from conftest import catalog_state, make_items
+
+def write_text(tmp_path, text):
+    path = tmp_path / "items.json"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1 << 16])
+def test_iter_json_array_matches_json_load(tmp_path, chunk_size):
+    values = [{"id": 1, "name": "Dirt"}, 12345678, -1.5e10, "a, b]", [1, [2]], None, True, {}]
+    path = write_text(tmp_path, " \n" + json.dumps(values, indent=1) + "\n ")
+    assert list(items_parser.iter_json_array(path, chunk_size=chunk_size)) == values
+    assert list(items_parser.iter_json_array(write_text(tmp_path, "[ ]"), chunk_size=chunk_size)) == []
+
+@pytest.mark.parametrize("text", [
+    "",
+    "{}",
+    "[1, 2",
+    "[1 2]",
+    "[1,]",
+    "[,1]",
+    '[{"id": 1}',
+    '[{"id": 1, "name": "Dirt"]',
+    "[1] 2",
+    "[1]]",
+])
+@pytest.mark.parametrize("chunk_size", [2, 1 << 16])
+def test_iter_json_array_rejects_malformed_input(tmp_path, text, chunk_size):
+    with pytest.raises(json.JSONDecodeError):
+        list(items_parser.iter_json_array(write_text(tmp_path, text), chunk_size=chunk_size))
+
+def test_malformed_file_leaves_database_unchanged(catalog_files):
+    catalog_files(make_items())
+    items_parser.sync_items()
+    rows = sorted(database.get_all_item_rows())
+    revision = database.get_catalog_revision()
+
+    # Item valid di awal file sudah diproses sebelum JSON rusak ditemukan
+    text = json.dumps(make_items(50))
+    with open(items_parser.ITEMS_FILE, "w", encoding="utf-8") as f:
+        f.write(text[:-40])
+    diff = items_parser.sync_items(batch_size=4)
+    assert diff["skipped"]
+    assert sorted(database.get_all_item_rows()) == rows
+    assert database.get_catalog_revision() == revision
+
+def test_sync_reports_invalid_records_and_keeps_the_rest(catalog_files):
+    items = make_items(10)
+    catalog_files(items + [{"id": "x", "name": "Broken"}, {"id": 50}])
+    diff = items_parser.sync_items()
+    assert len(diff["added"]) == 10
+    assert [error for _, error in diff["failures"]] == ["id tidak valid: 'x'", "Missing key 'name'"]
+    assert diff["counts"]["failures"] == 2
+
+def test_sync_keeps_bounded_sample_and_catalog_reloads(catalog_files, monkeypatch):
+    monkeypatch.setattr(items_parser, "DIFF_SAMPLE_LIMIT", 3)
+    catalog_files(make_items())
+    first = items_parser.sync_items(batch_size=7)
+    assert len(first["added"]) == 3 and first["counts"]["added"] == 40
+    assert not first["complete"]
+    catalog = Catalog.load()
+
+    catalog_files(make_items(20))
+    diff = items_parser.sync_items(batch_size=7)
+    assert diff["counts"]["removed"] == 20
+    assert [item["id"] for item in diff["removed"]] == [21, 22, 23]
+    assert not diff["complete"]
+    catalog.apply_diff(diff)
+    assert len(catalog) == 20
+    assert catalog_state(catalog) == catalog_state(Catalog.load())
@@ -0,0 +1,82 @@
+from catalog import Catalog, normalize_name
+from recipe_graph import RecipeAnalysis, RecipeGraph
+
+BASE = [
+    {"id": 1, "name": "Dirt", "tier": 1, "recipe": "Tidak ada recipe"},
+    {"id": 2, "name": "Rock", "tier": 1, "recipe": "Tidak ada recipe"},
+    {"id": 3, "name": "Lava", "tier": 0, "recipe": "Tidak ada recipe"},
+]
+
+def analyse(items):
+    items = BASE + items
+    graph = RecipeGraph(items, normalize_name)
+    return RecipeAnalysis(graph, {item["id"]: item["tier"] for item in items})
+
+def test_derived_tier_and_depth_follow_the_recipe():
+    analysis = analyse([
+        {"id": 4, "name": "Cave", "tier": 2, "recipe": "Dirt + Rock"},
+        {"id": 5, "name": "Door", "tier": 3, "recipe": "Cave + Dirt"},
+    ])
+    assert (analysis.tier(4), analysis.depth(4)) == (2, 1)
+    assert (analysis.tier(5), analysis.depth(5)) == (3, 2)
+    assert (analysis.tier(1), analysis.depth(1)) == (1, 0)
+    assert analysis.cycles == [] and analysis.mismatches == [] and analysis.unknown == {}
+
+def test_cycles_are_reported_and_get_no_derived_tier():
+    analysis = analyse([
+        {"id": 4, "name": "Egg", "tier": 2, "recipe": "Chicken + Dirt"},
+        {"id": 5, "name": "Chicken", "tier": 3, "recipe": "Egg + Rock"},
+        {"id": 6, "name": "Omelette", "tier": 3, "recipe": "Egg + Rock"},
+        {"id": 7, "name": "Loop", "tier": 2, "recipe": "Loop + Dirt"},
+    ])
+    assert analysis.cycles == [[4, 5], [7]]
+    assert analysis.tier(4) is None and analysis.tier(5) is None
+    # Omelette memakai Egg dari luar siklus: tier data Egg dipakai, bukan dianggap siklus
+    assert analysis.tier(6) == 3 and analysis.mismatches == []
+
+def test_tier_mismatches_ignore_unknown_and_zero_tiers():
+    analysis = analyse([
+        {"id": 4, "name": "Cave", "tier": 5, "recipe": "Dirt + Rock"},
+        {"id": 5, "name": "Sand", "tier": 0, "recipe": "Dirt + Rock"},
+        {"id": 6, "name": "Glass", "tier": 3, "recipe": "Sand + Lava"},
+        {"id": 7, "name": "Mystery", "tier": 9, "recipe": "Unobtainium + Dirt"},
+    ])
+    assert analysis.mismatches == [(4, 5, 2)]
+    # Lava tanpa tier: tier turunan Glass tidak bisa dihitung, jadi tidak dianggap bertentangan
+    assert analysis.tier(6) is None
+    assert analysis.unknown == {"Unobtainium": [7]}
+    assert analysis.tier(7) is None
+
+def rows(items):
+    return [(item["id"], item["name"], item["tier"], item["recipe"], item.get("image_url")) for item in items]
+
+def analysis_state(analysis):
+    return analysis.cycles, analysis.mismatches, dict(analysis.unknown), dict(analysis.derived)
+
+def test_incremental_analysis_matches_a_full_rebuild():
+    items = {item["id"]: dict(item, image_url=None) for item in BASE + [
+        {"id": 4, "name": "Egg", "tier": 2, "recipe": "Dirt + Rock"},
+        {"id": 5, "name": "Chicken", "tier": 3, "recipe": "Egg + Rock"},
+        {"id": 6, "name": "Omelette", "tier": 9, "recipe": "Egg + Lava"},
+        {"id": 7, "name": "Nest", "tier": 4, "recipe": "Chicken + Dirt"},
+    ]}
+    catalog = Catalog(rows(items.values()))
+    steps = [
+        # Siklus baru, lalu siklus terputus lagi
+        ({4: {"recipe": "Chicken + Dirt"}}, [], [[4, 5]]),
+        ({4: {"recipe": "Dirt + Rock", "tier": 7}}, [], []),
+        # Bahan tidak dikenal menjadi item yang dikenal
+        ({7: {"recipe": "Straw + Chicken"}}, [], []),
+        ({8: {"name": "Straw", "tier": 1, "recipe": "Tidak ada recipe"}}, [], []),
+        ({}, [5], []),
+    ]
+    for revision, (changes, removed, cycles) in enumerate(steps, 1):
+        diff = {"added": [], "modified": [], "removed": [items.pop(item_id) for item_id in removed], "revision": revision}
+        for item_id, fields in changes.items():
+            kind = "modified" if item_id in items else "added"
+            items[item_id] = dict(items.get(item_id, {"id": item_id, "image_url": None}), **fields)
+            diff[kind].append(items[item_id])
+        catalog.apply_diff(diff)
+        rebuilt = Catalog(rows(items.values()), revision)
+        assert catalog.recipe_analysis().cycles == cycles
+        assert analysis_state(catalog.recipe_analysis()) == analysis_state(rebuilt.recipe_analysis())
@@ -0,0 +1,48 @@
+import pytest
+from catalog import Catalog
+from catalog_snapshot import SnapshotError
+from conftest import catalog_state, make_items
+from items_parser import item_to_row
+from shared_catalog import SharedCatalog
+
+@pytest.fixture
+def catalog():
+    return Catalog([item_to_row(item) for item in make_items()], revision=3)
+
+def test_shared_catalog_matches_catalog_after_snapshot(catalog, tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    catalog.save_snapshot(path)
+    shared = SharedCatalog(path)
+    assert shared.refresh()
+    assert shared.revision == 3
+    assert catalog_state(shared) == catalog_state(catalog)
+
+    restored = Catalog()
+    restored.load_snapshot(path, expected_revision=3)
+    assert catalog_state(restored) == catalog_state(catalog)
+
+def test_shared_catalog_follows_new_generation(catalog, tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    catalog.save_snapshot(path)
+    shared = SharedCatalog(path)
+    shared.refresh()
+    version = shared.version
+    assert not shared.refresh()
+
+    catalog.apply_diff({
+        "added": [{"id": 200, "name": "Magic Door", "tier": 3, "recipe": "Dirt + Rock", "image_url": None}],
+        "modified": [],
+        "removed": [{"id": 5}],
+        "revision": 4,
+    })
+    catalog.save_snapshot(path)
+    assert shared.refresh()
+    assert shared.version == version + 1 and shared.revision == 4
+    assert shared.get_by_id(5) is None
+    assert catalog_state(shared) == catalog_state(catalog)
+
+def test_snapshot_with_other_revision_is_rejected(catalog, tmp_path):
+    path = str(tmp_path / "catalog.snap")
+    catalog.save_snapshot(path)
+    with pytest.raises(SnapshotError):
+        Catalog().load_snapshot(path, expected_revision=4)
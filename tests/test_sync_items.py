@@ -0,0 +1,55 @@
+import database
+import items_parser
+from catalog import Catalog
+from conftest import catalog_state, make_items
+
+def edited(items):
+    """Versi baru katalog: beberapa item diubah, dihapus dan ditambah"""
+    items = [dict(item) for item in items]
+    by_id = {item["id"]: item for item in items}
+    by_id[6]["name"] = "Glass Door Six"
+    by_id[7]["tier"] = 9
+    by_id[8]["recipe"] = "Dirt + Lava"
+    by_id[10]["image_url"] = None
+    items = [item for item in items if item["id"] not in (12, 13)]
+    items.append({"id": 100, "name": "Magic Door", "tier": 3, "recipe": "Glass Door Six + Rock"})
+    return items
+
+def test_sync_diff_matches_full_rebuild(catalog_files, tmp_path, monkeypatch):
+    catalog_files(make_items())
+    first = items_parser.sync_items()
+    assert not first["skipped"] and len(first["added"]) == 40
+    catalog = Catalog.load()
+
+    catalog_files(edited(make_items()))
+    diff = items_parser.sync_items()
+    assert [item["id"] for item in diff["added"]] == [100]
+    assert sorted(item["id"] for item in diff["removed"]) == [12, 13]
+    old = {item["id"]: item for item in make_items()}
+    assert {item["id"]: item["changes"] for item in diff["modified"]} == {
+        6: {"name": ("Glass Door 6", "Glass Door Six")},
+        7: {"tier": (old[7]["tier"], 9)},
+        8: {"recipe": (old[8]["recipe"], "Dirt + Lava")},
+        10: {"image_url": ("https://example.com/10.png", None)},
+    }
+    assert diff["counts"] == {"added": 1, "modified": 4, "removed": 2, "failures": 0}
+    assert diff["complete"]
+    assert diff["revision"] == database.get_catalog_revision()
+    catalog.apply_diff(diff)
+    synced_rows = sorted(database.get_all_item_rows())
+
+    # Database baru yang diisi penuh dari file yang sama harus identik
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "rebuilt.db"))
+    database.init_db()
+    database.update_db_schema()
+    assert items_parser.load_all_items()
+    assert sorted(database.get_all_item_rows()) == synced_rows
+    assert catalog_state(catalog) == catalog_state(Catalog.load())
+
+def test_sync_skips_unchanged_file(catalog_files):
+    catalog_files(make_items())
+    items_parser.sync_items()
+    revision = database.get_catalog_revision()
+    diff = items_parser.sync_items()
+    assert diff["skipped"] and not diff["added"] and not diff["removed"]
+    assert database.get_catalog_revision() == revision
@@ -1,49 +1,30 @@
-from database import init_db, update_db_schema, get_all_items, save_item
-from items_parser import fetch_and_parse_items
-import json
+from database import init_db, update_db_schema, get_all_items, save_items
+from items_parser import iter_items, item_to_row
 
 def update_existing_database():
     """Memperbarui database yang sudah ada dengan menambahkan image_url"""
     print("🔄 Memperbarui database yang sudah ada...")
-    
+
     # Inisialisasi database
     init_db()
     update_db_schema()
-    
-    # Baca items.json
+
+    # Dapatkan semua item dari database
+    existing_names = {item_name.lower() for _, item_name in get_all_items()}
+
+    # Stream items.json dan perbarui item yang sudah ada dengan image_url
+    # (semua baris ditulis dalam satu transaksi)
     try:
-        with open("items.json", "r", encoding="utf-8") as f:
-            items_data = json.load(f)
+        rows = (
+            item_to_row(item_data)
+            for item_data in iter_items("items.json")
+            if item_data.get('image_url') and item_data['name'].lower() in existing_names
+        )
+        updated_count, _ = save_items(rows)
     except Exception as e:
         print(f"❌ Error reading items.json: {e}")
         return
-    
-    # Buat mapping dari nama item ke image_url
-    image_mapping = {item['name'].lower(): item.get('image_url') for item in items_data}
-    
-    # Dapatkan semua item dari database
-    existing_items = get_all_items()
-    
-    # Perbarui setiap item dengan image_url
-    updated_count = 0
-    for item_id, item_name in existing_items:
-        image_url = image_mapping.get(item_name.lower())
-        if image_url:
-            # Simpan kembali item dengan image_url
-            # Untuk mendapatkan tier dan recipe, kita perlu query database lagi
-            # atau menggunakan data dari items.json
-            for item_data in items_data:
-                if item_data['name'].lower() == item_name.lower():
-                    save_item(
-                        item_data['id'],
-                        item_data['name'],
-                        item_data.get('tier', 0),
-                        item_data.get('recipe', 'Tidak ada recipe'),
-                        image_url
-                    )
-                    updated_count += 1
-                    break
-    
+
     print(f"✅ Database updated! {updated_count} items diperbarui dengan image_url.")
 
 if __name__ == "__main__":